@@ -0,0 +1,78 @@
+"""Per-frame render time: Cartopy add_feature vs. the cached basemap.
+
+Renders *--frames* synthetic CONUS difference maps both ways and prints the
+mean seconds per frame. Needs the Natural Earth shapefiles (downloaded by
+Cartopy on first use).
+
+    python -m benchmarks.bench_basemap --frames 10
+"""
+import argparse
+import io
+import tempfile
+import time
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+
+from comparator import plotting
+
+
+def _synthetic_mesh(ny=300, nx=500):
+    lon, lat = np.meshgrid(np.linspace(-125, -66.5, nx), np.linspace(20, 50, ny))
+    diff = 5.0 * np.sin(np.radians(lon) * 8) * np.cos(np.radians(lat) * 6)
+    return lon, lat, diff
+
+
+def _init_uncached(fig):
+    """The pre-cache _init_conus_map: one FeatureArtist per feature."""
+    ax = fig.add_subplot(1, 1, 1, projection=plotting.CONUS_PROJ)
+    plotting._lock_conus_view(ax)
+    for _, feature, linewidth in plotting.BASEMAP_FEATURES:
+        ax.add_feature(feature, linewidth=linewidth)
+    return ax
+
+
+def _render(init, lon, lat, diff):
+    fig = plt.figure(figsize=(10, 6))
+    ax = init(fig)
+    ax.pcolormesh(lon, lat, diff, transform=plotting.PC, shading="nearest",
+                  cmap="coolwarm", rasterized=True)
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", dpi=100)
+    plt.close(fig)
+
+
+def _time(init, frames, mesh):
+    _render(init, *mesh)  # warm-up: shapefile reads, basemap cache fill
+    t0 = time.perf_counter()
+    for _ in range(frames):
+        _render(init, *mesh)
+    return (time.perf_counter() - t0) / frames
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--frames", type=int, default=10)
+    args = p.parse_args(argv)
+
+    mesh = _synthetic_mesh()
+    with tempfile.TemporaryDirectory() as tmp:
+        plotting.BASEMAP_CACHE_DIR = tmp
+        plotting._BASEMAP_CACHE.clear()
+        t_cold = time.perf_counter()
+        plotting._basemap_layers(plotting.CONUS_PROJ)
+        t_cold = time.perf_counter() - t_cold
+
+        uncached = _time(_init_uncached, args.frames, mesh)
+        cached = _time(plotting._init_conus_map, args.frames, mesh)
+
+    print(f"basemap projection (once): {t_cold:.3f} s")
+    print(f"add_feature per frame:     {uncached:.3f} s")
+    print(f"cached basemap per frame:  {cached:.3f} s")
+    print(f"speedup:                   {uncached / cached:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
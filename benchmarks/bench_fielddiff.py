@@ -0,0 +1,72 @@
+"""compute_fielddiff: the fused kernel vs. the plain xarray expression.
+
+Prints the time per call and the peak extra memory (tracemalloc, which
+numpy reports its buffers to) on synthetic fields, GFS 0.25 deg by default.
+
+    python -m benchmarks.bench_fielddiff --shape 721x1440 --calls 20
+"""
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+import xarray as xr
+
+from comparator import fielddiff as fd
+
+
+def _reference(h, r):
+    """The pre-fused TMP implementation: ~10 full-grid temporaries per call."""
+    h, r = xr.align(h, r, join="exact")
+    valid = (np.isfinite(h) & np.isfinite(r) & (h > 150) & (h < 330) & (r > 150) & (r < 330))
+    return (h - r).where(valid) * 9 / 5
+
+
+def _fields(ny, nx, dtype, seed=0):
+    rng = np.random.default_rng(seed)
+    lon, lat = np.meshgrid(np.linspace(0, 360, nx, endpoint=False), np.linspace(90, -90, ny))
+    coords = {"longitude": (("y", "x"), lon), "latitude": (("y", "x"), lat)}
+    anl = 280.0 + 20 * np.cos(np.radians(lat))
+    nwp = anl + rng.normal(0.3, 1.5, size=anl.shape)
+    nwp[::97, ::89] = np.nan
+    return (xr.DataArray(nwp.astype(dtype), dims=("y", "x"), coords=coords),
+            xr.DataArray(anl.astype(dtype), dims=("y", "x"), coords=coords))
+
+
+def _measure(fn, h, r, calls):
+    fn(h, r)  # warm-up
+    tracemalloc.start()
+    fn(h, r)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    t0 = time.perf_counter()
+    for _ in range(calls):
+        fn(h, r)
+    return (time.perf_counter() - t0) / calls, peak
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--shape", default="721x1440", help="ny x nx (HRRR: 1059x1799)")
+    p.add_argument("--calls", type=int, default=20)
+    p.add_argument("--dtype", default="float32", choices=("float32", "float64"))
+    args = p.parse_args(argv)
+
+    ny, nx = (int(n) for n in args.shape.lower().split("x"))
+    h, r = _fields(ny, nx, args.dtype)
+    xr.testing.assert_identical(_reference(h, r), fd.compute_fielddiff(h, r, "TMP"))
+
+    out_mb = h.nbytes / 2**20
+    print(f"{ny}x{nx} {args.dtype}: output array {out_mb:.1f} MB")
+    results = {}
+    for name, fn in (("xarray expression", _reference),
+                     ("fused kernel", lambda a, b: fd.compute_fielddiff(a, b, "TMP"))):
+        sec, peak = _measure(fn, h, r, args.calls)
+        results[name] = sec, peak
+        print(f"{name:18s} {1000 * sec:8.1f} ms/call   peak {peak / 2**20:8.1f} MB")
+    (t_ref, m_ref), (t_new, m_new) = results.values()
+    print(f"speedup {t_ref / t_new:.2f}x, peak memory {m_ref / m_new:.1f}x lower")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Regridding throughput: one weight application per field vs. one CSR matmul per stack.
+
+Regrids a stack of synthetic analysis fields (RTMA -> HRRR sized grids by
+default) with bilinear-shaped weights and prints fields per second for the
+per-field loop, the stacked matmul in float64 and float32, and the stacked
+float32 matmul on several threads. With xESMF installed, ``xe.Regridder``
+is timed on the same weights and its output compared.
+
+    python -m benchmarks.bench_regrid --source rtma --target hrrr --fields 8 --threads 4
+"""
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks import suite
+from comparator import regrid as rg
+
+
+def _timed(fn, repeat):
+    fn()  # warm-up
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def _xesmf(weights, src, tgt, stack):
+    """Per-field ``xe.Regridder`` time and result on *weights*, or None without ESMF."""
+    try:
+        import xesmf as xe
+    except Exception:  # ESMF is a compiled dependency; may be absent
+        return None
+    regridder = xe.Regridder(
+        {"lon": src["longitude"], "lat": src["latitude"]},
+        {"lon": tgt["longitude"], "lat": tgt["latitude"]},
+        "bilinear", weights=weights,
+    )
+    fields = [src.copy(data=f) for f in stack]
+    return lambda: np.stack([regridder(f).values for f in fields])
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--source", default="rtma", choices=sorted(suite.GRIDS))
+    p.add_argument("--target", default="hrrr", choices=sorted(suite.GRIDS))
+    p.add_argument("--fields", type=int, default=8, help="fields regridded together")
+    p.add_argument("--threads", type=int, default=4)
+    p.add_argument("--repeat", type=int, default=3)
+    args = p.parse_args(argv)
+
+    src, _ = suite.synthetic_fields(args.source)
+    tgt, _ = suite.synthetic_fields(args.target)
+    src_shape = rg._grid_shape(src["longitude"], src["latitude"])
+    tgt_shape = rg._grid_shape(tgt["longitude"], tgt["latitude"])
+    weights = suite.synthetic_weights(src_shape, tgt_shape)
+    stack = np.stack([src.values + k for k in range(args.fields)])  # float32, as decoded
+    print(f"{args.source} {src_shape} -> {args.target} {tgt_shape}: {args.fields} fields, "
+          f"{weights.nnz / 1e6:.1f}M weights")
+
+    f64 = rg.SparseRegridder(weights, src_shape, tgt["longitude"], tgt["latitude"], threads=1)
+    f32 = f64.astype(np.float32)
+    f32_mt = rg.SparseRegridder(weights, src_shape, tgt["longitude"], tgt["latitude"],
+                                dtype=np.float32, threads=args.threads)
+    reference = f64.apply(stack)
+    cases = {
+        "per field, float64": lambda: np.stack([f64.apply(f) for f in stack]),
+        "stacked, float64": lambda: f64.apply(stack),
+        "stacked, float32": lambda: f32.apply(stack),
+        f"stacked, float32, {args.threads} threads": lambda: f32_mt.apply(stack),
+    }
+    xesmf_run = _xesmf(weights, src, tgt, stack)
+    if xesmf_run is not None:
+        cases = {"xe.Regridder per field": xesmf_run, **cases}
+
+    base = None
+    for name, fn in cases.items():
+        sec = _timed(fn, args.repeat)
+        err = np.nanmax(np.abs(fn() - reference))
+        base = base or sec
+        print(f"{name:32s} {args.fields / sec:8.1f} fields/s  {1000 * sec / args.fields:8.1f} ms/field"
+              f"  {base / sec:5.2f}x  max |diff| {err:.2e}")
+    if xesmf_run is None:
+        print("xe.Regridder skipped: xESMF/ESMF not installed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Stats-only throughput: difference + scores per frame, in frames per second.
+
+Uses synthetic HRRR-sized fields (1059 x 1799), so no downloads are needed.
+With --render the same frames are also drawn and saved the way the normal
+flow does (needs the Natural Earth shapefiles) for comparison.
+
+    python -m benchmarks.bench_stats_only --frames 50 [--render]
+"""
+import argparse
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import xarray as xr
+
+from comparator import fielddiff as fd
+from comparator import stats
+
+CYCLE = datetime(2026, 2, 1, 12)
+
+
+def _fields(ny=1059, nx=1799, seed=0):
+    rng = np.random.default_rng(seed)
+    lon, lat = np.meshgrid(np.linspace(-134, -60, nx), np.linspace(21, 53, ny))
+    coords = {"longitude": (("y", "x"), lon), "latitude": (("y", "x"), lat)}
+    anl = 280.0 + 10 * np.cos(np.radians(lat) * 4)
+    nwp = anl + rng.normal(0.3, 1.5, size=anl.shape)
+    return (xr.DataArray(nwp.astype(np.float32), dims=("y", "x"), coords=coords),
+            xr.DataArray(anl.astype(np.float32), dims=("y", "x"), coords=coords))
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--frames", type=int, default=50)
+    p.add_argument("--render", action="store_true")
+    args = p.parse_args(argv)
+
+    nwp, anl = _fields()
+    t0 = time.perf_counter()
+    for fxx in range(args.frames):
+        diff = fd.compute_fielddiff(nwp, anl, "TMP")
+        stats.stats_row(diff, "hrrr", "TMP", "rtma", CYCLE, fxx)
+    elapsed = time.perf_counter() - t0
+    plotting_loaded = any(m in sys.modules for m in ("matplotlib", "cartopy"))
+    print(f"stats-only: {args.frames / elapsed:.1f} frames/s "
+          f"({1000 * elapsed / args.frames:.1f} ms/frame; plotting stack loaded: {plotting_loaded})")
+
+    if args.render:
+        import new_comparison
+
+        n = max(1, min(args.frames, 5))
+        with tempfile.TemporaryDirectory() as out_dir:
+            t0 = time.perf_counter()
+            for fxx in range(n):
+                diff = fd.compute_fielddiff(nwp, anl, "TMP")
+                stats.stats_row(diff, "hrrr", "TMP", "rtma", CYCLE, fxx)
+                new_comparison._save_comparison_plot(
+                    nwp["longitude"], nwp["latitude"], diff,
+                    "hrrr", "TMP", "rtma", CYCLE, fxx, out_dir,
+                )
+            elapsed = time.perf_counter() - t0
+        print(f"with render: {n / elapsed:.2f} frames/s ({elapsed / n:.2f} s/frame)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,415 @@
+"""Per-stage benchmarks at real grid sizes, recorded to / compared with a JSON baseline.
+
+Builds synthetic fields on HRRR, NBM, NAM12k, GFS and RTMA sized grids (no
+downloads) and times each pipeline stage on its own: regridder build and
+apply, a batched sparse regrid of several fields, compute_fielddiff, WIND
+derivation from U/V, airport sampling, map render + savefig, and GIF
+encoding. For every stage the median wall time and the peak traced memory
+(tracemalloc, which numpy reports its buffers to) are recorded. Stages whose
+dependencies are missing (xESMF/ESMF, Natural Earth shapefiles) are reported
+as skipped.
+
+    python -m benchmarks.suite --output bench.json        # record a baseline
+    python -m benchmarks.suite --baseline bench.json      # exit 1 on regressions
+    python -m benchmarks.suite --grids hrrr,gfs --stages fielddiff,wind --repeat 5
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+import xarray as xr
+
+
+class GridSpec(NamedTuple):
+    """Synthetic grid: Lambert conformal (*res* km) or global lat/lon (*res* deg)."""
+
+    kind: str
+    ny: int
+    nx: int
+    res: float
+    lon0: float = 0.0
+    lat0: float = 0.0
+
+
+GRIDS = {
+    "hrrr": GridSpec("lcc", 1059, 1799, 3.0, -97.5, 38.5),
+    "nbm": GridSpec("lcc", 1597, 2345, 2.54, -95.0, 38.0),
+    "nam12k": GridSpec("lcc", 428, 614, 12.19, -107.0, 45.0),
+    "gfs": GridSpec("latlon", 721, 1440, 0.25),
+    "rtma": GridSpec("lcc", 1597, 2345, 2.54, -95.0, 38.0),
+}
+ANALYSIS_GRID = "rtma"  # source grid of the regrid stages
+
+# Fields regridded together by the regrid_sparse stage (e.g. 4 variables x 2 hours)
+REGRID_FIELDS = 8
+
+# Frame size of the GIF stage (a 150 dpi comparison PNG)
+GIF_FRAMES, GIF_SIZE = 12, (1800, 1000)
+
+_EARTH_RADIUS_KM = 6371.0
+_CYCLE = datetime(2026, 2, 1, 12)
+
+
+def grid_lonlat(spec: GridSpec):
+    """Longitude/latitude arrays of *spec*: 2-D for lcc, 1-D for latlon."""
+    if spec.kind == "latlon":
+        lat = 90.0 - spec.res * np.arange(spec.ny)
+        lon = -180.0 + spec.res * np.arange(spec.nx)
+        return lon, lat
+    # Spherical Lambert conformal, tangent at lat0, centred on (lon0, lat0)
+    phi0 = np.radians(spec.lat0)
+    n = np.sin(phi0)
+    f = np.cos(phi0) * np.tan(np.pi / 4 + phi0 / 2) ** n / n
+    rho0 = f / np.tan(np.pi / 4 + phi0 / 2) ** n
+    step = spec.res / _EARTH_RADIUS_KM
+    x = (np.arange(spec.nx) - (spec.nx - 1) / 2) * step
+    y = (np.arange(spec.ny) - (spec.ny - 1) / 2) * step
+    x, y = np.meshgrid(x, y)
+    rho = np.hypot(x, rho0 - y)
+    lat = np.degrees(2 * np.arctan((f / rho) ** (1 / n)) - np.pi / 2)
+    lon = spec.lon0 + np.degrees(np.arctan2(x, rho0 - y) / n)
+    return lon, lat
+
+
+def synthetic_fields(name, seed=0):
+    """(nwp, anl) 2 m temperature DataArrays (K, float32) on grid *name*."""
+    lon, lat = grid_lonlat(GRIDS[name])
+    if lon.ndim == 1:
+        dims = ("latitude", "longitude")
+        coords = {"latitude": lat, "longitude": lon}
+        lon, lat = np.meshgrid(lon, lat)
+    else:
+        dims = ("y", "x")
+        coords = {"longitude": (dims, lon), "latitude": (dims, lat)}
+    rng = np.random.default_rng(seed)
+    anl = 300.0 - 0.6 * np.abs(lat) + 5 * np.sin(np.radians(lon) * 3)
+    nwp = anl + rng.normal(0.3, 1.5, size=anl.shape)
+    return (xr.DataArray(nwp.astype(np.float32), dims=dims, coords=coords, name="t2m"),
+            xr.DataArray(anl.astype(np.float32), dims=dims, coords=coords, name="t2m"))
+
+
+class Skip(Exception):
+    """A stage cannot run here (missing optional dependency or data)."""
+
+
+class Stage(NamedTuple):
+    setup: object  # (grid_name, tmp_dir) -> zero-argument callable to time
+    per_grid: bool = True
+    heavy: bool = False  # no warm-up and a single timed run (e.g. weight generation)
+
+
+def _xesmf():
+    try:
+        from comparator import regrid as rg
+
+        import xesmf  # noqa: F401
+    except Exception as e:  # ESMF is a compiled dependency; may be absent
+        raise Skip(f"xESMF unavailable ({e})") from None
+    return rg
+
+
+def _setup_regrid_build(name, tmp):
+    rg = _xesmf()
+    src, _ = synthetic_fields(ANALYSIS_GRID)
+    tgt, _ = synthetic_fields(name)
+    calls = iter(range(1_000_000))
+
+    def run():
+        path = Path(tmp) / f"weights_{name}_{next(calls)}.nc"  # never reuse
+        rg._build_regridder(
+            {"lon": src["longitude"], "lat": src["latitude"]},
+            {"lon": tgt["longitude"], "lat": tgt["latitude"]},
+            "bilinear", path,
+        )
+    return run
+
+
+def _setup_regrid_apply(name, tmp):
+    rg = _xesmf()
+    src, _ = synthetic_fields(ANALYSIS_GRID)
+    tgt, _ = synthetic_fields(name)
+    regridder = rg._build_regridder(
+        {"lon": src["longitude"], "lat": src["latitude"]},
+        {"lon": tgt["longitude"], "lat": tgt["latitude"]},
+        "bilinear", Path(tmp) / f"weights_{name}_apply.nc",
+    )
+    return lambda: regridder(src).values
+
+
+def synthetic_weights(src_shape, tgt_shape):
+    """CSR matrix shaped like bilinear weights (4 per target cell), no ESMF needed.
+
+    Target cells map linearly onto source index space, so rows touch
+    neighbouring source cells the way real grid-to-grid weights do.
+    """
+    import scipy.sparse as sp
+
+    (ny_s, nx_s), (ny_t, nx_t) = src_shape, tgt_shape
+    fy = np.repeat(np.arange(ny_t) * (ny_s - 1) / max(ny_t - 1, 1), nx_t)
+    fx = np.tile(np.arange(nx_t) * (nx_s - 1) / max(nx_t - 1, 1), ny_t)
+    y0 = np.minimum(fy.astype(np.int64), ny_s - 2)
+    x0 = np.minimum(fx.astype(np.int64), nx_s - 2)
+    dy, dx = fy - y0, fx - x0
+    corner = y0 * nx_s + x0
+    cols = np.stack([corner, corner + 1, corner + nx_s, corner + nx_s + 1], axis=1)
+    vals = np.stack([(1 - dy) * (1 - dx), (1 - dy) * dx, dy * (1 - dx), dy * dx], axis=1)
+    rows = np.repeat(np.arange(ny_t * nx_t), 4)
+    return sp.csr_matrix((vals.ravel(), (rows, cols.ravel())), shape=(ny_t * nx_t, ny_s * nx_s))
+
+
+def _setup_regrid_sparse(name, tmp):
+    from comparator import regrid as rg
+
+    src, _ = synthetic_fields(ANALYSIS_GRID)
+    tgt, _ = synthetic_fields(name)
+    src_shape = rg._grid_shape(src["longitude"], src["latitude"])
+    tgt_shape = rg._grid_shape(tgt["longitude"], tgt["latitude"])
+    regridder = rg.SparseRegridder(
+        synthetic_weights(src_shape, tgt_shape), src_shape,
+        tgt["longitude"], tgt["latitude"], dtype=np.float32,
+    )
+    stack = np.stack([src.values + k for k in range(REGRID_FIELDS)])
+    return lambda: regridder.apply(stack)
+
+
+def _setup_fielddiff(name, tmp):
+    from comparator.fielddiff import compute_fielddiff
+
+    nwp, anl = synthetic_fields(name)
+    return lambda: compute_fielddiff(nwp, anl, "TMP")
+
+
+def _setup_wind(name, tmp):
+    from comparator.normalize import resolve_field_da
+
+    nwp, anl = synthetic_fields(name)
+    ds = xr.Dataset({"u10": (nwp - 280.0) * 0.5, "v10": (anl - 280.0) * 0.5})
+    return lambda: resolve_field_da(ds, "WIND").values
+
+
+def _plotting(tmp):
+    try:
+        from comparator import plotting
+    except Exception as e:
+        raise Skip(f"plotting stack unavailable ({e})") from None
+    plotting.BASEMAP_CACHE_DIR = Path(tmp) / "basemap"
+    return plotting
+
+
+def _setup_station_sample(name, tmp):
+    from comparator import stations
+    from comparator.util import major_airports_df
+
+    plotting = _plotting(tmp)
+    nwp, anl = synthetic_fields(name)
+    diff = nwp - anl
+    ap = major_airports_df()
+    lon2, lat2 = plotting._to_2d_lonlat(nwp["longitude"], nwp["latitude"])
+    # the index is built once per grid (see station_index); frames only gather
+    stations.get_station_index(lon2, lat2, ap.lon.values, ap.lat.values,
+                               cache_dir=Path(tmp) / "stations")
+    return lambda: plotting._nearest_values_on_geo_grid(
+        nwp["longitude"], nwp["latitude"], diff, ap.lon.values, ap.lat.values
+    )
+
+
+def _setup_station_index(name, tmp):
+    from comparator import stations
+    from comparator.util import major_airports_df
+
+    nwp, _ = synthetic_fields(name)
+    lon, lat = nwp["longitude"].values, nwp["latitude"].values
+    if lon.ndim == 1:
+        lon, lat = np.meshgrid(lon, lat)
+    ap = major_airports_df()
+
+    def run():
+        stations.clear_station_index_cache()
+        stations.get_station_index(lon, lat, ap.lon.values, ap.lat.values,
+                                   cache_dir=tempfile.mkdtemp(dir=tmp))  # cold: no .npz
+    return run
+
+
+def _setup_render(name, tmp):
+    from comparator import normalize as norm
+    from comparator.fielddiff import compute_fielddiff
+    from comparator.util import major_airports_df
+
+    plotting = _plotting(tmp)
+    import matplotlib.pyplot as plt
+
+    nwp, anl = synthetic_fields(name)
+    diff = compute_fielddiff(nwp, anl, "TMP")
+    meta = norm.VAR_REGISTRY["TMP"]
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")  # Cartopy's DownloadWarning
+            plotting._basemap_layers(plotting.CONUS_PROJ)
+    except Exception as e:  # Natural Earth shapefiles are downloaded on first use
+        raise Skip(f"basemap unavailable ({type(e).__name__}: {e})") from None
+
+    def run():
+        fig, _ = plotting.plot_tempdiff_map_with_table(
+            nwp["longitude"], nwp["latitude"], diff,
+            _CYCLE + timedelta(hours=6), _CYCLE, 6, name, major_airports_df(),
+            plot_meta=meta, var_title=meta["title"], var_cmap=meta["cmap"],
+        )
+        fig.savefig(Path(tmp) / f"{name}.png", dpi=150, bbox_inches="tight")
+        plt.close(fig)
+    return run
+
+
+def _setup_gif(name, tmp):
+    from PIL import Image
+
+    from comparator.build_gif import create_gif
+
+    rng = np.random.default_rng(0)
+    base = rng.integers(0, 255, size=(GIF_SIZE[1] // 8, GIF_SIZE[0] // 8, 3), dtype=np.uint8)
+    paths = []
+    for i in range(GIF_FRAMES):
+        frame = np.roll(base, i, axis=1).repeat(8, axis=0).repeat(8, axis=1)
+        path = Path(tmp) / f"frame_{i:02d}.png"
+        Image.fromarray(frame).save(path)
+        paths.append(path)
+    return lambda: create_gif(paths, Path(tmp) / "bench.gif")
+
+
+STAGES = {
+    "regrid_build": Stage(_setup_regrid_build, heavy=True),
+    "regrid_apply": Stage(_setup_regrid_apply),
+    "regrid_sparse": Stage(_setup_regrid_sparse),
+    "fielddiff": Stage(_setup_fielddiff),
+    "wind": Stage(_setup_wind),
+    "station_index": Stage(_setup_station_index, heavy=True),
+    "station_sample": Stage(_setup_station_sample),
+    "render": Stage(_setup_render),
+    "gif": Stage(_setup_gif, per_grid=False),
+}
+
+
+def measure(fn, repeat=3, heavy=False) -> dict:
+    """Median wall time over *repeat* runs (after a warm-up) and the peak traced memory."""
+    if heavy:
+        repeat = 1
+    else:
+        fn()  # warm-up: lazy imports, caches
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {"seconds": statistics.median(times), "min_seconds": min(times),
+            "peak_mb": peak / 2**20, "runs": repeat}
+
+
+def run_suite(grids, stages, repeat=3, log=print) -> dict:
+    """Run *stages* on *grids*; returns the JSON-ready result document."""
+    results, skipped = {}, {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for stage_name in stages:
+            stage = STAGES[stage_name]
+            for grid in (grids if stage.per_grid else ["-"]):
+                key = f"{stage_name}/{grid}" if stage.per_grid else stage_name
+                try:
+                    fn = stage.setup(grid, tmp)
+                    results[key] = measure(fn, repeat, stage.heavy)
+                except Skip as e:
+                    skipped[key] = str(e)
+                    log(f"{key:28s} skipped: {e}")
+                    continue
+                r = results[key]
+                log(f"{key:28s} {1000 * r['seconds']:10.1f} ms  {r['peak_mb']:8.1f} MB")
+    return {
+        "meta": {
+            "created": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "xarray": xr.__version__,
+            "machine": platform.machine(),
+            "repeat": repeat,
+            "grids": {g: list(GRIDS[g][1:3]) for g in grids},
+        },
+        "results": results,
+        "skipped": skipped,
+    }
+
+
+def compare(results: dict, baseline: dict, time_tol=0.25, mem_tol=0.25, min_seconds=0.005) -> list:
+    """Stages slower or hungrier than *baseline* allows: ``[(key, metric, base, new)]``.
+
+    Time regresses when it grows by more than *time_tol* (relative) and by
+    more than *min_seconds*, so millisecond stages don't flag on timer
+    noise; peak memory when it grows by more than *mem_tol*. Stages missing
+    from either side are ignored.
+    """
+    flagged = []
+    base_results = baseline.get("results", {})
+    for key, new in results.get("results", {}).items():
+        old = base_results.get(key)
+        if old is None:
+            continue
+        if (new["seconds"] > old["seconds"] * (1 + time_tol)
+                and new["seconds"] - old["seconds"] > min_seconds):
+            flagged.append((key, "seconds", old["seconds"], new["seconds"]))
+        if new["peak_mb"] > old["peak_mb"] * (1 + mem_tol) and new["peak_mb"] - old["peak_mb"] > 1.0:
+            flagged.append((key, "peak_mb", old["peak_mb"], new["peak_mb"]))
+    return flagged
+
+
+def _names(value, known, what):
+    names = list(known) if value == "all" else [v.strip().lower() for v in value.split(",") if v.strip()]
+    unknown = [n for n in names if n not in known]
+    if unknown:
+        raise SystemExit(f"Unknown {what}: {', '.join(unknown)} (choose from {', '.join(known)})")
+    return names
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--grids", default="all", help=f"comma-separated: {', '.join(GRIDS)}")
+    p.add_argument("--stages", default="all", help=f"comma-separated: {', '.join(STAGES)}")
+    p.add_argument("--repeat", type=int, default=3)
+    p.add_argument("--output", help="write the results (a new baseline) to this JSON file")
+    p.add_argument("--baseline", help="compare with this JSON file; exit 1 on regressions")
+    p.add_argument("--time-tolerance", type=float, default=0.25)
+    p.add_argument("--mem-tolerance", type=float, default=0.25)
+    args = p.parse_args(argv)
+
+    grids = _names(args.grids, GRIDS, "grid")
+    stages = _names(args.stages, STAGES, "stage")
+    doc = run_suite(grids, stages, max(1, args.repeat))
+    if args.output:
+        Path(args.output).write_text(json.dumps(doc, indent=2) + "\n")
+        print(f"Results written to {args.output}")
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        flagged = compare(doc, baseline, args.time_tolerance, args.mem_tolerance)
+        for key, metric, old, new in flagged:
+            unit = "ms" if metric == "seconds" else "MB"
+            scale = 1000 if metric == "seconds" else 1
+            print(f"REGRESSION {key} {metric}: {old * scale:.1f} -> {new * scale:.1f} {unit} "
+                  f"({new / old:.2f}x)")
+        if flagged:
+            sys.exit(1)
+        print(f"No regressions against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
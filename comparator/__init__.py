@@ -1,9 +1,60 @@
-import os as _os
-if not _os.environ.get("DISPLAY") and not _os.environ.get("WAYLAND_DISPLAY"):
-    import matplotlib as _mpl
-    _mpl.use("Agg")
-
-from .fielddiff import compute_fielddiff
-from .plotting import plot_tempdiff_map_with_table, plot_airports
-from .util import major_airports_df
-from .normalize import normalize_model_key, normalize_verif_key, herbie_kwargs_for, normalize_var_key, pick_data_varname_from_ds, get_selector, get_xarray_kwargs, wrap_longitude, ensure_dataset, find_runs_for_valid_time
\ No newline at end of file
+import importlib
+import sys
+import threading
+import types
+
+# Importing the package (or any submodule, which imports the package first)
+# must stay cheap: CLI prompts, batch parsing and spawned workers should not
+# pay for xarray/pandas (fielddiff, util) or matplotlib + Cartopy (plotting)
+# until they actually use them. Re-exported names are resolved on first use.
+_LAZY_NAMES = {
+    "compute_fielddiff": "fielddiff",
+    "major_airports_df": "util",
+    "plot_tempdiff_map_with_table": "plotting",
+    "plot_airports": "plotting",
+    **{
+        name: "normalize"
+        for name in (
+            "normalize_model_key", "normalize_verif_key", "herbie_kwargs_for", "normalize_var_key",
+            "pick_data_varname_from_ds", "get_selector", "get_xarray_kwargs", "wrap_longitude",
+            "ensure_dataset", "find_runs_for_valid_time",
+        )
+    },
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_NAMES:
+        module = importlib.import_module(f".{_LAZY_NAMES[name]}", __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_NAMES))
+
+
+class _LazyModule(types.ModuleType):
+    """Stand-in for a module that is imported on its first attribute access."""
+
+    def __init__(self, name):
+        super().__init__(name)
+        object.__setattr__(self, "_lock", threading.Lock())
+
+    def _load(self):
+        with self._lock:  # GIF/batch threads may touch it first at the same time
+            return importlib.import_module(self.__name__)
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+
+def lazy_import(name):
+    """Return module *name*, deferring its import until an attribute is used.
+
+    Already-imported modules are returned as they are.
+    """
+    return sys.modules.get(name) or _LazyModule(name)
@@ -0,0 +1,300 @@
+import os
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+
+from .regrid import grid_fingerprint
+
+# Long-period verification archive built from additive accumulators.
+# Each comparison (model, variable, verification, cycle, fxx) adds one small
+# increment file holding counts, sums, sums of squares, sums of |error|, a
+# histogram and, optionally, the same sums per grid cell:
+#   {root}/{model}/{verif}/{var}/{valid:%Y/%m/%d}/c{cycle:%Y%m%d%H}_f{fxx:03d}.npz
+# Sums merge by addition, so any window / lead time / hour-of-day selection is
+# answered by adding the matching increments: no GRIB file is read again, and
+# adding a new day only costs that day's comparisons. Writers never share a
+# file (one per cycle + fxx, written atomically), so parallel runs and
+# re-runs are safe; re-adding a comparison replaces its increment.
+ARCHIVE_DIR = Path("./data/archive")
+
+# Histogram edges per variable (difference units, see fielddiff.DIFF_UNITS).
+# Values beyond the outer edges land in an under/overflow bin at each end.
+HIST_EDGES = {
+    "TMP": np.arange(-30.0, 30.25, 0.5),
+    "DPT": np.arange(-30.0, 30.25, 0.5),
+    "VIS": np.arange(-10.0, 10.125, 0.25),
+    "WIND": np.arange(-40.0, 40.25, 0.5),
+    "GUST": np.arange(-40.0, 40.25, 0.5),
+}
+
+class Accumulator:
+    """Additive error statistics for one or more difference fields.
+
+    Domain scalars (count, sum, sumsq, sumabs, min, max, histogram) are always
+    kept; per-cell maps (grid_count, grid_sum, grid_sumsq) only when
+    *gridded*. Combine accumulators with ``+`` / ``merge``; ``scores()`` and
+    ``maps()`` turn the sums into bias, MAE, RMSE, error std, percentiles.
+    """
+
+    def __init__(self, edges, grid=None):
+        self.edges = np.asarray(edges, dtype=np.float64)
+        self.count = 0
+        self.sum = 0.0
+        self.sumsq = 0.0
+        self.sumabs = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self.hist = np.zeros(len(self.edges) + 1, dtype=np.int64)
+        self.grid = grid  # fingerprint of the grid the maps live on
+        self.grid_count = self.grid_sum = self.grid_sumsq = None
+
+    @property
+    def gridded(self) -> bool:
+        return self.grid_count is not None
+
+    @classmethod
+    def from_diff(cls, diff, var_key="TMP", gridded=False, edges=None):
+        """Accumulate one difference field (NaN = no valid point)."""
+        vals = np.asarray(diff, dtype=np.float64)
+        edges = HIST_EDGES[var_key] if edges is None else edges
+        grid = None
+        if gridded:
+            grid = grid_fingerprint(diff["longitude"].values, diff["latitude"].values)
+        acc = cls(edges, grid=grid)
+        ok = np.isfinite(vals)
+        v = vals[ok]
+        if v.size:
+            acc.count = int(v.size)
+            acc.sum = float(v.sum())
+            acc.sumsq = float(np.dot(v, v))
+            acc.sumabs = float(np.abs(v).sum())
+            acc.min = float(v.min())
+            acc.max = float(v.max())
+            acc.hist = np.bincount(
+                np.searchsorted(acc.edges, v, side="right"), minlength=len(acc.edges) + 1
+            ).astype(np.int64)
+        if gridded:
+            filled = np.where(ok, vals, 0.0)
+            acc.grid_count = ok.astype(np.int32)
+            acc.grid_sum = filled
+            acc.grid_sumsq = filled * filled
+        return acc
+
+    def merge(self, other: "Accumulator") -> "Accumulator":
+        """Add *other* into this accumulator in place; returns self."""
+        if not np.array_equal(self.edges, other.edges):
+            raise ValueError("Cannot merge accumulators with different histogram edges")
+        if other.gridded:
+            if self.gridded and self.grid != other.grid:
+                raise ValueError("Cannot merge gridded accumulators on different grids")
+            if not self.gridded and self.count:
+                # the maps would not cover what the scalars already hold
+                raise ValueError("Cannot add gridded increments to a non-empty ungridded accumulator")
+        elif self.gridded and other.count:
+            raise ValueError("Cannot add an ungridded increment to a gridded accumulator")
+        self.count += other.count
+        self.sum += other.sum
+        self.sumsq += other.sumsq
+        self.sumabs += other.sumabs
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.hist = self.hist + other.hist
+        if other.gridded:
+            if not self.gridded:
+                self.grid = other.grid
+                self.grid_count = other.grid_count.astype(np.int32, copy=True)
+                self.grid_sum = other.grid_sum.astype(np.float64, copy=True)
+                self.grid_sumsq = other.grid_sumsq.astype(np.float64, copy=True)
+            else:
+                self.grid_count += other.grid_count
+                self.grid_sum += other.grid_sum
+                self.grid_sumsq += other.grid_sumsq
+        return self
+
+    def __add__(self, other):
+        return self.copy().merge(other)
+
+    def copy(self) -> "Accumulator":
+        out = Accumulator(self.edges, grid=self.grid)
+        out.merge(self)
+        return out
+
+    def percentile(self, q) -> np.ndarray:
+        """Approximate percentiles from the histogram (linear within a bin)."""
+        q = np.atleast_1d(np.asarray(q, dtype=np.float64))
+        if self.count == 0:
+            return np.full(q.shape, np.nan)
+        # bin i covers [lo[i], hi[i]); the outer bins are bounded by min/max
+        lo = np.concatenate([[self.min], self.edges])
+        hi = np.concatenate([self.edges, [self.max]])
+        lo = np.clip(lo, self.min, self.max)
+        hi = np.clip(hi, self.min, self.max)
+        cum = np.cumsum(self.hist)
+        target = q / 100.0 * self.count
+        i = np.minimum(np.searchsorted(cum, target, side="left"), len(cum) - 1)
+        before = np.where(i > 0, cum[i - 1], 0)
+        frac = np.where(self.hist[i] > 0, (target - before) / np.maximum(self.hist[i], 1), 0.0)
+        return lo[i] + np.clip(frac, 0.0, 1.0) * (hi[i] - lo[i])
+
+    def scores(self, percentiles=(5, 25, 50, 75, 95)) -> dict:
+        """Domain scores in the layout of stats.compute_stats."""
+        from .stats import stat_columns
+
+        if self.count == 0:
+            out = dict.fromkeys(stat_columns(percentiles), np.nan)
+            out["count"] = 0
+            return out
+        n = self.count
+        bias = self.sum / n
+        mse = self.sumsq / n
+        out = {
+            "count": int(n),
+            "bias": bias,
+            "mae": self.sumabs / n,
+            "rmse": float(np.sqrt(mse)),
+            "std": float(np.sqrt(max(mse - bias * bias, 0.0))),
+            "min": self.min,
+            "max": self.max,
+        }
+        if len(percentiles):
+            names = stat_columns(percentiles)[-len(percentiles):]
+            for name, p in zip(names, self.percentile(percentiles)):
+                out[name] = float(p)
+        return out
+
+    def maps(self) -> dict:
+        """Per-cell ``count``, ``bias``, ``rmse`` and ``std`` arrays (NaN where count is 0)."""
+        if not self.gridded:
+            raise ValueError("Accumulator has no gridded maps")
+        n = self.grid_count.astype(np.float64)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            bias = np.where(n > 0, self.grid_sum / n, np.nan)
+            mse = np.where(n > 0, self.grid_sumsq / n, np.nan)
+        return {
+            "count": self.grid_count,
+            "bias": bias,
+            "rmse": np.sqrt(mse),
+            "std": np.sqrt(np.maximum(mse - bias * bias, 0.0)),
+        }
+
+    def to_npz(self, path):
+        arrays = {
+            "edges": self.edges, "hist": self.hist,
+            "minmax": np.array([self.min, self.max]),
+            "scalars": np.array([self.count, self.sum, self.sumsq, self.sumabs], dtype=np.float64),
+        }
+        if self.gridded:
+            arrays.update(
+                grid=np.array(self.grid),
+                grid_count=self.grid_count.astype(np.int32),
+                grid_sum=self.grid_sum.astype(np.float32),
+                grid_sumsq=self.grid_sumsq.astype(np.float32),
+            )
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.stem}.{os.getpid()}-{threading.get_ident()}.tmp.npz")
+        np.savez(tmp, **arrays)
+        os.replace(tmp, path)
+
+    @classmethod
+    def from_npz(cls, path, gridded=True) -> "Accumulator":
+        with np.load(path) as z:
+            acc = cls(z["edges"])
+            count, acc.sum, acc.sumsq, acc.sumabs = z["scalars"].tolist()
+            acc.count = int(count)
+            acc.min, acc.max = z["minmax"].tolist()
+            acc.hist = z["hist"]
+            if gridded and "grid" in z.files:
+                acc.grid = str(z["grid"])
+                acc.grid_count = z["grid_count"]
+                # stored as float32; sum in float64 like merge() does
+                acc.grid_sum = z["grid_sum"].astype(np.float64)
+                acc.grid_sumsq = z["grid_sumsq"].astype(np.float64)
+        return acc
+
+
+class AccumulatorStore:
+    """On-disk archive of per-comparison increments under *root*.
+
+    *gridded* makes ``add`` store per-cell maps as well as domain scalars
+    (about 12 bytes per grid cell per comparison).
+    """
+
+    def __init__(self, root=ARCHIVE_DIR, gridded=False):
+        self.root = Path(root)
+        self.gridded = gridded
+
+    def _dir(self, model_key, var_key, verif_key) -> Path:
+        return self.root / model_key / verif_key / var_key
+
+    def increment_path(self, model_key, var_key, verif_key, cycle_dt, fxx) -> Path:
+        valid = cycle_dt + timedelta(hours=int(fxx))
+        return (
+            self._dir(model_key, var_key, verif_key) / f"{valid:%Y/%m/%d}"
+            / f"c{cycle_dt:%Y%m%d%H}_f{int(fxx):03d}.npz"
+        )
+
+    def add(self, diff, model_key, var_key, verif_key, cycle_dt, fxx, gridded=None) -> Path:
+        """Accumulate one difference field; returns the increment path."""
+        gridded = self.gridded if gridded is None else gridded
+        path = self.increment_path(model_key, var_key, verif_key, cycle_dt, fxx)
+        Accumulator.from_diff(diff, var_key, gridded=gridded).to_npz(path)
+        return path
+
+    def increments(self, model_key, var_key, verif_key, start, end, fxx=None, hours=None):
+        """Yield ``(cycle_dt, fxx, path)`` for increments valid in [start, end).
+
+        *fxx* / *hours* (valid hour of day) may be an int or a collection.
+        Only the day directories inside the window are listed.
+        """
+        fxx_set = None if fxx is None else set(np.atleast_1d(fxx).tolist())
+        hour_set = None if hours is None else set(np.atleast_1d(hours).tolist())
+        base = self._dir(model_key, var_key, verif_key)
+        day = datetime(start.year, start.month, start.day)
+        while day < end:
+            day_dir = base / f"{day:%Y/%m/%d}"
+            if day_dir.is_dir():
+                for path in sorted(day_dir.glob("c*_f*.npz")):
+                    cycle_s, fxx_s = path.stem[1:].split("_f")
+                    cycle_dt = datetime.strptime(cycle_s, "%Y%m%d%H")
+                    lead = int(fxx_s)
+                    valid = cycle_dt + timedelta(hours=lead)
+                    if not (start <= valid < end):
+                        continue
+                    if fxx_set is not None and lead not in fxx_set:
+                        continue
+                    if hour_set is not None and valid.hour not in hour_set:
+                        continue
+                    yield cycle_dt, lead, path
+            day += timedelta(days=1)
+
+    def query(self, model_key, var_key, verif_key, start, end, fxx=None, hours=None, gridded=False):
+        """Merge every matching increment into one Accumulator (None if there are none).
+
+        Increments are read one at a time, so memory stays at one accumulator
+        however long the window is.
+        """
+        total = None
+        for _, _, path in self.increments(model_key, var_key, verif_key, start, end, fxx, hours):
+            acc = Accumulator.from_npz(path, gridded=gridded)
+            if gridded and not acc.gridded:
+                continue  # scalar-only increment: no map to contribute
+            total = acc if total is None else total.merge(acc)
+        return total
+
+    def summarize(self, model_key, var_key, verif_key, start, end, by="fxx", hours=None, fxx=None):
+        """Domain scores for [start, end) grouped by ``"fxx"`` or ``"hour"``; a list of dicts."""
+        if by not in ("fxx", "hour"):
+            raise ValueError(f"Unknown grouping {by!r}; expected 'fxx' or 'hour'")
+        groups = {}
+        for cycle_dt, lead, path in self.increments(model_key, var_key, verif_key, start, end, fxx, hours):
+            key = lead if by == "fxx" else (cycle_dt + timedelta(hours=lead)).hour
+            acc = Accumulator.from_npz(path, gridded=False)
+            groups[key] = acc if key not in groups else groups[key].merge(acc)
+        return [
+            {"model": model_key, "variable": var_key, "verification": verif_key,
+             by: key, **groups[key].scores()}
+            for key in sorted(groups)
+        ]
@@ -0,0 +1,291 @@
+import json
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import NamedTuple
+
+import yaml
+
+from . import normalize as norm
+from .domain import parse_domain
+from .sources import parse_sources
+
+
+class Job(NamedTuple):
+    """One NWP-vs-analysis comparison in a batch matrix."""
+    model_key: str
+    var_key: str
+    verif_key: str
+    cycle_dt: datetime
+    fxx: int
+
+    @property
+    def valid_dt(self) -> datetime:
+        return self.cycle_dt + timedelta(hours=self.fxx)
+
+
+class TaskSkipped(Exception):
+    """Raised by a task when its input data is unavailable (not an error)."""
+
+
+### Config loading & job-matrix expansion
+def load_config(path) -> dict:
+    """Read a YAML batch config (see config.example.yaml)."""
+    with open(path) as f:
+        return yaml.safe_load(f) or {}
+
+
+def _as_list(value) -> list:
+    if value is None:
+        return []
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    return [value]
+
+
+def parse_time(value) -> datetime:
+    """Parse an ISO time ("2026-02-01T12:00Z") into a naive UTC datetime."""
+    if isinstance(value, datetime):
+        dt = value
+    else:
+        dt = datetime.fromisoformat(str(value).strip())
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+def _expand_times(spec) -> list[datetime]:
+    """Expand a time spec: one time, a list, or {start, end, step_hours}."""
+    if isinstance(spec, dict):
+        start = parse_time(spec["start"])
+        end = parse_time(spec.get("end", spec["start"]))
+        step = timedelta(hours=int(spec.get("step_hours", 1)))
+        out = []
+        t = start
+        while t <= end:
+            out.append(t)
+            t += step
+        return out
+    return [parse_time(v) for v in _as_list(spec)]
+
+
+def expand_jobs(config: dict) -> list[Job]:
+    """Expand a config into the models x variables x verification x times matrix.
+
+    ``time.valid_time`` selects every run covering each valid time (as GIF mode
+    does), optionally restricted by ``time.fxx``. ``time.cycles`` with
+    ``time.fxx`` selects explicit (cycle, forecast hour) pairs instead.
+    Duplicate jobs are dropped; order follows the config.
+    """
+    models = [norm.normalize_model_key(m) for m in _as_list(config.get("models"))]
+    variables = [
+        norm.normalize_var_key(v)
+        for v in _as_list(config.get("variables", config.get("variable")))
+    ]
+    verifs = [
+        norm.normalize_verif_key(v)
+        for v in _as_list(config.get("verification", "rtma"))
+    ]
+    if not models or not variables:
+        raise ValueError("Batch config needs at least one entry in 'models' and 'variable(s)'.")
+
+    time_cfg = config.get("time") or {}
+    fxx_filter = {int(f) for f in _as_list(time_cfg.get("fxx"))}
+    valid_times = _expand_times(time_cfg.get("valid_time"))
+    cycles = _expand_times(time_cfg.get("cycles"))
+    if not valid_times and not cycles:
+        raise ValueError("Batch config 'time' needs 'valid_time' or 'cycles'.")
+    if cycles and not fxx_filter:
+        raise ValueError("Batch config 'time.cycles' requires 'time.fxx'.")
+
+    jobs = []
+    seen = set()
+    for model_key in models:
+        runs = []
+        for valid_dt in valid_times:
+            runs.extend(
+                (c, f) for c, f in norm.find_runs_for_valid_time(model_key, valid_dt)
+                if not fxx_filter or f in fxx_filter
+            )
+        runs.extend((c, f) for c in cycles for f in sorted(fxx_filter))
+        for var_key in variables:
+            for verif_key in verifs:
+                for cycle_dt, fxx in runs:
+                    job = Job(model_key, var_key, verif_key, cycle_dt, fxx)
+                    if job not in seen:
+                        seen.add(job)
+                        jobs.append(job)
+    return jobs
+
+
+def batch_settings(config: dict) -> dict:
+    """Return run settings (directories, parallelism, output paths, domain, stations, sources) with defaults."""
+    data = config.get("data") or {}
+    plot_cfg = config.get("plot") or {}
+    batch_cfg = config.get("batch") or {}
+    output_dir = Path(plot_cfg.get("output_dir", "./figures"))
+    return {
+        "cache_dir": Path(data.get("cache_dir", "./data")),
+        "output_dir": output_dir,
+        "max_workers": int(batch_cfg.get("max_workers", 4)),
+        "summary": batch_cfg.get("summary"),
+        "stats": Path(batch_cfg.get("stats", output_dir / "comparison_stats.csv")),
+        "render": bool(batch_cfg.get("render", True)),
+        "archive": Path(batch_cfg["archive"]) if batch_cfg.get("archive") else None,
+        "archive_maps": bool(batch_cfg.get("archive_maps", False)),
+        "domain": parse_domain(plot_cfg.get("domain", "conus")),
+        "stations": Path(plot_cfg["stations"]) if plot_cfg.get("stations") else None,
+        "sources": parse_sources(data.get("sources")),
+    }
+
+
+### Shared-work scheduler
+class TaskGraph:
+    """A deduplicating task graph run on a bounded thread pool.
+
+    Tasks are identified by a hashable *key*; adding a key twice is a no-op, so
+    work shared between jobs (a GRIB fetch, an analysis decode) runs once and
+    its result is fed to every dependent. Each task receives its dependencies'
+    results as positional arguments. Intermediate results are released as soon
+    as their last dependent finishes; results of leaf tasks are returned.
+    """
+
+    def __init__(self):
+        self._tasks = {}  # key -> (fn, deps, kind)
+
+    def __contains__(self, key):
+        return key in self._tasks
+
+    def __len__(self):
+        return len(self._tasks)
+
+    def add(self, key, fn, *deps, kind="default"):
+        """Register *fn* under *key* (unless already present) and return *key*."""
+        if key not in self._tasks:
+            missing = [d for d in deps if d not in self._tasks]
+            if missing:
+                raise KeyError(f"Unknown dependencies for {key!r}: {missing}")
+            self._tasks[key] = (fn, tuple(deps), kind)
+        return key
+
+    def kinds(self) -> list[str]:
+        """Sorted list of the task kinds present in the graph."""
+        return sorted({kind for _, _, kind in self._tasks.values()})
+
+    def count(self, kind) -> int:
+        """Number of distinct tasks of the given *kind*."""
+        return sum(1 for _, _, k in self._tasks.values() if k == kind)
+
+    def run(self, max_workers: int = 4, limits: dict | None = None):
+        """Execute every task; return (results, errors) for leaf tasks / failures.
+
+        *limits* caps concurrency per task kind (e.g. ``{"render": 1}`` keeps
+        matplotlib single-threaded) on top of the overall *max_workers*.
+        A task whose dependency failed is not run and inherits the error.
+        """
+        limits = limits or {}
+        dependents = {key: [] for key in self._tasks}
+        for key, (_, deps, _) in self._tasks.items():
+            for d in set(deps):
+                dependents[d].append(key)
+
+        pending_deps = {key: len(set(deps)) for key, (_, deps, _) in self._tasks.items()}
+        remaining_users = {key: len(users) for key, users in dependents.items()}
+        ready = [key for key, n in pending_deps.items() if n == 0]
+        values, errors = {}, {}
+        in_flight = {}  # future -> key
+        running = {}  # kind -> count
+
+        def _finish(key):
+            for user in dependents[key]:
+                pending_deps[user] -= 1
+                if pending_deps[user] == 0:
+                    ready.append(user)
+            _, deps, _ = self._tasks[key]
+            for d in set(deps):
+                remaining_users[d] -= 1
+                if remaining_users[d] == 0 and dependents[d]:
+                    values.pop(d, None)
+
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+            while ready or in_flight:
+                deferred = []
+                while ready:
+                    key = ready.pop(0)
+                    fn, deps, kind = self._tasks[key]
+                    failed = next((d for d in deps if d in errors), None)
+                    if failed is not None:
+                        errors[key] = errors[failed]
+                        _finish(key)
+                        continue
+                    if running.get(kind, 0) >= max(1, limits.get(kind, max_workers)):
+                        deferred.append(key)
+                        continue
+                    args = [values[d] for d in deps]
+                    running[kind] = running.get(kind, 0) + 1
+                    in_flight[pool.submit(fn, *args)] = key
+                ready.extend(deferred)
+                if not in_flight:
+                    continue
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    key = in_flight.pop(fut)
+                    kind = self._tasks[key][2]
+                    running[kind] -= 1
+                    try:
+                        values[key] = fut.result()
+                    except Exception as e:
+                        errors[key] = e
+                    _finish(key)
+
+        results = {key: values[key] for key in values if not dependents[key]}
+        return results, errors
+
+
+### Machine-readable summary
+def summarize(jobs, results: dict, errors: dict, job_key, elapsed_s: float, graph=None) -> dict:
+    """Build a JSON-serializable summary of a batch run.
+
+    *job_key* maps a Job to the key of its final task in *results*/*errors*.
+    """
+    rows = []
+    counts = {"ok": 0, "skipped": 0, "failed": 0}
+    for job in jobs:
+        key = job_key(job)
+        row = {
+            "model": job.model_key,
+            "variable": job.var_key,
+            "verification": job.verif_key,
+            "cycle": f"{job.cycle_dt:%Y-%m-%dT%H:%MZ}",
+            "fxx": job.fxx,
+            "valid": f"{job.valid_dt:%Y-%m-%dT%H:%MZ}",
+        }
+        if key in errors:
+            err = errors[key]
+            row["status"] = "skipped" if isinstance(err, TaskSkipped) else "failed"
+            row["error"] = str(err)
+        else:
+            row["status"] = "ok"
+            out = results.get(key)
+            # file outputs (frames) are reported; in-memory results (scores) are not
+            row["output"] = str(out) if isinstance(out, (str, os.PathLike)) else None
+        counts[row["status"]] += 1
+        rows.append(row)
+
+    summary = {"jobs": len(jobs), **counts, "elapsed_s": round(elapsed_s, 3)}
+    if graph is not None:
+        summary["tasks"] = {kind: graph.count(kind) for kind in graph.kinds()}
+    summary["results"] = rows
+    return summary
+
+
+def write_summary(summary: dict, path=None):
+    """Write *summary* as JSON to *path*, or to stdout when *path* is None."""
+    text = json.dumps(summary, indent=2)
+    if path is None:
+        print(text)
+    else:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        Path(path).write_text(text + "\n")
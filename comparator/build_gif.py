@@ -1,6 +1,295 @@
-from PIL import Image
+import os
+import shutil
+import struct
+import subprocess
 from pathlib import Path
 
+import numpy as np
+from PIL import GifImagePlugin, Image
+
+# Streaming animation encoders. Frames are added one at a time (from image
+# files, PIL images or matplotlib figures) and written out immediately, so
+# memory use does not grow with the number of frames.
+#   gif  - one global palette (taken from the first frame); a later frame the
+#          palette cannot represent (e.g. colormap extremes that first appear
+#          in it) gets its own local color table. Each later frame only
+#          stores the rectangle that changed, with unchanged pixels
+#          transparent, which keeps the LZW data small.
+#   webp - animated WebP through Pillow's public save(save_all=True) API;
+#          frames are spooled to disk and passed to it as a lazy iterator
+#          (Pillow still decodes them all for the final encode).
+#   mp4  - H.264 through a local ffmpeg binary (raw RGB piped to its stdin).
+ANIMATION_FORMATS = ("gif", "webp", "mp4")
+
+
+def ffmpeg_path():
+    """Path of the ffmpeg executable, or None if it is not installed."""
+    return shutil.which("ffmpeg")
+
+
+def figure_to_image(fig) -> Image.Image:
+    """Render a matplotlib figure to an RGB image without a PNG round trip."""
+    fig.canvas.draw()
+    buf = np.asarray(fig.canvas.buffer_rgba())
+    return Image.fromarray(buf[..., :3].copy(), "RGB")
+
+
+def _as_rgb(frame) -> Image.Image:
+    if isinstance(frame, Image.Image):
+        return frame.convert("RGB")
+    if hasattr(frame, "canvas"):  # matplotlib Figure
+        return figure_to_image(frame)
+    with Image.open(frame) as im:
+        return im.convert("RGB")
+
+
+def _quantize(im: Image.Image, colors=255):
+    return im.quantize(colors=colors, method=Image.Quantize.MEDIANCUT, dither=Image.Dither.NONE)
+
+
+class _GifEncoder:
+    TRANSPARENT = 255  # palette index reserved for "unchanged since last frame"
+    MAX_PALETTE_ERROR = 16  # per-channel error above which a frame gets a local palette
+
+    def __init__(self, fp, size, duration, loop):
+        self._fp = fp
+        self._size = size
+        self._duration = duration
+        self._loop = loop
+        self._palette = None
+        self._palette_rgb = None
+        self._max_error = self.MAX_PALETTE_ERROR
+        self._prev = None  # RGB shown after the previous frame
+
+    def _write_header(self, palette: list):
+        w, h = self._size
+        self._fp.write(
+            b"GIF89a"
+            + struct.pack("<HHBBB", w, h, 0xF7, 0, 0)  # 256-color global table
+            + bytes(palette + [0] * (768 - len(palette)))
+            + b"!\xff\x0bNETSCAPE2.0\x03\x01" + struct.pack("<H", self._loop) + b"\x00"
+        )
+
+    @staticmethod
+    def _rgb(pal: list) -> np.ndarray:
+        return np.asarray(pal + [0] * (768 - len(pal)), dtype=np.int16).reshape(256, 3)
+
+    def add(self, im: Image.Image):
+        rgb = np.asarray(im, dtype=np.int16)
+        local = None
+        if self._palette is None:
+            # 255 colors so index 255 stays free for transparency
+            q = _quantize(im)
+            pal = q.getpalette()[: 255 * 3]
+            self._palette = Image.new("P", (1, 1))
+            self._palette.putpalette(pal)
+            self._palette_rgb = self._rgb(pal)
+            self._write_header(pal)
+            cur = np.asarray(q)
+            shown = self._palette_rgb[cur]
+            # the first frame's own quantization error is the baseline
+            self._max_error = max(self.MAX_PALETTE_ERROR, int(np.abs(shown - rgb).max()))
+        else:
+            cur = np.asarray(im.quantize(palette=self._palette, dither=Image.Dither.NONE))
+            shown = self._palette_rgb[cur]
+            if np.abs(shown - rgb).max() > self._max_error:
+                q = _quantize(im)
+                local = q.getpalette()[: 255 * 3]
+                cur = np.asarray(q)
+                shown = self._rgb(local)[cur]
+
+        if self._prev is None:
+            x0, y0, frame = 0, 0, cur
+        else:
+            changed = (shown != self._prev).any(axis=2)
+            rows = np.flatnonzero(changed.any(axis=1))
+            cols = np.flatnonzero(changed.any(axis=0))
+            if rows.size == 0:
+                x0, y0 = 0, 0
+                frame = np.full((1, 1), self.TRANSPARENT, dtype=np.uint8)
+                local = None
+            else:
+                y0, y1, x0, x1 = rows[0], rows[-1] + 1, cols[0], cols[-1] + 1
+                frame = cur[y0:y1, x0:x1].copy()
+                frame[~changed[y0:y1, x0:x1]] = self.TRANSPARENT
+        self._prev = shown
+
+        out = Image.fromarray(np.ascontiguousarray(frame, dtype=np.uint8), "P")
+        params = {}
+        if local is not None:
+            out.putpalette(local + [0] * (768 - len(local)))
+            params["include_color_table"] = True
+        for chunk in GifImagePlugin.getdata(
+            out,
+            offset=(int(x0), int(y0)),
+            duration=self._duration,
+            disposal=1,  # keep the previous frame underneath
+            transparency=self.TRANSPARENT,
+            **params,
+        ):
+            self._fp.write(chunk)
+
+    def close(self):
+        self._fp.write(b";")
+
+
+class _WebPEncoder:
+    """Animated WebP through Pillow's public ``save(save_all=True)``.
+
+    Frames are spooled to PNG files beside the output as they arrive, and
+    handed to Pillow at close() as lazily opened images, so nothing is held
+    in memory while the frames are being rendered.
+    """
+
+    def __init__(self, fp, spool_dir, duration, loop, quality=80):
+        from PIL import features
+
+        if not features.check("webp"):
+            raise RuntimeError("Pillow was built without WebP support.")
+        self._fp = fp
+        self._dir = Path(spool_dir)
+        self._dir.mkdir(parents=True, exist_ok=True)
+        self._paths = []
+        self._duration = duration
+        self._loop = loop
+        self._quality = quality
+
+    def add(self, im: Image.Image):
+        path = self._dir / f"{len(self._paths):05d}.png"
+        im.save(path, compress_level=1)
+        self._paths.append(path)
+
+    def close(self):
+        frames = (Image.open(p) for p in self._paths[1:])
+        try:
+            with Image.open(self._paths[0]) as first:
+                first.save(
+                    self._fp, format="WEBP", save_all=True, append_images=frames,
+                    duration=self._duration, loop=self._loop, quality=self._quality,
+                )
+        finally:
+            self.abort()
+
+    def abort(self):
+        shutil.rmtree(self._dir, ignore_errors=True)
+
+
+class _Mp4Encoder:
+    def __init__(self, path, size, duration):
+        ffmpeg = ffmpeg_path()
+        if ffmpeg is None:
+            raise RuntimeError("MP4 output needs ffmpeg on the PATH.")
+        w, h = size
+        self._proc = subprocess.Popen(
+            [
+                ffmpeg, "-y", "-loglevel", "error",
+                "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{w}x{h}",
+                "-framerate", f"{1000.0 / duration:g}", "-i", "-",
+                "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2",  # H.264 needs even sizes
+                "-c:v", "libx264", "-pix_fmt", "yuv420p", "-movflags", "+faststart",
+                str(path),
+            ],
+            stdin=subprocess.PIPE,
+        )
+
+    def add(self, im: Image.Image):
+        self._proc.stdin.write(im.tobytes())
+
+    def close(self):
+        self._proc.stdin.close()
+        if self._proc.wait() != 0:
+            raise RuntimeError(f"ffmpeg exited with status {self._proc.returncode}")
+
+    def abort(self):
+        self._proc.kill()
+        self._proc.wait()
+
+
+class AnimationWriter:
+    """Write an animation one frame at a time, in constant memory.
+
+    *fmt* is one of ANIMATION_FORMATS (default: from the file suffix).
+    Frames may be image paths, PIL images or matplotlib figures; frames whose
+    size differs from the first are resized to it. The output is written to a
+    temporary file and moved into place by close(), so an interrupted run
+    never leaves a truncated animation behind.
+
+        with AnimationWriter("loop.gif", duration=500) as writer:
+            for path in frame_paths:
+                writer.add(path)
+    """
+
+    def __init__(self, output_path, duration=500, fmt=None, loop=0):
+        self.path = Path(output_path)
+        self.fmt = (fmt or self.path.suffix.lstrip(".") or "gif").lower()
+        if self.fmt not in ANIMATION_FORMATS:
+            raise ValueError(f"Unknown animation format {self.fmt!r}; expected one of {ANIMATION_FORMATS}")
+        self.duration = int(duration)
+        self.loop = loop
+        self.n_frames = 0
+        self._tmp = self.path.with_name(f"{self.path.stem}.{os.getpid()}.tmp{self.path.suffix}")
+        self._fp = None
+        self._encoder = None
+        self._size = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def _open(self, size):
+        self._size = size
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.fmt == "mp4":
+            self._encoder = _Mp4Encoder(self._tmp, size, self.duration)
+            return
+        self._fp = open(self._tmp, "wb")
+        if self.fmt == "gif":
+            self._encoder = _GifEncoder(self._fp, size, self.duration, self.loop)
+        else:
+            spool = self._tmp.with_name(self._tmp.name + ".frames")
+            self._encoder = _WebPEncoder(self._fp, spool, self.duration, self.loop)
+
+    def add(self, frame):
+        """Encode one frame (path, PIL image or matplotlib figure)."""
+        im = _as_rgb(frame)
+        if self._encoder is None:
+            self._open(im.size)
+        elif im.size != self._size:
+            im = im.resize(self._size, Image.Resampling.LANCZOS)
+        self._encoder.add(im)
+        self.n_frames += 1
+
+    def close(self) -> Path:
+        """Finish the file and move it into place; returns the output path."""
+        if self._encoder is None:
+            raise ValueError("No frames were added to the animation.")
+        self._encoder.close()
+        if self._fp is not None:
+            self._fp.close()
+        os.replace(self._tmp, self.path)
+        return self.path
+
+    def abort(self):
+        """Discard a partially written animation."""
+        if isinstance(self._encoder, (_Mp4Encoder, _WebPEncoder)):
+            self._encoder.abort()
+        if self._fp is not None:
+            self._fp.close()
+        self._tmp.unlink(missing_ok=True)
+
+
+def create_animation(frames, output_path, duration=500, fmt=None):
+    """Stream *frames* (paths, PIL images or figures) into a GIF/WebP/MP4 file."""
+    with AnimationWriter(output_path, duration=duration, fmt=fmt) as writer:
+        for frame in frames:
+            writer.add(frame)
+    return writer.path
+
 
 def create_gif(image_paths, output_gif_path, duration=500):
     """Build an animated GIF from a sequence of image files.
@@ -16,13 +305,4 @@ def create_gif(image_paths, output_gif_path, duration=500):
     """
     if not image_paths:
         raise ValueError("No image paths provided for GIF creation.")
-
-    images = [Image.open(p) for p in image_paths]
-    images[0].save(
-        output_gif_path,
-        save_all=True,
-        append_images=images[1:],
-        duration=duration,
-        loop=0,  # infinite loop
-    )
-    return Path(output_gif_path)
+    return create_animation(image_paths, output_gif_path, duration=duration, fmt="gif")
@@ -0,0 +1,148 @@
+from typing import NamedTuple
+
+import numpy as np
+
+# Verification domain. The maps only ever show the CONUS window, so model
+# fields are sliced to it (plus a halo) right after loading, and the analysis
+# is sliced to the cropped model grid before regridding. For the global models
+# this turns a 1440x721 grid into ~250x140 points; regridder weights, diffs,
+# stats and renders then all work on the cropped grid.
+class Domain(NamedTuple):
+    """Lon/lat box (degrees, lon in -180..180) plus a *halo* kept around it."""
+
+    lon_min: float
+    lon_max: float
+    lat_min: float
+    lat_max: float
+    halo: float = 0.0
+
+
+class EmptyDomainError(ValueError):
+    """A grid has no points inside the requested domain."""
+
+
+CONUS = Domain(-125.0, -66.5, 20.0, 50.0, halo=2.0)
+
+# Extra analysis kept around the cropped model grid, so bilinear weights have
+# source points on both sides of every target point.
+ANALYSIS_MARGIN_DEG = 0.5
+
+_NAMED = {"conus": CONUS}
+_FULL = ("full", "none", "global", "off")
+
+
+def parse_domain(spec):
+    """Domain from a config/CLI value; None means no cropping.
+
+    Accepts a Domain, a name (``"conus"``; ``"full"``/``"none"`` disables
+    cropping), ``"lon_min,lon_max,lat_min,lat_max[,halo]"``, a list of those
+    numbers, or ``{"bbox": [...], "halo": 2}``.
+    """
+    if spec is None or isinstance(spec, Domain):
+        return spec
+    if isinstance(spec, dict):
+        bbox = spec.get("bbox")
+        if bbox is None:
+            raise ValueError(f"Domain mapping needs a 'bbox': {spec}")
+        base = parse_domain(bbox)
+        return base._replace(halo=float(spec["halo"])) if "halo" in spec else base
+    if isinstance(spec, str):
+        key = spec.strip().lower()
+        if key in _NAMED:
+            return _NAMED[key]
+        if key in _FULL:
+            return None
+        spec = key.split(",")
+    try:
+        vals = [float(v) for v in spec]
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid domain: {spec!r}") from None
+    if len(vals) not in (4, 5):
+        raise ValueError(f"Domain needs lon_min,lon_max,lat_min,lat_max[,halo]; got {spec!r}")
+    domain = Domain(*vals)
+    if domain.lat_min >= domain.lat_max:
+        raise ValueError(f"Domain lat_min must be below lat_max: {spec!r}")
+    return domain
+
+
+def grid_domain(lon, lat, margin=ANALYSIS_MARGIN_DEG) -> Domain:
+    """The lon/lat box covered by a grid, with *margin* as its halo."""
+    lon = np.asarray(lon, dtype=np.float64)
+    lat = np.asarray(lat, dtype=np.float64)
+    return Domain(float(np.nanmin(lon)), float(np.nanmax(lon)),
+                  float(np.nanmin(lat)), float(np.nanmax(lat)), halo=margin)
+
+
+def _in_lon(lon, domain):
+    # modular, so 0..360 grids and boxes crossing the dateline work too
+    lo = domain.lon_min - domain.halo
+    span = domain.lon_max - domain.lon_min + 2 * domain.halo
+    if span >= 360:
+        return np.isfinite(lon)
+    return (lon - lo) % 360.0 <= span
+
+
+def _in_lat(lat, domain):
+    return (lat >= domain.lat_min - domain.halo) & (lat <= domain.lat_max + domain.halo)
+
+
+def _span(mask):
+    idx = np.flatnonzero(mask)
+    return slice(int(idx[0]), int(idx[-1]) + 1)
+
+
+def crop_slices(lon, lat, domain) -> dict:
+    """``{dim: slice}`` of the smallest index box holding every point in *domain*.
+
+    *lon*/*lat* are the field's coordinate DataArrays: 2-D on the same dims
+    (curvilinear grids) or 1-D on their own dims (regular lat/lon grids).
+    Dimensions that need no cropping are left out, so ``{}`` means the grid
+    already fits. Raises EmptyDomainError if no point lies in the domain.
+    """
+    lon_v = np.asarray(lon.values, dtype=np.float64)
+    lat_v = np.asarray(lat.values, dtype=np.float64)
+    if lon.ndim == 1 and lat.ndim == 1 and lon.dims != lat.dims:
+        masks = {lon.dims[0]: _in_lon(lon_v, domain), lat.dims[0]: _in_lat(lat_v, domain)}
+    elif lon.ndim == 2 and lon.dims == lat.dims:
+        inside = _in_lon(lon_v, domain) & _in_lat(lat_v, domain)
+        masks = {lon.dims[0]: inside.any(axis=1), lon.dims[1]: inside.any(axis=0)}
+    else:
+        return {}  # unstructured: nothing to slice
+    slices = {}
+    for dim, mask in masks.items():
+        if not mask.any():
+            raise EmptyDomainError(
+                f"no grid points inside lon {domain.lon_min:g}..{domain.lon_max:g}, "
+                f"lat {domain.lat_min:g}..{domain.lat_max:g}"
+            )
+        span = _span(mask)
+        if span.stop - span.start < mask.size:
+            slices[dim] = span
+    return slices
+
+
+def crop_field(da, domain):
+    """*da* sliced to *domain* (a view; returned as is when *domain* is None)."""
+    if domain is None:
+        return da
+    slices = crop_slices(da["longitude"], da["latitude"], domain)
+    return da.isel(slices) if slices else da
+
+
+def crop_fields(fields: dict, domain) -> dict:
+    """crop_field on every field of ``{var_key: DataArray}`` (one shared grid).
+
+    The index box is computed once, from the first field.
+    """
+    if domain is None or not fields:
+        return fields
+    first = next(iter(fields.values()))
+    slices = crop_slices(first["longitude"], first["latitude"], domain)
+    if not slices:
+        return fields
+    return {name: da.isel(slices) for name, da in fields.items()}
+
+
+def crop_to_grid(fields: dict, lon, lat, margin=ANALYSIS_MARGIN_DEG) -> dict:
+    """Slice source *fields* (e.g. the analysis) to the area a target grid needs."""
+    return crop_fields(fields, grid_domain(lon, lat, margin))
@@ -0,0 +1,130 @@
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+
+import numpy as np
+import xarray as xr
+
+from . import normalize as norm
+from .regrid import grid_fingerprint
+
+# Decoded-field cache: each resolved 2-D field is stored as a raw .npy array
+# (plus a small JSON sidecar) under
+#   {cache_dir}/{model}/{product}/{cycle:%Y%m%d%H}/f{fxx:03d}_{var}/
+# and its lon/lat once per grid under {cache_dir}/grids/{fingerprint}_{lon|lat}.npy.
+# Loads use np.load(mmap_mode="r"), so a re-run reads fields straight from the
+# page cache without Herbie, a download or cfgrib.
+FIELD_CACHE_DIR = Path("./data/fields")
+
+
+def field_cache_path(model_key: str, run_dt, fxx: int, var_key: str, cache_dir=FIELD_CACHE_DIR) -> Path:
+    """Directory holding one cached field, keyed by (model, product, cycle, fxx, variable)."""
+    product = norm.MODEL_REGISTRY[model_key]["kwargs"]["product"]
+    return (
+        Path(cache_dir) / model_key / str(product).replace("/", "_")
+        / f"{run_dt:%Y%m%d%H}" / f"f{fxx:03d}_{var_key}"
+    )
+
+
+def _json_attrs(attrs: dict) -> dict:
+    """Keep only attributes that survive a JSON round trip."""
+    return {
+        str(k): v for k, v in attrs.items()
+        if isinstance(v, (str, int, float, bool))
+    }
+
+
+def _tmp_suffix() -> str:
+    """Unique per process *and* thread (batch mode writes from worker threads)."""
+    return f"{os.getpid()}-{threading.get_ident()}"
+
+
+def _save_grid_array(path: Path, values: np.ndarray):
+    if path.exists():
+        return
+    tmp = path.with_name(f"{path.stem}.{_tmp_suffix()}.tmp.npy")
+    np.save(tmp, values)
+    os.replace(tmp, path)
+
+
+def save_field(da: xr.DataArray, model_key: str, run_dt, fxx: int, var_key: str, cache_dir=FIELD_CACHE_DIR):
+    """Store a resolved field (with its longitude/latitude coords) in the cache.
+
+    The write goes to a temporary directory that is renamed into place, so
+    concurrent writers and readers never see a partial entry. Returns the
+    cached, memory-mapped DataArray.
+    """
+    cache_dir = Path(cache_dir)
+    lon, lat = da["longitude"], da["latitude"]
+    grid = grid_fingerprint(lon.values, lat.values)
+    grid_dir = cache_dir / "grids"
+    grid_dir.mkdir(parents=True, exist_ok=True)
+    _save_grid_array(grid_dir / f"{grid}_lon.npy", np.asarray(lon.values))
+    _save_grid_array(grid_dir / f"{grid}_lat.npy", np.asarray(lat.values))
+
+    final = field_cache_path(model_key, run_dt, fxx, var_key, cache_dir)
+    final.parent.mkdir(parents=True, exist_ok=True)
+    tmp = final.with_name(f"{final.name}.{_tmp_suffix()}.tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir()
+    np.save(tmp / "values.npy", np.asarray(da.values))
+    meta = {
+        "name": da.name,
+        "dims": list(da.dims),
+        "attrs": _json_attrs(da.attrs),
+        "grid": grid,
+        "lon_dims": list(lon.dims),
+        "lat_dims": list(lat.dims),
+    }
+    (tmp / "meta.json").write_text(json.dumps(meta))
+    try:
+        os.replace(tmp, final)
+    except OSError:
+        # Another process cached the same field first; keep theirs.
+        shutil.rmtree(tmp, ignore_errors=True)
+    return load_field(model_key, run_dt, fxx, var_key, cache_dir)
+
+
+def load_field(model_key: str, run_dt, fxx: int, var_key: str, cache_dir=FIELD_CACHE_DIR):
+    """Open a cached field zero-copy, or return None if it is not cached.
+
+    The returned DataArray (and its longitude/latitude coords) are read-only
+    views on memory-mapped .npy files.
+    """
+    cache_dir = Path(cache_dir)
+    path = field_cache_path(model_key, run_dt, fxx, var_key, cache_dir)
+    meta_path = path / "meta.json"
+    if not meta_path.exists():
+        return None
+    meta = json.loads(meta_path.read_text())
+    grid_dir = cache_dir / "grids"
+    values = np.load(path / "values.npy", mmap_mode="r")
+    lon = np.load(grid_dir / f"{meta['grid']}_lon.npy", mmap_mode="r")
+    lat = np.load(grid_dir / f"{meta['grid']}_lat.npy", mmap_mode="r")
+    return xr.DataArray(
+        values,
+        dims=tuple(meta["dims"]),
+        coords={
+            "longitude": (tuple(meta["lon_dims"]), lon),
+            "latitude": (tuple(meta["lat_dims"]), lat),
+        },
+        name=meta["name"],
+        attrs=meta["attrs"],
+    )
+
+
+def load_fields(model_key: str, run_dt, fxx: int, var_keys, cache_dir=FIELD_CACHE_DIR) -> dict:
+    """Return ``{var_key: DataArray}`` for every variable already in the cache."""
+    fields = {}
+    for var_key in var_keys:
+        da = load_field(model_key, run_dt, fxx, var_key, cache_dir)
+        if da is not None:
+            fields[var_key] = da
+    return fields
+
+
+def has_field(model_key: str, run_dt, fxx: int, var_key: str, cache_dir=FIELD_CACHE_DIR) -> bool:
+    """True when the field is already cached (cheap: one stat, no array I/O)."""
+    return (field_cache_path(model_key, run_dt, fxx, var_key, cache_dir) / "meta.json").exists()
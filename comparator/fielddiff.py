@@ -1,9 +1,79 @@
+from typing import NamedTuple
+
 import numpy as np
 import xarray as xr
 
 _METERS_PER_SM = 1609.344
 _MPH_PER_MPS = 2.23694
 
+# Units of the difference compute_fielddiff returns for each variable
+DIFF_UNITS = {"TMP": "degF", "DPT": "degF", "VIS": "mi", "WIND": "mph", "GUST": "mph"}
+
+
+class DiffRule(NamedTuple):
+    """Valid input range and unit conversion for one variable's difference."""
+
+    lo: float
+    hi: float
+    strict: bool  # open interval (lo, hi) instead of [lo, hi]
+    mul: float = 1  # difference * mul / div, applied in that order
+    div: float = 1
+
+
+DIFF_RULES = {
+    "TMP": DiffRule(150, 330, True, mul=9, div=5),  # K -> degF
+    "DPT": DiffRule(150, 330, True, mul=9, div=5),
+    "VIS": DiffRule(0, 24000, False, div=_METERS_PER_SM),  # m -> mi
+    "WIND": DiffRule(0, 150, False, mul=_MPH_PER_MPS),  # m/s -> mph
+    "GUST": DiffRule(0, 150, False, mul=_MPH_PER_MPS),
+}
+
+# Elements per block of the fused kernel: the scratch masks stay in cache
+# instead of being full-grid temporaries.
+_BLOCK = 1 << 16
+
+
+def _in_range(x, rule, mask, scratch):
+    """mask &= x in the rule's range (NaN/inf are never in range)."""
+    if rule.strict:
+        np.greater(x, rule.lo, out=scratch)
+        np.logical_and(mask, scratch, out=mask)
+        np.less(x, rule.hi, out=scratch)
+    else:
+        np.greater_equal(x, rule.lo, out=scratch)
+        np.logical_and(mask, scratch, out=mask)
+        np.less_equal(x, rule.hi, out=scratch)
+    np.logical_and(mask, scratch, out=mask)
+
+
+def _fused_diff(h, r, rule):
+    """(h - r) * mul / div, NaN where either input is outside the rule's range.
+
+    One output array is allocated; everything else works block by block in
+    two small reusable boolean buffers.
+    """
+    h, r = np.broadcast_arrays(h, r)
+    dtype = np.result_type(h.dtype, r.dtype, np.float16)
+    out = np.empty(h.shape, dtype=dtype)
+    hf, rf, of = h.reshape(-1), r.reshape(-1), out.reshape(-1)
+    mask = np.empty(min(_BLOCK, of.size), dtype=bool)
+    scratch = np.empty_like(mask)
+    for start in range(0, of.size, _BLOCK):
+        stop = min(start + _BLOCK, of.size)
+        hb, rb, ob = hf[start:stop], rf[start:stop], of[start:stop]
+        m, s = mask[: stop - start], scratch[: stop - start]
+        np.subtract(hb, rb, out=ob)
+        if rule.mul != 1:
+            np.multiply(ob, rule.mul, out=ob)
+        if rule.div != 1:
+            np.divide(ob, rule.div, out=ob)
+        m.fill(True)
+        _in_range(hb, rule, m, s)
+        _in_range(rb, rule, m, s)
+        np.logical_not(m, out=m)
+        np.copyto(ob, np.nan, where=m)
+    return out
+
 
 def compute_fielddiff(nwp_field: xr.DataArray, anl_field: xr.DataArray, var_key: str = "TMP") -> xr.DataArray:
     """Compute field difference NWP - analysis on the SAME grid.
@@ -13,17 +83,17 @@ def compute_fielddiff(nwp_field: xr.DataArray, anl_field: xr.DataArray, var_key:
     VIS (meter inputs): returns statute-mile difference.
     WIND / GUST (m/s inputs): returns mph difference.
     Assumes inputs are on identical (y,x) coords.
+
+    Points where either input is non-finite or outside the variable's
+    DIFF_RULES range are NaN. The arithmetic runs in one fused pass; the
+    result keeps the name and coordinates of ``nwp - anl``, except that a
+    scalar coordinate the two disagree on (time, step) comes from the
+    analysis, i.e. the valid time.
     """
-    h, r = xr.align(nwp_field, anl_field, join="exact")
-
-    if var_key in ("TMP", "DPT"):
-        valid = (np.isfinite(h) & np.isfinite(r) & (h > 150) & (h < 330) & (r > 150) & (r < 330))
-        return (h - r).where(valid) * 9 / 5
-    elif var_key == "VIS":
-        valid = (np.isfinite(h) & np.isfinite(r) & (h >= 0) & (h <= 24000) & (r >= 0) & (r <= 24000))
-        return (h - r).where(valid) / _METERS_PER_SM
-    elif var_key in ("WIND", "GUST"):
-        valid = (np.isfinite(h) & np.isfinite(r) & (h >= 0) & (h <= 150) & (r >= 0) & (r <= 150))
-        return (h - r).where(valid) * _MPH_PER_MPS
-    else:
+    rule = DIFF_RULES.get(var_key)
+    if rule is None:
         raise ValueError(f"No fielddiff logic for var_key='{var_key}'")
+    diff = xr.apply_ufunc(_fused_diff, nwp_field, anl_field, kwargs={"rule": rule}, join="exact")
+    diff.name = nwp_field.name if nwp_field.name == anl_field.name else None
+    conflicting = {k: v for k, v in anl_field.coords.items() if k not in diff.coords}
+    return diff.assign_coords(conflicting) if conflicting else diff
@@ -259,6 +259,17 @@ def get_selector(model_key: str, var_key: str) -> str:
         return selector_map[var_key]
     return VAR_REGISTRY[var_key]["selector"]
 
+def get_combined_selector(model_key: str, var_keys) -> str:
+    """Return one Herbie search string matching every variable in *var_keys*.
+
+    The per-variable selectors are OR-ed into a single regex so a GRIB file
+    is subset-downloaded (union of byte ranges) and decoded in one pass.
+    """
+    selectors = list(dict.fromkeys(get_selector(model_key, v) for v in var_keys))
+    if len(selectors) == 1:
+        return selectors[0]
+    return "|".join(f"(?:{sel})" for sel in selectors)
+
 def wrap_longitude(ds):
     """Convert 0-360 longitudes to -180..180 if needed, then sort."""
     lon = ds["longitude"]
@@ -357,3 +368,38 @@ def resolve_field_da(ds, var_key: str):
         )
     name = pick_data_varname_from_ds(ds, var_key)
     return ds[name]
+
+def _dataset_for_var(datasets, var_key: str):
+    """Pick the dataset (hypercube) holding *var_key* from a multi-variable decode.
+
+    Exact ds_candidates matches are tried across *all* datasets before the
+    substring fallback, so a short candidate (e.g. "t") cannot claim another
+    variable's hypercube.
+    """
+    if len(datasets) == 1:
+        return datasets[0]
+    candidates = VAR_REGISTRY[var_key].get("ds_candidates", [])
+    for cand in candidates:
+        for ds in datasets:
+            if cand in ds.data_vars:
+                return ds
+    for cand in candidates:
+        for ds in datasets:
+            if any(cand in dv for dv in ds.data_vars):
+                return ds
+    raise ValueError(
+        f"Could not find {var_key} in decoded datasets "
+        f"{[list(ds.data_vars) for ds in datasets]}"
+    )
+
+def split_fields(ds_or_list, var_keys) -> dict:
+    """Split one multi-variable decode into ``{var_key: DataArray}``.
+
+    Each field goes through resolve_field_da(), so WIND is still derived
+    from U/V when no direct speed field was published.
+    """
+    datasets = ds_or_list if isinstance(ds_or_list, list) else [ds_or_list]
+    return {
+        var_key: resolve_field_da(_dataset_for_var(datasets, var_key), var_key)
+        for var_key in var_keys
+    }
@@ -0,0 +1,112 @@
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+_END = object()
+
+
+def run_prefetch_pipeline(
+    items,
+    fetch,
+    process,
+    cpu_executor,
+    cpu_workers: int,
+    fetch_workers: int = 8,
+    max_prefetch: int | None = None,
+    min_fetch_workers: int = 1,
+    stats: dict | None = None,
+):
+    """Run a two-stage fetch -> process pipeline, yielding results as they finish.
+
+    Stage 1 calls ``fetch(item)`` on a thread pool of up to *fetch_workers*
+    (network bound: many concurrent downloads are cheap). Stage 2 submits
+    ``process(item, fetched)`` to *cpu_executor* (typically a process pool of
+    *cpu_workers* for decoding + rendering), never more than *cpu_workers* at
+    a time; fetched items wait in a ready queue until a slot frees up. Items
+    are fetched in order, so downloads for frame N+k overlap the rendering of
+    frame N.
+
+    The number of concurrent fetches adapts to the ready queue: it doubles
+    (up to *fetch_workers*) while CPU slots sit idle waiting for downloads,
+    and shrinks by one (down to *min_fetch_workers*) while more than
+    *cpu_workers* fetched items are queued, i.e. when downloads outpace the
+    CPU and extra fetch threads would only compete with it.
+
+    At most ``cpu_workers + max_prefetch`` items are fetched-but-unprocessed at
+    any time (a bounded queue), which caps disk/memory use on long runs.
+    A fetch returning None marks the item as unavailable and skips stage 2.
+
+    Yields ``(item, result, error)``; *error* is the exception raised by either
+    stage, or None. If a *stats* dict is given it is filled with the peak
+    number of concurrent fetches, the peak ready-queue depth and the final
+    fetch limit.
+    """
+    if max_prefetch is None:
+        max_prefetch = fetch_workers
+    cpu_workers = max(1, cpu_workers)
+    fetch_workers = max(1, fetch_workers)
+    min_fetch_workers = max(1, min(min_fetch_workers, fetch_workers))
+    budget = max(1, cpu_workers + max_prefetch)
+    fetch_limit = min(max(cpu_workers, min_fetch_workers), fetch_workers)
+    pending = iter(items)
+    exhausted = False
+    fetching, ready, processing = {}, deque(), {}
+    if stats is None:
+        stats = {}
+    stats.update(peak_fetching=0, peak_ready=0, fetch_limit=fetch_limit)
+
+    def _adapt():
+        nonlocal fetch_limit
+        if len(ready) > cpu_workers:
+            fetch_limit = max(min_fetch_workers, fetch_limit - 1)
+        elif not ready and len(processing) < cpu_workers and not exhausted:
+            fetch_limit = min(fetch_workers, fetch_limit * 2)
+        stats["fetch_limit"] = fetch_limit
+
+    with ThreadPoolExecutor(max_workers=fetch_workers) as fetch_pool:
+        def _feed_cpu():
+            while ready and len(processing) < cpu_workers:
+                item, fetched = ready.popleft()
+                processing[cpu_executor.submit(process, item, fetched)] = item
+
+        def _top_up():
+            nonlocal exhausted
+            while (
+                not exhausted
+                and len(fetching) < fetch_limit
+                and len(fetching) + len(ready) + len(processing) < budget
+            ):
+                item = next(pending, _END)
+                if item is _END:
+                    exhausted = True
+                    return
+                fetching[fetch_pool.submit(fetch, item)] = item
+            stats["peak_fetching"] = max(stats["peak_fetching"], len(fetching))
+
+        _top_up()
+        while fetching or processing:
+            done, _ = wait(list(fetching) + list(processing), return_when=FIRST_COMPLETED)
+            for fut in done:
+                if fut in fetching:
+                    item = fetching.pop(fut)
+                    try:
+                        fetched = fut.result()
+                    except Exception as e:
+                        yield item, None, e
+                        continue
+                    if fetched is None:
+                        yield item, None, None
+                        continue
+                    ready.append((item, fetched))
+                else:
+                    item = processing.pop(fut)
+                    try:
+                        result = fut.result()
+                    except Exception as e:
+                        yield item, None, e
+                        continue
+                    yield item, result, None
+            # what is still queued once the CPU slots are filled is the backlog
+            _feed_cpu()
+            stats["peak_ready"] = max(stats["peak_ready"], len(ready))
+            _adapt()
+            _top_up()
@@ -1,18 +1,41 @@
+import hashlib
+import os
+import pickle
+from collections import OrderedDict
+from pathlib import Path
+
 import numpy as np
+import matplotlib
+if not os.environ.get("DISPLAY") and not os.environ.get("WAYLAND_DISPLAY"):
+    matplotlib.use("Agg")
 import matplotlib.pyplot as plt
+from matplotlib.collections import PathCollection, QuadMesh
 from matplotlib.colors import TwoSlopeNorm
 from matplotlib.figure import Figure
 import matplotlib.patheffects as pe
 import cartopy.crs as ccrs
 import cartopy.feature as cfeature
 from cartopy.mpl.geoaxes import GeoAxes  # for Pylance typing help
+import shapely.geometry as sgeom
 import xarray as xr
 import pandas as pd
 from matplotlib.gridspec import GridSpec
 
+from . import stations
+from .domain import CONUS
+
+try:
+    from cartopy.mpl.path import shapely_to_path as _shapely_to_path
+except ImportError:  # cartopy < 0.23
+    from cartopy.mpl.patch import geos_to_path as _geos_to_path
+
+    def _shapely_to_path(geom):
+        from matplotlib.path import Path as _MplPath
+        return _MplPath.make_compound_path(*_geos_to_path(geom))
+
 # Fixed CONUS bounds in lon/ & fixed coordinate reference system (PlateCarree)
-CONUS_LON_MIN, CONUS_LON_MAX = -125.0, -66.5
-CONUS_LAT_MIN, CONUS_LAT_MAX = 20.0, 50.0
+CONUS_LON_MIN, CONUS_LON_MAX = CONUS.lon_min, CONUS.lon_max
+CONUS_LAT_MIN, CONUS_LAT_MAX = CONUS.lat_min, CONUS.lat_max
 PC = ccrs.PlateCarree()
 
 
@@ -21,11 +44,8 @@ def _wrap180(lon_vals: np.ndarray) -> np.ndarray:
     return ((lon_vals.astype(float) + 180.0) % 360.0) - 180.0
 
 
-def _lock_conus_view(ax: GeoAxes):
-    """Convert CONUS lon/lat corners to the current projection's x/y and lock x/y limits.
-    Also disables autoscaling so artists can't change the view.
-    """
-    proj = ax.projection
+def _conus_limits(proj) -> tuple[float, float, float, float]:
+    """CONUS corners in *proj* x/y, padded 2%: (xmin, xmax, ymin, ymax)."""
     lons = np.array([CONUS_LON_MIN, CONUS_LON_MAX, CONUS_LON_MIN, CONUS_LON_MAX], dtype=float)
     lats = np.array([CONUS_LAT_MIN, CONUS_LAT_MIN, CONUS_LAT_MAX, CONUS_LAT_MAX], dtype=float)
 
@@ -33,27 +53,179 @@ def _lock_conus_view(ax: GeoAxes):
     xs, ys = xy[:, 0], xy[:, 1]
     pad_x = 0.02 * (xs.max() - xs.min())
     pad_y = 0.02 * (ys.max() - ys.min())
+    return xs.min() - pad_x, xs.max() + pad_x, ys.min() - pad_y, ys.max() + pad_y
+
 
-    ax.set_xlim(xs.min() - pad_x, xs.max() + pad_x)
-    ax.set_ylim(ys.min() - pad_y, ys.max() + pad_y)
+def _lock_conus_view(ax: GeoAxes):
+    """Convert CONUS lon/lat corners to the current projection's x/y and lock x/y limits.
+    Also disables autoscaling so artists can't change the view.
+    """
+    xmin, xmax, ymin, ymax = _conus_limits(ax.projection)
+    ax.set_xlim(xmin, xmax)
+    ax.set_ylim(ymin, ymax)
     ax.set_autoscale_on(False)  # <- prevent later draws from changing limits
 
 
+# --- Cached basemap ----------------------------------------------------------
+# Cartopy re-projects every Natural Earth geometry each time a FeatureArtist is
+# drawn on a new GeoAxes. The boundaries never change for a given projection and
+# view, so we project + clip them once (per process, and on disk under
+# BASEMAP_CACHE_DIR) and draw the resulting paths directly in map coordinates.
+CONUS_PROJ = ccrs.LambertConformal(central_longitude=-95, standard_parallels=(33, 45))
+BASEMAP_CACHE_DIR = Path("./data/basemap")
+# (name, feature, linewidth) drawn by _init_conus_map, bottom to top
+BASEMAP_FEATURES = (
+    ("coastline", cfeature.COASTLINE, 0.6),
+    ("borders", cfeature.BORDERS, 0.6),
+    ("states", cfeature.STATES, 0.4),
+)
+# Geographic window used to pick candidate geometries; generous because the
+# Lambert view rectangle bulges past the CONUS lon/lat box at its corners.
+_BASEMAP_LONLAT_EXTENT = (CONUS_LON_MIN - 20.0, CONUS_LON_MAX + 20.0,
+                          CONUS_LAT_MIN - 10.0, CONUS_LAT_MAX + 10.0)
+_BASEMAP_CACHE: dict = {}
+
+
+def _basemap_key(proj) -> str:
+    names = ",".join(
+        f"{name}:{getattr(feature, 'scale', '')}" for name, feature, _ in BASEMAP_FEATURES
+    )
+    raw = f"{proj.proj4_init}|{_conus_limits(proj)}|{names}"
+    return hashlib.blake2b(raw.encode(), digest_size=8).hexdigest()
+
+
+def _project_feature_paths(feature, proj, limits) -> list:
+    """Project + clip one feature's geometries to the map view, as matplotlib Paths."""
+    xmin, xmax, ymin, ymax = limits
+    view = sgeom.box(xmin, ymin, xmax, ymax)
+    paths = []
+    for geom in feature.intersecting_geometries(_BASEMAP_LONLAT_EXTENT):
+        projected = proj.project_geometry(geom, feature.crs)
+        clipped = projected.intersection(view)
+        if not clipped.is_empty:
+            paths.append(_shapely_to_path(clipped))
+    return paths
+
+
+def _basemap_layers(proj, cache_dir=None) -> list:
+    """Return [(paths, style)] for BASEMAP_FEATURES in *proj*, computing them once."""
+    key = _basemap_key(proj)
+    layers = _BASEMAP_CACHE.get(key)
+    if layers is not None:
+        return layers
+
+    cache_dir = Path(BASEMAP_CACHE_DIR if cache_dir is None else cache_dir)
+    cache_file = cache_dir / f"basemap_{key}.pkl"
+    if cache_file.exists():
+        try:
+            layers = pickle.loads(cache_file.read_bytes())
+        except Exception:
+            layers = None
+    if layers is None:
+        limits = _conus_limits(proj)
+        layers = []
+        for _, feature, linewidth in BASEMAP_FEATURES:
+            style = {
+                "edgecolor": feature.kwargs.get("edgecolor", "black"),
+                "linewidth": linewidth,
+            }
+            layers.append((_project_feature_paths(feature, proj, limits), style))
+        try:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp = cache_file.with_suffix(".tmp")
+            tmp.write_bytes(pickle.dumps(layers))
+            tmp.replace(cache_file)
+        except OSError:
+            pass  # disk cache is best-effort; the in-process cache still applies
+    _BASEMAP_CACHE[key] = layers
+    return layers
+
+
+def _add_basemap(ax: GeoAxes):
+    """Draw the cached, pre-projected coastlines/borders/states onto *ax*."""
+    for paths, style in _basemap_layers(ax.projection):
+        ax.add_collection(
+            PathCollection(
+                paths,
+                facecolor="none",
+                transform=ax.transData,
+                zorder=1.5,  # same as cartopy's FeatureArtist: above the mesh
+                **style,
+            ),
+            autolim=False,
+        )
+
+
 def _init_conus_map(fig: Figure, spec=None) -> GeoAxes:
     """Initalizaes the CONUS Map & adds various mapping features (coastalines, borders, & state boundaries)
-    Used in the plotting function called below"""
-    proj = ccrs.LambertConformal(central_longitude=-95, standard_parallels=(33, 45))
+    Used in the plotting function called below. The boundaries come from the cached basemap."""
+    proj = CONUS_PROJ
     if spec is None:
         ax: GeoAxes = fig.add_subplot(1, 1, 1, projection=proj)  # type: ignore
     else:
         ax = fig.add_subplot(spec, projection=proj)
     _lock_conus_view(ax)
-    ax.add_feature(cfeature.COASTLINE, linewidth=0.6)  # type: ignore
-    ax.add_feature(cfeature.BORDERS, linewidth=0.6)    # type: ignore
-    ax.add_feature(cfeature.STATES, linewidth=0.4)     # type: ignore
+    _add_basemap(ax)
     return ax
 
 
+# --- Cached mesh geometry ---------------------------------------------------
+# pcolormesh(transform=PC) re-projects every cell corner of the native grid on
+# each call (and again on each draw). The grid is the same for every frame of a
+# model, so the projected corners are computed once per (grid, projection) and
+# each frame only supplies a new value array.
+MAX_CACHED_MESHES = 4
+_MESH_CACHE: OrderedDict = OrderedDict()
+
+
+def _cell_edges(c: np.ndarray, axis: int) -> np.ndarray:
+    """Midpoints between neighbouring centers along *axis*, extrapolated at both ends
+    (what pcolormesh(shading="nearest") does)."""
+    c = np.moveaxis(c, axis, 0)
+    mid = 0.5 * (c[1:] + c[:-1])
+    edges = np.concatenate([2 * c[:1] - mid[:1], mid, 2 * c[-1:] - mid[-1:]])
+    return np.moveaxis(edges, 0, axis)
+
+
+def _mesh_geometry(lon, lat, proj):
+    """Projected cell corners for a lon/lat grid: ``(coords, bad_cells)``.
+
+    *coords* has shape (ny+1, nx+1, 2) in *proj* x/y; *bad_cells* marks cells
+    that do not project cleanly (they are masked when drawing).
+    """
+    from .regrid import grid_fingerprint
+
+    lon2, lat2 = _as_float_array(lon), _as_float_array(lat)
+    if lon2.ndim == 1 and lat2.ndim == 1:
+        lon2, lat2 = np.meshgrid(lon2, lat2)
+    key = (grid_fingerprint(lon2, lat2), proj.proj4_init)
+    hit = _MESH_CACHE.get(key)
+    if hit is not None:
+        _MESH_CACHE.move_to_end(key)
+        return hit
+
+    # Unwrap along x so a 0..360 grid has no seam for the midpoints to straddle.
+    lon2 = np.unwrap(_wrap180(lon2), period=360.0, axis=-1)
+    lon_c = _cell_edges(_cell_edges(lon2, 0), 1)
+    lat_c = _cell_edges(_cell_edges(lat2, 0), 1)
+    xy = proj.transform_points(PC, lon_c, lat_c)[..., :2]
+    bad = ~np.isfinite(xy).all(axis=-1)
+    bad_cells = bad[1:, 1:] | bad[:-1, :-1] | bad[1:, :-1] | bad[:-1, 1:]
+    # Like cartopy, also drop cells torn across the projection's wrap line.
+    x, y = xy[..., 0], xy[..., 1]
+    size_limit = abs(proj.x_limits[1] - proj.x_limits[0]) / (2 * np.sqrt(2))
+    with np.errstate(invalid="ignore"):
+        diag0 = np.hypot(x[1:, 1:] - x[:-1, :-1], y[1:, 1:] - y[:-1, :-1])
+        diag1 = np.hypot(x[1:, :-1] - x[:-1, 1:], y[1:, :-1] - y[:-1, 1:])
+    bad_cells |= ~(diag0 <= size_limit) | ~(diag1 <= size_limit)
+    xy[bad] = 0.0
+    hit = (np.ascontiguousarray(xy), bad_cells)
+    _MESH_CACHE[key] = hit
+    while len(_MESH_CACHE) > MAX_CACHED_MESHES:
+        _MESH_CACHE.popitem(last=False)
+    return hit
+
+
 def _plot_tempdiff_mesh(
     ax: GeoAxes,
     lon: xr.DataArray,
@@ -65,21 +237,25 @@ def _plot_tempdiff_mesh(
     vmin: float | None = None,
     vmax: float | None = None,
 ):
-    """Plots the actual tempdiff map, calling the tempdiff function"""
-    lon_wrapped = _wrap180(np.asarray(lon))
-    T = tempdiff_f.where(np.isfinite(tempdiff_f))
-    return ax.pcolormesh(
-        lon_wrapped,
-        lat,
-        T,
-        transform=PC,
+    """Plots the actual tempdiff map on *ax* using the cached projected mesh for the grid."""
+    coords, bad_cells = _mesh_geometry(np.asarray(lon), np.asarray(lat), ax.projection)
+    values = np.asarray(tempdiff_f, dtype=float)
+    T = np.ma.masked_array(values, mask=~np.isfinite(values) | bad_cells)
+    mesh = QuadMesh(
+        coords,
         cmap=cmap,
-        shading="nearest",
         norm=norm,
-        vmin=vmin if norm is None else None,
-        vmax=vmax if norm is None else None,
+        edgecolors="none",
+        antialiased=False,
+        transform=ax.transData,  # already in map coordinates
         rasterized=True,
     )
+    mesh.set_array(T)
+    if norm is None:
+        mesh.set_clim(vmin, vmax)
+    mesh.autoscale_None()
+    ax.add_collection(mesh, autolim=False)
+    return mesh
 
 def plot_airports(ax: GeoAxes, airports: pd.DataFrame):
     """Scatter and label airports on an existing axis."""
@@ -95,15 +271,6 @@ def plot_airports(ax: GeoAxes, airports: pd.DataFrame):
             path_effects=[pe.withStroke(linewidth=2, foreground="white")]
         )
 
-try:
-    from scipy.spatial import cKDTree as _cKDTree  # type: ignore
-    cKDTree = _cKDTree  # rebind to a stable name
-    _HAS_KDTREE = True
-except Exception:
-    cKDTree = None  # type: ignore[assignment]
-    _HAS_KDTREE = False
-
-
 def _as_float_array(a) -> np.ndarray:
     """Coerce xarray/pandas/np scalars/arrays to float64 ndarray."""
     return np.asarray(a, dtype=float)
@@ -130,7 +297,9 @@ def _nearest_values_on_geo_grid(
     pts_lat: np.ndarray
 ) -> np.ndarray:
     """Return nearest-neighbor values from `da` for (pts_lon, pts_lat).
-    Works for both 1-D and 2-D lon/lat grids.
+    Works for both 1-D and 2-D lon/lat grids. The (grid, points) index is cached
+    by comparator.stations, so repeated frames on one grid are a single gather;
+    points whose nearest cell is NaN get the nearest finite value instead.
     """
     LON2, LAT2 = _to_2d_lonlat(lon_da, lat_da)
     VAL = _as_float_array(da.values)
@@ -144,31 +313,12 @@ def _nearest_values_on_geo_grid(
             # Last resort: ravel checks; if totally incompatible, bail to NaNs
             return np.full(len(pts_lon), np.nan, dtype=float)
 
-    # Flatten valid cells
-    mask = np.isfinite(LON2) & np.isfinite(LAT2) & np.isfinite(VAL)
-    if not np.any(mask):
+    if not (np.isfinite(LON2) & np.isfinite(LAT2)).any():
         return np.full(len(pts_lon), np.nan, dtype=float)
 
-    lon_flat = _wrap180(LON2[mask].ravel())
-    lat_flat = LAT2[mask].ravel()
-    val_flat = VAL[mask].ravel()
-
-    # Query points
-    qlon = _wrap180(_as_float_array(pts_lon))
-    qlat = _as_float_array(pts_lat)
-
-    if _HAS_KDTREE and cKDTree is not None:
-        tree = cKDTree(np.column_stack([lon_flat, lat_flat]))  # type: ignore[call-arg]
-        _, idx = tree.query(np.column_stack([qlon, qlat]), k=1)  # type: ignore[call-arg]
-        out = val_flat[idx]
-    else:
-        # NumPy fallback (fine for tens of airports)
-        q = np.column_stack([qlon, qlat])[:, None, :]                  # (N,1,2)
-        g = np.column_stack([lon_flat, lat_flat])[None, :, :]          # (1,M,2)
-        idx = np.argmin(np.sum((q - g) ** 2, axis=2), axis=1)          # (N,)
-        out = val_flat[idx]
-
-    return out.astype(float)
+    pts_lon, pts_lat = _as_float_array(pts_lon), _as_float_array(pts_lat)
+    index = stations.get_station_index(LON2, LAT2, pts_lon, pts_lat)
+    return stations.sample_finite(index, LON2, LAT2, VAL, pts_lon, pts_lat)
 
 
 def plot_tempdiff_map_with_table(
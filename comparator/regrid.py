@@ -0,0 +1,268 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+# Regridder weight store shared by every code path (single frame, GIF, batch).
+# Weights are keyed on a fingerprint of the source and target lon/lat arrays
+# plus the method, so a changed grid simply maps to a new key: stale weights
+# are never reused and no manual invalidation is needed.
+WEIGHTS_DIR = Path("./data/weights")
+MAX_CACHED_REGRIDDERS = 8
+# Threads a SparseRegridder spreads its blocks of target rows over (scipy's
+# sparse matmul releases the GIL); blocks are sized to stay in cache.
+REGRID_THREADS = min(4, os.cpu_count() or 1)
+_ROW_BLOCK = 1 << 14
+
+_REGRIDDERS: "OrderedDict[str, object]" = OrderedDict()
+_LOCK = threading.RLock()  # batch mode builds regridders from worker threads
+
+
+def grid_fingerprint(lon, lat) -> str:
+    """Return a short, stable hash of a lon/lat grid (shape + float64 values)."""
+    h = hashlib.blake2b(digest_size=8)
+    for arr in (lon, lat):
+        vals = np.ascontiguousarray(np.asarray(arr, dtype=np.float64))
+        h.update(repr(vals.shape).encode())
+        h.update(vals.tobytes())
+    return h.hexdigest()
+
+
+def weights_key(src_lon, src_lat, tgt_lon, tgt_lat, method: str = "bilinear") -> str:
+    """Cache key for a (source grid, target grid, method) weight set."""
+    return (
+        f"{method}_{grid_fingerprint(src_lon, src_lat)}"
+        f"_to_{grid_fingerprint(tgt_lon, tgt_lat)}"
+    )
+
+
+def _target_dims(lon, lat) -> tuple:
+    """Output dims the way xESMF names them: the target coordinates' own dims
+    when given as DataArrays, else ``("y", "x")`` / ``("lat", "lon")``."""
+    if np.ndim(lon) == 2:
+        return tuple(getattr(lon, "dims", ("y", "x")))
+    return (getattr(lat, "dims", ("lat",))[0], getattr(lon, "dims", ("lon",))[0])
+
+
+def _grid_shape(lon, lat) -> tuple:
+    """(ny, nx) of a curvilinear (2-D lon/lat) or rectilinear (1-D) grid."""
+    lon, lat = np.asarray(lon), np.asarray(lat)
+    return lon.shape if lon.ndim == 2 else (lat.size, lon.size)
+
+
+class SparseRegridder:
+    """ESMF regridding weights applied as one scipy.sparse CSR matmul.
+
+    Drop-in for an ``xe.Regridder`` call: the last two dims of the input are
+    the source grid, and every leading dim (variables, analysis hours) is
+    reshaped into a ``(n_fields, ny*nx)`` stack so the weight matrix is
+    applied to all of them at once. *dtype* float32 halves the memory
+    traffic (weights and data); *threads* splits the target rows over a
+    thread pool (default ``REGRID_THREADS``). Target cells no weight maps
+    to are NaN, as with xESMF's ``unmapped_to_nan``.
+    """
+
+    def __init__(self, weights, src_shape, tgt_lon, tgt_lat, method="bilinear",
+                 dtype=np.float64, threads=None):
+        import scipy.sparse as sp
+
+        self.tgt_dims = _target_dims(tgt_lon, tgt_lat)
+        self.tgt_lon, self.tgt_lat = np.asarray(tgt_lon), np.asarray(tgt_lat)
+        self.src_shape = tuple(src_shape)
+        self.tgt_shape = _grid_shape(self.tgt_lon, self.tgt_lat)
+        self.weights = sp.csr_matrix(weights, dtype=dtype)
+        expected = (int(np.prod(self.tgt_shape)), int(np.prod(self.src_shape)))
+        if self.weights.shape != expected:
+            raise ValueError(f"Weight matrix is {self.weights.shape}, grids need {expected}")
+        self.method = method
+        self.threads = threads
+        self._unmapped = np.flatnonzero(np.diff(self.weights.indptr) == 0)
+        self._blocks = None  # [(row0, row1, CSR rows)], sliced on first use
+
+    @classmethod
+    def from_file(cls, path, src_shape, tgt_lon, tgt_lat, method="bilinear", **kwargs):
+        """Read an ESMF/xESMF weight file (1-based ``row``/``col`` and ``S``)."""
+        import scipy.sparse as sp
+        import xarray as xr
+
+        with xr.open_dataset(path) as ds:
+            rows, cols, vals = (ds[v].values for v in ("row", "col", "S"))
+        n_tgt, n_src = int(np.prod(_grid_shape(tgt_lon, tgt_lat))), int(np.prod(src_shape))
+        coo = sp.coo_matrix((vals, (rows.astype(np.int64) - 1, cols.astype(np.int64) - 1)),
+                            shape=(n_tgt, n_src))
+        return cls(coo, src_shape, tgt_lon, tgt_lat, method, **kwargs)
+
+    @classmethod
+    def from_xesmf(cls, regridder, tgt_lon, tgt_lat, **kwargs):
+        """Take the weights out of an ``xe.Regridder``."""
+        import scipy.sparse as sp
+
+        weights = regridder.weights
+        if not sp.issparse(weights):
+            weights = getattr(weights, "data", weights)  # DataArray around a sparse.COO
+            if hasattr(weights, "to_scipy_sparse"):
+                weights = weights.to_scipy_sparse()
+        return cls(weights, regridder.shape_in, tgt_lon, tgt_lat, regridder.method, **kwargs)
+
+    @property
+    def dtype(self):
+        return self.weights.dtype
+
+    def astype(self, dtype):
+        """The same regridder computing in *dtype* (e.g. ``np.float32``)."""
+        other = SparseRegridder(self.weights, self.src_shape, self.tgt_lon, self.tgt_lat,
+                                self.method, dtype=dtype, threads=self.threads)
+        other.tgt_dims = self.tgt_dims
+        return other
+
+    def _row_blocks(self):
+        if self._blocks is None:
+            n_tgt = self.weights.shape[0]
+            self._blocks = [(a, min(a + _ROW_BLOCK, n_tgt), self.weights[a:a + _ROW_BLOCK])
+                            for a in range(0, n_tgt, _ROW_BLOCK)]
+        return self._blocks
+
+    def apply(self, values):
+        """Regrid a ``(..., ny, nx)`` array; returns ``(..., ny_out, nx_out)``."""
+        values = np.asarray(values)
+        if values.shape[-2:] != self.src_shape:
+            raise ValueError(f"Input grid {values.shape[-2:]} != source grid {self.src_shape}")
+        lead = values.shape[:-2]
+        n_tgt, n_src = self.weights.shape
+        stack = values.reshape(-1, n_src).astype(self.dtype, copy=False)
+        if len(stack) == 1:
+            out = (self.weights @ stack[0])[None]  # one field: a plain matvec
+        else:
+            # csr @ dense wants one column per field; each block of target rows
+            # is written back field-major while it is still in cache
+            columns = np.ascontiguousarray(stack.T)
+            out = np.empty((len(stack), n_tgt), dtype=self.dtype)
+
+            def _rows(block):
+                a, b, w = block
+                out[:, a:b] = (w @ columns).T
+
+            threads = self.threads or REGRID_THREADS
+            if threads > 1:
+                with ThreadPoolExecutor(max_workers=threads) as pool:
+                    list(pool.map(_rows, self._row_blocks()))
+            else:
+                for block in self._row_blocks():
+                    _rows(block)
+        out[:, self._unmapped] = np.nan
+        return out.reshape(lead + self.tgt_shape)
+
+    def __call__(self, da):
+        """Regrid a DataArray like ``xe.Regridder`` (plain arrays via ``apply``)."""
+        import xarray as xr
+
+        if not isinstance(da, xr.DataArray):
+            return self.apply(da)
+        horiz = set(da.dims[-2:])
+        out_dims = self.tgt_dims
+        coords = {k: c for k, c in da.coords.items() if not horiz & set(c.dims)}
+        if self.tgt_lon.ndim == 2:
+            coords.update(lon=(out_dims, self.tgt_lon), lat=(out_dims, self.tgt_lat))
+        else:
+            coords.update(lon=(out_dims[1], self.tgt_lon), lat=(out_dims[0], self.tgt_lat))
+        return xr.DataArray(self.apply(da.values), dims=da.dims[:-2] + out_dims, coords=coords,
+                            name=da.name, attrs={"regrid_method": self.method})
+
+
+def _build_regridder(src_grid: dict, tgt_grid: dict, method: str, weights_path: Path):
+    """Build a SparseRegridder, reading *weights_path* when it exists.
+
+    Stored weights need neither xESMF nor ESMF; otherwise ESMF generates
+    them and xESMF writes them to *weights_path* for the next run.
+    """
+    src_shape = _grid_shape(src_grid["lon"], src_grid["lat"])
+    if weights_path.exists():
+        try:
+            return SparseRegridder.from_file(
+                weights_path, src_shape, tgt_grid["lon"], tgt_grid["lat"], method
+            )
+        except Exception as e:
+            # Corrupt/partial weights file: rebuild from scratch.
+            print(f"  Rebuilding regridder weights ({weights_path.name}): {e}")
+            weights_path.unlink()
+    import xesmf as xe
+
+    regridder = xe.Regridder(
+        src_grid, tgt_grid, method=method, periodic=False,
+        reuse_weights=False, filename=str(weights_path),
+    )
+    if not weights_path.exists():
+        regridder.to_netcdf(str(weights_path))
+    return SparseRegridder.from_xesmf(regridder, tgt_grid["lon"], tgt_grid["lat"])
+
+
+def get_regridder(
+    src_lon,
+    src_lat,
+    tgt_lon,
+    tgt_lat,
+    method: str = "bilinear",
+    weights_dir=WEIGHTS_DIR,
+):
+    """Return a regridder from *src* to *tgt*, generating weights only once.
+
+    Lookup order: in-process LRU (hot regridders), then the on-disk weight
+    file for this grid fingerprint, then a fresh ESMF weight generation that
+    is written back to disk for the next run.
+    """
+    key = weights_key(src_lon, src_lat, tgt_lon, tgt_lat, method)
+    with _LOCK:
+        regridder = _REGRIDDERS.get(key)
+        if regridder is not None:
+            _REGRIDDERS.move_to_end(key)
+            return regridder
+
+        weights_dir = Path(weights_dir)
+        weights_dir.mkdir(parents=True, exist_ok=True)
+        weights_path = weights_dir / f"weights_{key}.nc"
+        regridder = _build_regridder(
+            {"lon": src_lon, "lat": src_lat},
+            {"lon": tgt_lon, "lat": tgt_lat},
+            method,
+            weights_path,
+        )
+
+        _REGRIDDERS[key] = regridder
+        while len(_REGRIDDERS) > MAX_CACHED_REGRIDDERS:
+            _REGRIDDERS.popitem(last=False)
+        return regridder
+
+
+def clear_regridder_cache():
+    """Drop every in-process regridder (weight files on disk are kept)."""
+    with _LOCK:
+        _REGRIDDERS.clear()
+
+
+def regrid_fields(regridder, fields: dict) -> dict:
+    """Apply *regridder* to every field in ``{name: DataArray}`` in one call.
+
+    The fields (all on the same source grid) are stacked along a leading
+    ``field`` dimension so the weight matrix is applied once to the whole
+    stack instead of once per variable.
+    """
+    if not fields:
+        return {}
+    import xarray as xr
+
+    names = list(fields)
+    first = fields[names[0]]
+    stacked = xr.DataArray(
+        np.stack([np.asarray(fields[n].values) for n in names]),
+        dims=("field",) + first.dims,
+        coords={d: first.coords[d] for d in first.dims if d in first.coords},
+    )
+    out = regridder(stacked)
+    return {
+        name: out.isel(field=i, drop=True).rename(fields[name].name).assign_attrs(fields[name].attrs)
+        for i, name in enumerate(names)
+    }
@@ -0,0 +1,112 @@
+import hashlib
+from multiprocessing import shared_memory
+
+import numpy as np
+import xarray as xr
+
+# Zero-copy hand-off of large arrays to worker processes.
+# The parent copies each array once into a multiprocessing.shared_memory block
+# and passes a small, picklable *spec* to the workers, which attach read-only
+# NumPy views on the same pages instead of unpickling private copies.
+
+_ATTACHED: dict = {}  # block name -> SharedMemory, kept alive for the views
+
+
+class SharedArrayStore:
+    """Parent-side owner of the shared-memory blocks handed to workers.
+
+    Identical arrays (e.g. the same 2-D longitude used as a coordinate of
+    several DataArrays) are stored once. Use as a context manager so every
+    block is closed and unlinked when the pool is done.
+    """
+
+    def __init__(self):
+        self._blocks = {}  # content digest -> (SharedMemory, spec)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def put_array(self, arr) -> dict:
+        """Copy *arr* into shared memory (once per distinct content); return its spec."""
+        arr = np.ascontiguousarray(arr)
+        if arr.dtype.hasobject:
+            return {"inline": arr}
+        h = hashlib.blake2b(repr((arr.shape, arr.dtype.str)).encode(), digest_size=16)
+        h.update(arr.data)
+        digest = h.hexdigest()
+        if digest not in self._blocks:
+            shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+            np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[...] = arr
+            spec = {"shm": shm.name, "shape": arr.shape, "dtype": arr.dtype.str}
+            self._blocks[digest] = (shm, spec)
+        return self._blocks[digest][1]
+
+    def put_dataarray(self, da: xr.DataArray) -> dict:
+        """Share a DataArray's values and array coordinates; return its spec."""
+        coords = {}
+        for name, coord in da.coords.items():
+            if coord.ndim == 0:
+                coords[name] = {"dims": (), "values": {"inline": coord.values}}
+            else:
+                coords[name] = {"dims": coord.dims, "values": self.put_array(coord.values)}
+        return {
+            "values": self.put_array(da.values),
+            "dims": da.dims,
+            "coords": coords,
+            "name": da.name,
+            "attrs": dict(da.attrs),
+        }
+
+    @property
+    def nbytes(self) -> int:
+        return sum(shm.size for shm, _ in self._blocks.values())
+
+    def close(self):
+        """Release and unlink every block (workers must be finished)."""
+        for shm, _ in self._blocks.values():
+            shm.close()
+            try:
+                shm.unlink()
+            except FileNotFoundError:
+                pass
+        self._blocks.clear()
+
+
+def _attach_block(name: str) -> shared_memory.SharedMemory:
+    shm = _ATTACHED.get(name)
+    if shm is None:
+        # Pool workers share the parent's resource tracker, so attaching does
+        # not take ownership: only SharedArrayStore.close() unlinks a block.
+        try:
+            shm = shared_memory.SharedMemory(name=name, track=False)  # Python >= 3.13
+        except TypeError:
+            shm = shared_memory.SharedMemory(name=name)
+        _ATTACHED[name] = shm
+    return shm
+
+
+def attach_array(spec: dict) -> np.ndarray:
+    """Return a read-only NumPy view for an array spec from SharedArrayStore."""
+    if "inline" in spec:
+        return spec["inline"]
+    shm = _attach_block(spec["shm"])
+    arr = np.ndarray(spec["shape"], dtype=np.dtype(spec["dtype"]), buffer=shm.buf)
+    arr.flags.writeable = False
+    return arr
+
+
+def attach_dataarray(spec: dict) -> xr.DataArray:
+    """Rebuild a DataArray whose values/coords are views on shared memory."""
+    coords = {
+        name: (c["dims"], attach_array(c["values"])) for name, c in spec["coords"].items()
+    }
+    return xr.DataArray(
+        attach_array(spec["values"]),
+        dims=spec["dims"],
+        coords=coords,
+        name=spec["name"],
+        attrs=spec["attrs"],
+    )
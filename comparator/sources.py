@@ -0,0 +1,486 @@
+import functools
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import NamedTuple
+
+from . import normalize as norm
+from . import timing
+
+# Data sources behind every GRIB lookup. new_comparison.py asks open_file()
+# for a handle and only uses the Herbie-like part of its API: truthiness (file
+# found), .date / .fxx, get_localFilePath(search), download(search) and
+# xarray(search, remove_grib=..., **xarray_kwargs). Herbie (remote discovery
+# + .idx byte ranges) is the default backend; "local" maps (model, product,
+# cycle, fxx) straight to a file on a mirrored filesystem through a path
+# template and never touches the network. Models are routed to a backend with
+# configure(), e.g. from ``--source`` or the ``data: sources:`` config block.
+class Source(NamedTuple):
+    """A backend name, its path *template* (local) and an optional *fallback* backend."""
+
+    backend: str = "herbie"
+    template: str | None = None
+    fallback: str | None = None
+
+
+HERBIE = Source()
+
+# Inventory files looked for next to a mirrored GRIB file (wgrib2 / ECMWF style)
+IDX_SUFFIXES = (".idx", ".index")
+
+# ECMWF JSON index keys that make up the search string (as Herbie builds it)
+_ECCODES_SEARCH_KEYS = (
+    "param", "levelist", "levtype", "number", "domain", "expver", "class", "type", "stream",
+)
+
+_ROUTES = {}  # model_key or "default" -> Source
+
+
+### Herbie source-resolution cache
+# Herbie(...) probes its source priority list (an HTTP request per source)
+# and later downloads the .idx inventory, for every file, on every run. Both
+# results are kept on disk under <save_dir>/sources/ per (model, product,
+# cycle, fxx): a JSON entry with the resolved GRIB/index URLs and the raw
+# index text. Files of finished cycles do not change, so those entries never
+# expire; entries resolved while a cycle was still recent (files may still be
+# arriving) or pointing at a rolling-retention server expire after a TTL, and
+# "not found" results are retried after a longer one. Entries are written to
+# a temporary file and renamed into place, so threads and worker processes
+# sharing a cache directory never see partial files.
+FINAL_AGE = timedelta(hours=12)
+RECENT_TTL = timedelta(minutes=10)
+MISSING_TTL = timedelta(hours=6)
+SOURCE_TTL = {"nomads": timedelta(days=1)}
+
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _write_atomic(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    part = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.part")
+    part.write_text(text)
+    os.replace(part, path)
+
+
+class ResolutionCache:
+    """On-disk cache of where each model file was found and its inventory."""
+
+    def __init__(self, root):
+        self.root = Path(root)
+
+    def _path(self, model_key, run_dt, fxx, suffix):
+        product = norm.herbie_kwargs_for(model_key).get("product", "")
+        name = f"{model_key}_{product}_{run_dt:%Y%m%d%H}_f{int(fxx):03d}{suffix}"
+        return self.root / model_key / re.sub(r"[^\w.-]", "_", name)
+
+    @staticmethod
+    def expires(entry, run_dt):
+        """When *entry* goes stale (None: never)."""
+        resolved = datetime.fromisoformat(entry["resolved_at"])
+        final = resolved - run_dt >= FINAL_AGE
+        if entry["grib"] is None:
+            return resolved + (MISSING_TTL if final else RECENT_TTL)
+        if not final:
+            return resolved + RECENT_TTL
+        ttl = SOURCE_TTL.get(entry["grib_source"])
+        return resolved + ttl if ttl else None
+
+    def get(self, model_key, run_dt, fxx, now=None):
+        """The fresh entry for one file, or None (missing, stale or unreadable)."""
+        try:
+            entry = json.loads(self._path(model_key, run_dt, fxx, ".json").read_text())
+        except (OSError, ValueError):
+            return None
+        expires = self.expires(entry, run_dt)
+        if expires is not None and (now or _utcnow()) >= expires:
+            return None
+        return entry
+
+    def put(self, model_key, run_dt, fxx, grib, grib_source, idx, idx_source, now=None):
+        entry = {
+            "grib": None if grib is None else str(grib),
+            "grib_source": grib_source,
+            "idx": None if idx is None else str(idx),
+            "idx_source": idx_source,
+            "resolved_at": (now or _utcnow()).isoformat(),
+        }
+        self._path(model_key, run_dt, fxx, ".idx").unlink(missing_ok=True)
+        _write_atomic(self._path(model_key, run_dt, fxx, ".json"), json.dumps(entry))
+        return entry
+
+    def inventory_path(self, model_key, run_dt, fxx):
+        """The cached index file of one model file, if there is one."""
+        path = self._path(model_key, run_dt, fxx, ".idx")
+        return path if path.is_file() else None
+
+    def put_inventory(self, model_key, run_dt, fxx, text):
+        _write_atomic(self._path(model_key, run_dt, fxx, ".idx"), text)
+
+
+_CACHED_HERBIE = None
+
+
+def _cached_herbie_class():
+    """Herbie subclass that resolves sources and inventories through a ResolutionCache."""
+    global _CACHED_HERBIE
+    if _CACHED_HERBIE is not None:
+        return _CACHED_HERBIE
+    from herbie.core import Herbie
+
+    class CachedHerbie(Herbie):
+        def __init__(self, date, *, cache, model_key, **kwargs):
+            self._cache = cache
+            self._key = (model_key, date, kwargs["fxx"])
+            self._entry = cache.get(*self._key)
+            super().__init__(date, **kwargs)
+            if self._entry is None and self.grib_source != "local":
+                cache.put(*self._key, self.grib, self.grib_source,
+                          None if self.idx_source == "local" else self.idx,
+                          None if self.idx_source == "local" else self.idx_source)
+
+        def find_grib(self):
+            # a full local copy still wins, as in Herbie
+            if self._entry is None or self.get_localFilePath().exists():
+                return super().find_grib()
+            return self._entry["grib"], self._entry["grib_source"]
+
+        def find_idx(self):
+            if self._entry is None or self._entry["idx"] is None:
+                return super().find_idx() if self._entry is None else (None, None)
+            cached = self._cache.inventory_path(*self._key)
+            if cached is not None:
+                return cached, "local"
+            return self._entry["idx"], self._entry["idx_source"]
+
+        @functools.cached_property
+        def index_as_dataframe(self):
+            df = Herbie.index_as_dataframe.func(self)
+            if self.idx_source not in (None, "local", "generated"):
+                # Herbie saved the downloaded index next to the GRIB subset
+                idx_file = Path(self.get_localIndexFilePath())
+                if idx_file.is_file():
+                    self._cache.put_inventory(*self._key, idx_file.read_text())
+            return df
+
+    _CACHED_HERBIE = CachedHerbie
+    return CachedHerbie
+
+
+def _open_herbie(model_key, run_dt, fxx, save_dir, source):
+    return _cached_herbie_class()(
+        run_dt,
+        cache=ResolutionCache(Path(save_dir) / "sources"),
+        model_key=model_key,
+        fxx=fxx,
+        save_dir=str(save_dir),
+        overwrite=False,
+        **norm.herbie_kwargs_for(model_key),
+    )
+
+
+### Path templates
+def template_fields(model_key, run_dt, fxx) -> dict:
+    """Fields available to a path template.
+
+    ``{model_key}`` (hrrr, nam12k, ...), the model's Herbie kwargs (``{model}``,
+    ``{product}``, and ``{domain}``/``{member}`` where set), ``{cycle}`` and
+    ``{valid}`` datetimes (use format specs: ``{cycle:%Y%m%d}``) and ``{fxx}``.
+    """
+    return {
+        **norm.herbie_kwargs_for(model_key),
+        "model_key": model_key,
+        "cycle": run_dt,
+        "valid": run_dt + timedelta(hours=int(fxx)),
+        "fxx": int(fxx),
+    }
+
+
+def expand_template(template, model_key, run_dt, fxx) -> Path:
+    """The file path *template* gives for one model run."""
+    try:
+        return Path(template.format(**template_fields(model_key, run_dt, fxx)))
+    except (KeyError, IndexError) as e:
+        raise ValueError(f"Unknown field {e} in source template {template!r}") from None
+
+
+### GRIB inventories
+def _parse_wgrib2_idx(lines, size):
+    inventory = []
+    for line in lines:
+        parts = line.split(":")
+        inventory.append([":" + ":".join(parts[3:]).rstrip(":") + ":", int(parts[1]), None])
+    for this, nxt in zip(inventory, inventory[1:]):
+        this[2] = nxt[1]
+    if inventory:
+        inventory[-1][2] = size
+    return [tuple(m) for m in inventory]
+
+
+def _parse_eccodes_idx(lines):
+    inventory = []
+    for line in lines:
+        rec = json.loads(line)
+        search = ":".join(str(rec[k]) for k in _ECCODES_SEARCH_KEYS if k in rec)
+        start = int(rec["_offset"])
+        inventory.append((f":{search}:", start, start + int(rec["_length"])))
+    return inventory
+
+
+def _index_lines(grib_path):
+    for suffix in IDX_SUFFIXES:
+        for idx in (grib_path.with_name(grib_path.name + suffix), grib_path.with_suffix(suffix)):
+            if idx.is_file():
+                return idx.read_text().splitlines()
+    wgrib2 = shutil.which("wgrib2")
+    if wgrib2:
+        out = subprocess.run([wgrib2, "-s", str(grib_path)], capture_output=True, text=True)
+        if out.returncode == 0:
+            return out.stdout.splitlines()
+    return None
+
+
+def read_inventory(grib_path):
+    """``[(search_this, start, end)]`` for every message of a GRIB file.
+
+    Read from an index next to the file (wgrib2 ``.idx`` or ECMWF JSON
+    ``.index``), or made with ``wgrib2 -s`` when there is none. *search_this*
+    is the string Herbie matches selectors against; *end* is exclusive.
+    Returns None when no inventory is available.
+    """
+    grib_path = Path(grib_path)
+    lines = _index_lines(grib_path)
+    if lines is None:
+        return None
+    lines = [ln.strip() for ln in lines if ln.strip()]
+    if lines and lines[0].startswith("{"):
+        return _parse_eccodes_idx(lines)
+    return _parse_wgrib2_idx(lines, grib_path.stat().st_size)
+
+
+def open_grib(grib_path, backend_kwargs=None, remove_grib=False):
+    """Decode a local GRIB file with cfgrib, the way Herbie.xarray() does.
+
+    Every hypercube is opened, and a single dataset is returned when there is
+    only one. With *remove_grib* the data are loaded into memory and the file
+    is deleted.
+    """
+    import cfgrib
+
+    backend_kwargs = dict(backend_kwargs or {})
+    backend_kwargs.setdefault("indexpath", "")
+    backend_kwargs.setdefault("errors", "raise")
+    datasets = cfgrib.open_datasets(
+        str(grib_path), backend_kwargs=backend_kwargs, decode_timedelta=True
+    )
+    if remove_grib:
+        datasets = [ds.load() for ds in datasets]
+        for ds in datasets:
+            ds.close()
+        Path(grib_path).unlink(missing_ok=True)
+    return datasets[0] if len(datasets) == 1 else datasets
+
+
+class LocalArchive:
+    """One model file on a mirrored filesystem, read without any network access.
+
+    The path comes from the source template. When the file has an inventory,
+    download() copies only the messages matching the search string into a
+    subset file under *save_dir* (as Herbie does with remote byte ranges);
+    without one, the mirrored file is decoded in place and never removed.
+    """
+
+    def __init__(self, model_key, run_dt, fxx, save_dir, source):
+        if not source.template:
+            raise ValueError("The local source needs a path template.")
+        self.model_key = model_key
+        self.date = run_dt
+        self.fxx = int(fxx)
+        self.save_dir = Path(save_dir)
+        self.grib = expand_template(os.path.expandvars(os.path.expanduser(source.template)),
+                                    model_key, run_dt, fxx)
+        self._inventory = False  # not read yet
+
+    def __bool__(self):
+        return self.grib.is_file()
+
+    def __repr__(self):
+        return f"LocalArchive({self.model_key} {self.date:%Y-%m-%d %H}Z F{self.fxx:02d}: {self.grib})"
+
+    def inventory(self):
+        if self._inventory is False:
+            self._inventory = read_inventory(self.grib)
+        return self._inventory
+
+    def byte_ranges(self, search) -> list:
+        """Merged ``(start, end)`` ranges of the messages matching *search*."""
+        pattern = re.compile(search)
+        ranges = []
+        for text, start, end in self.inventory():
+            if not pattern.search(text):
+                continue
+            if ranges and ranges[-1][1] == start:
+                ranges[-1] = (ranges[-1][0], end)
+            else:
+                ranges.append((start, end))
+        return ranges
+
+    def get_localFilePath(self, search=None) -> Path:
+        """The file download(*search*) produces: a subset, or the mirrored file itself."""
+        if search is None or self.inventory() is None:
+            return self.grib
+        digest = hashlib.md5(search.encode()).hexdigest()[:10]
+        name = f"subset_{digest}_t{self.date:%H}z_f{self.fxx:03d}__{self.grib.name}"
+        return self.save_dir / self.model_key / f"{self.date:%Y%m%d}" / name
+
+    def download(self, search=None, **kwargs) -> Path:
+        """Copy the messages matching *search* into the local subset file."""
+        out = self.get_localFilePath(search)
+        if out == self.grib or out.exists():
+            return out
+        ranges = self.byte_ranges(search)
+        if not ranges:
+            raise ValueError(f"No GRIB messages in {self.grib} match {search!r}")
+        out.parent.mkdir(parents=True, exist_ok=True)
+        part = out.with_name(out.name + ".part")
+        with open(self.grib, "rb") as src, open(part, "wb") as dst:
+            for start, end in ranges:
+                src.seek(start)
+                dst.write(src.read(end - start))
+        os.replace(part, out)
+        return out
+
+    def xarray(self, search=None, remove_grib=True, **xarray_kwargs):
+        """Decode the matching messages (a Dataset, or a list of hypercubes)."""
+        path = self.download(search)
+        return open_grib(
+            path,
+            xarray_kwargs.get("backend_kwargs"),
+            remove_grib=remove_grib and path != self.grib,
+        )
+
+
+# Backend name -> opener(model_key, run_dt, fxx, save_dir, source)
+BACKENDS = {
+    "herbie": _open_herbie,
+    "local": LocalArchive,
+}
+
+
+def register_backend(name, opener):
+    """Add (or replace) a backend; *opener* returns a Herbie-like handle."""
+    BACKENDS[name] = opener
+
+
+### Routing models to backends
+def parse_source(spec) -> Source:
+    """Source from ``"herbie"``, ``"local:TEMPLATE"`` or ``{backend, template, fallback}``."""
+    if isinstance(spec, Source):
+        source = spec
+    elif isinstance(spec, dict):
+        unknown = set(spec) - set(Source._fields)
+        if unknown:
+            raise ValueError(f"Unknown source option(s) {sorted(unknown)} in {spec}")
+        source = Source(**spec)
+    elif isinstance(spec, str):
+        backend, _, template = spec.strip().partition(":")
+        source = Source(backend.strip().lower(), template or None)
+    else:
+        raise ValueError(f"Invalid data source: {spec!r}")
+    for name in (source.backend, source.fallback):
+        if name is not None and name not in BACKENDS:
+            raise ValueError(
+                f"Unknown data source backend {name!r}. Choose one of: {', '.join(BACKENDS)}"
+            )
+    if source.backend == "local" and not source.template:
+        raise ValueError("The local source needs a path template, e.g. local:/mirror/{model}/...")
+    return source
+
+
+def _route_key(text):
+    key = str(text).strip().lower()
+    if key == "default":
+        return key
+    try:
+        return norm.normalize_verif_key(key)
+    except ValueError:
+        return norm.normalize_model_key(key)
+
+
+def parse_sources(spec) -> dict:
+    """``{model_key or "default": Source}`` from a config mapping or CLI strings.
+
+    A mapping uses model names (or ``default``) as keys. Each CLI string is
+    ``[MODEL=]BACKEND[:TEMPLATE]``; without ``MODEL=`` it is the default.
+    """
+    if not spec:
+        return {}
+    if isinstance(spec, (str, Source)):
+        spec = [spec]
+    if isinstance(spec, dict):
+        return {_route_key(k): parse_source(v) for k, v in spec.items()}
+    routes = {}
+    for item in spec:
+        key = "default"
+        if isinstance(item, str):
+            head, sep, rest = item.partition("=")
+            if sep and not re.search(r"[:/\\{]", head):
+                key, item = _route_key(head), rest
+        routes[key] = parse_source(item)
+    return routes
+
+
+def configure(routes):
+    """Route models to backends (``{model_key or "default": Source}``); {} resets to Herbie."""
+    _ROUTES.clear()
+    _ROUTES.update(routes or {})
+
+
+def routes() -> dict:
+    return dict(_ROUTES)
+
+
+def source_for(model_key) -> Source:
+    return _ROUTES.get(model_key) or _ROUTES.get("default") or HERBIE
+
+
+def open_file(model_key, run_dt, fxx, save_dir):
+    """Herbie-like handle for one model/analysis file (falsy when unavailable)."""
+    source = source_for(model_key)
+    handle = BACKENDS[source.backend](model_key, run_dt, fxx, save_dir, source)
+    if not handle and source.fallback:
+        fallback = source._replace(backend=source.fallback, fallback=None)
+        handle = BACKENDS[fallback.backend](model_key, run_dt, fxx, save_dir, fallback)
+    return handle
+
+
+def probe(items, save_dir, max_workers=16) -> dict:
+    """Check concurrently which ``(model_key, (cycle_dt, fxx))`` files exist.
+
+    Returns ``{item: bool}``. Lookups go through open_file(), so Herbie
+    results land in the resolution cache and the download stage reuses them;
+    a lookup that raises counts as unavailable.
+    """
+    def check(item):
+        model_key, (run_dt, fxx) = item
+        with timing.timed("probe", model=model_key, cycle=f"{run_dt:%Y%m%d%H}", fxx=int(fxx)):
+            try:
+                return bool(open_file(model_key, run_dt, fxx, save_dir))
+            except Exception as e:
+                print(f"  Lookup failed for {model_key.upper()} "
+                      f"{run_dt:%Y-%m-%d %H}Z F{fxx:02d}: {e}")
+                return False
+
+    items = list(items)
+    if not items:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as pool:
+        return dict(zip(items, pool.map(check, items)))
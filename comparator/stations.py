@@ -0,0 +1,205 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+
+from .regrid import grid_fingerprint
+
+# Station index: for a (grid, station list) pair, the nearest grid cell of
+# every station and the four corners + bilinear weights of the cell it falls
+# in. Built once with a KD-tree over the grid and cached (in memory and, for
+# large grids, as .npz under STATION_INDEX_DIR); sampling a frame is then a
+# single fancy-index gather, however many stations there are.
+STATION_INDEX_DIR = Path("./data/stations")
+MIN_DISK_CACHE_CELLS = 100_000  # smaller grids are cheap to index in memory
+MAX_CACHED_INDEXES = 8
+_INDEXES: OrderedDict = OrderedDict()
+_LOCK = threading.RLock()
+
+
+class StationIndex(NamedTuple):
+    iy: np.ndarray        # (n,) row of the nearest grid cell
+    ix: np.ndarray        # (n,) column of the nearest grid cell
+    corner_iy: np.ndarray  # (n, 4) rows of the enclosing cell's corners
+    corner_ix: np.ndarray  # (n, 4) columns of the enclosing cell's corners
+    weights: np.ndarray    # (n, 4) bilinear weights (nearest-only if outside the grid)
+
+
+def _unit_xyz(lon, lat) -> np.ndarray:
+    lon_r, lat_r = np.radians(lon), np.radians(lat)
+    cos_lat = np.cos(lat_r)
+    return np.stack([cos_lat * np.cos(lon_r), cos_lat * np.sin(lon_r), np.sin(lat_r)], axis=-1)
+
+
+def _grid_2d(lon, lat):
+    lon = np.asarray(lon, dtype=float)
+    lat = np.asarray(lat, dtype=float)
+    if lon.ndim == 1 and lat.ndim == 1:
+        lon, lat = np.meshgrid(lon, lat)
+    return lon, lat
+
+
+def _nearest_cells(lon2, lat2, st_lon, st_lat, valid=None):
+    """(iy, ix) of the grid cell nearest (great-circle) to each station.
+
+    Only cells where *valid* (a boolean grid, default all) is True are considered.
+    """
+    from scipy.spatial import cKDTree
+
+    ok = np.isfinite(lon2) & np.isfinite(lat2)
+    if valid is not None:
+        ok &= valid
+    flat = np.flatnonzero(ok.ravel())
+    tree = cKDTree(_unit_xyz(lon2.ravel()[flat], lat2.ravel()[flat]))
+    _, k = tree.query(_unit_xyz(st_lon, st_lat), k=1)
+    return np.unravel_index(flat[k], lon2.shape)
+
+
+def _bilinear_cells(lon2, lat2, iy, ix, st_lon, st_lat):
+    """Corners + weights of the grid cell containing each station.
+
+    Tries the four cells that share the nearest node and inverts the bilinear
+    map of each (a few Newton steps in a local equirectangular plane). Stations
+    not inside any of them keep all weight on the nearest node.
+    """
+    ny, nx = lon2.shape
+    n = len(st_lon)
+    corner_iy = np.repeat(iy[:, None], 4, axis=1)
+    corner_ix = np.repeat(ix[:, None], 4, axis=1)
+    weights = np.zeros((n, 4))
+    weights[:, 0] = 1.0
+    found = np.zeros(n, dtype=bool)
+    if ny < 2 or nx < 2:
+        return corner_iy, corner_ix, weights
+
+    coslat = np.cos(np.radians(st_lat))
+    for dy, dx in ((0, 0), (-1, 0), (0, -1), (-1, -1)):
+        j0 = np.clip(iy + dy, 0, ny - 2)
+        i0 = np.clip(ix + dx, 0, nx - 2)
+        cj = np.stack([j0, j0, j0 + 1, j0 + 1], axis=1)
+        ci = np.stack([i0, i0 + 1, i0, i0 + 1], axis=1)
+        # corner offsets from the station, in degrees of latitude
+        dlon = (lon2[cj, ci] - st_lon[:, None] + 180.0) % 360.0 - 180.0
+        px = dlon * coslat[:, None]
+        py = lat2[cj, ci] - st_lat[:, None]
+        s = np.full(n, 0.5)
+        t = np.full(n, 0.5)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            for _ in range(8):
+                # P(s,t) = (1-s)(1-t) P00 + s(1-t) P01 + (1-s)t P10 + st P11, solve P = 0
+                fx = (1 - s) * (1 - t) * px[:, 0] + s * (1 - t) * px[:, 1] + (1 - s) * t * px[:, 2] + s * t * px[:, 3]
+                fy = (1 - s) * (1 - t) * py[:, 0] + s * (1 - t) * py[:, 1] + (1 - s) * t * py[:, 2] + s * t * py[:, 3]
+                dxs = (1 - t) * (px[:, 1] - px[:, 0]) + t * (px[:, 3] - px[:, 2])
+                dys = (1 - t) * (py[:, 1] - py[:, 0]) + t * (py[:, 3] - py[:, 2])
+                dxt = (1 - s) * (px[:, 2] - px[:, 0]) + s * (px[:, 3] - px[:, 1])
+                dyt = (1 - s) * (py[:, 2] - py[:, 0]) + s * (py[:, 3] - py[:, 1])
+                det = dxs * dyt - dxt * dys
+                s = s - (fx * dyt - fy * dxt) / det
+                t = t - (fy * dxs - fx * dys) / det
+            eps = 1e-6
+            inside = (~found & np.isfinite(s) & np.isfinite(t)
+                      & (s >= -eps) & (s <= 1 + eps) & (t >= -eps) & (t <= 1 + eps))
+        s, t = np.clip(s, 0, 1), np.clip(t, 0, 1)
+        w = np.stack([(1 - s) * (1 - t), s * (1 - t), (1 - s) * t, s * t], axis=1)
+        corner_iy[inside], corner_ix[inside], weights[inside] = cj[inside], ci[inside], w[inside]
+        found |= inside
+    return corner_iy, corner_ix, weights
+
+
+def build_station_index(lon, lat, st_lon, st_lat) -> StationIndex:
+    """Compute the StationIndex for stations (*st_lon*, *st_lat*) on a 1-D or 2-D grid."""
+    lon2, lat2 = _grid_2d(lon, lat)
+    lon2 = (lon2 + 180.0) % 360.0 - 180.0
+    st_lon = (np.asarray(st_lon, dtype=float) + 180.0) % 360.0 - 180.0
+    st_lat = np.asarray(st_lat, dtype=float)
+    iy, ix = _nearest_cells(lon2, lat2, st_lon, st_lat)
+    corner_iy, corner_ix, weights = _bilinear_cells(lon2, lat2, iy, ix, st_lon, st_lat)
+    return StationIndex(iy, ix, corner_iy, corner_ix, weights)
+
+
+def _stations_fingerprint(st_lon, st_lat) -> str:
+    h = hashlib.blake2b(digest_size=8)
+    h.update(np.ascontiguousarray(st_lon, dtype=np.float64).tobytes())
+    h.update(np.ascontiguousarray(st_lat, dtype=np.float64).tobytes())
+    return h.hexdigest()
+
+
+def get_station_index(lon, lat, st_lon, st_lat, cache_dir=STATION_INDEX_DIR) -> StationIndex:
+    """Return the StationIndex for this grid + station list, building it at most once.
+
+    Kept in a small in-process LRU; for grids of at least MIN_DISK_CACHE_CELLS
+    cells also saved as ``{cache_dir}/{grid}_{stations}.npz``.
+    """
+    lon2, lat2 = _grid_2d(lon, lat)
+    key = f"{grid_fingerprint(lon2, lat2)}_{_stations_fingerprint(st_lon, st_lat)}"
+    with _LOCK:
+        index = _INDEXES.get(key)
+        if index is not None:
+            _INDEXES.move_to_end(key)
+            return index
+
+        path = Path(cache_dir) / f"{key}.npz"
+        on_disk = lon2.size >= MIN_DISK_CACHE_CELLS
+        if on_disk and path.exists():
+            with np.load(path) as z:
+                index = StationIndex(*(z[f] for f in StationIndex._fields))
+        else:
+            index = build_station_index(lon2, lat2, st_lon, st_lat)
+            if on_disk:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = path.with_name(f"{path.stem}.tmp.npz")
+                np.savez(tmp, **index._asdict())
+                tmp.replace(path)
+
+        _INDEXES[key] = index
+        while len(_INDEXES) > MAX_CACHED_INDEXES:
+            _INDEXES.popitem(last=False)
+        return index
+
+
+def sample(index: StationIndex, values, method: str = "nearest") -> np.ndarray:
+    """Station values from a 2-D field: a gather through *index*.
+
+    ``method="bilinear"`` blends the enclosing cell's corners, renormalizing
+    over the finite ones; NaN when all of them are missing.
+    """
+    vals = np.asarray(values, dtype=float)
+    if method == "nearest":
+        return vals[index.iy, index.ix]
+    if method != "bilinear":
+        raise ValueError(f"Unknown sampling method {method!r}; expected 'nearest' or 'bilinear'")
+    corners = vals[index.corner_iy, index.corner_ix]
+    ok = np.isfinite(corners) & (index.weights > 0)
+    w = np.where(ok, index.weights, 0.0)
+    total = w.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(total > 0, (np.where(ok, corners, 0.0) * w).sum(axis=1) / total, np.nan)
+
+
+def sample_finite(index: StationIndex, lon, lat, values, st_lon, st_lat) -> np.ndarray:
+    """Nearest-cell station values, skipping cells whose value is not finite.
+
+    The cached gather is used wherever it lands on a finite value; stations
+    whose nearest cell is masked (NaN) take the nearest finite cell instead.
+    NaN only when the field has no finite value at all.
+    """
+    vals = np.asarray(values, dtype=float)
+    out = sample(index, vals)
+    miss = ~np.isfinite(out)
+    finite = np.isfinite(vals)
+    if miss.any() and finite.any():
+        lon2, lat2 = _grid_2d(lon, lat)
+        st_lon = np.asarray(st_lon, dtype=float)[miss]
+        st_lat = np.asarray(st_lat, dtype=float)[miss]
+        iy, ix = _nearest_cells(lon2, lat2, st_lon, st_lat, valid=finite)
+        out[miss] = vals[iy, ix]
+    return out
+
+
+def clear_station_index_cache():
+    """Drop the in-process cache (the on-disk .npz files are kept)."""
+    with _LOCK:
+        _INDEXES.clear()
@@ -0,0 +1,170 @@
+import os
+import threading
+from contextlib import contextmanager
+from datetime import timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Verification scores for a difference field (NWP - analysis), in the units
+# compute_fielddiff returns. One row per (model, variable, verification,
+# cycle, fxx); written to CSV or Parquet so runs can be monitored without
+# looking at the maps.
+STATS_KEYS = ("model", "variable", "verification", "cycle", "fxx")
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)
+_WRITE_LOCK = threading.Lock()
+
+
+def _pct_name(q) -> str:
+    return f"p{q:02g}" if float(q).is_integer() else f"p{q:g}".replace(".", "_")
+
+
+def stat_columns(percentiles=DEFAULT_PERCENTILES) -> list:
+    """Names of the score columns compute_stats returns, in order."""
+    return ["count", "bias", "mae", "rmse", "std", "min", "max"] + [_pct_name(q) for q in percentiles]
+
+
+def compute_stats(diff, percentiles=DEFAULT_PERCENTILES) -> dict:
+    """Bias, MAE, RMSE, error std, extremes and percentiles of *diff*.
+
+    Non-finite points (masked by compute_fielddiff) are excluded; *count* is
+    the number of valid points. The valid values are extracted once; the
+    moments are plain sums over them and the percentiles one np.percentile call.
+    """
+    vals = np.asarray(diff, dtype=np.float64).ravel()
+    v = vals[np.isfinite(vals)]
+    n = v.size
+    if n == 0:
+        out = dict.fromkeys(stat_columns(percentiles), np.nan)
+        out["count"] = 0
+        return out
+
+    total = v.sum()
+    total_sq = np.dot(v, v)
+    total_abs = np.abs(v).sum()
+    bias = total / n
+    mse = total_sq / n
+    out = {
+        "count": int(n),
+        "bias": float(bias),
+        "mae": float(total_abs / n),
+        "rmse": float(np.sqrt(mse)),
+        "std": float(np.sqrt(max(mse - bias * bias, 0.0))),
+        "min": float(v.min()),
+        "max": float(v.max()),
+    }
+    if len(percentiles):
+        for q, p in zip(percentiles, np.percentile(v, percentiles)):
+            out[_pct_name(q)] = float(p)
+    return out
+
+
+def stats_row(diff, model_key, var_key, verif_key, cycle_dt, fxx, percentiles=DEFAULT_PERCENTILES) -> dict:
+    """compute_stats(*diff*) plus the identifying columns of one comparison."""
+    from .fielddiff import DIFF_UNITS
+
+    return {
+        "model": model_key,
+        "variable": var_key,
+        "verification": verif_key,
+        "cycle": pd.Timestamp(cycle_dt),
+        "fxx": int(fxx),
+        "valid": pd.Timestamp(cycle_dt + timedelta(hours=int(fxx))),
+        "units": DIFF_UNITS.get(var_key, ""),
+        **compute_stats(diff, percentiles),
+    }
+
+
+def _read(path: Path) -> pd.DataFrame:
+    if path.suffix == ".parquet":
+        return pd.read_parquet(path)
+    return pd.read_csv(path, parse_dates=["cycle", "valid"])
+
+
+def read_stats(path) -> pd.DataFrame:
+    """Load a stats file written by write_stats (CSV or Parquet)."""
+    return _read(Path(path))
+
+
+@contextmanager
+def _locked(path):
+    """Hold the stats table at *path* for one read-modify-write.
+
+    Threads of this process share a lock; other processes (CLI runs, the
+    service, parallel batches) are kept out with an advisory lock on
+    ``{path}.lock`` where the platform has fcntl.
+    """
+    try:
+        import fcntl
+    except ImportError:  # not POSIX: in-process lock only
+        fcntl = None
+    with _WRITE_LOCK:
+        if fcntl is None:
+            yield
+            return
+        with open(path.with_name(f"{path.name}.lock"), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def write_stats(rows, path) -> pd.DataFrame:
+    """Merge *rows* into the stats table at *path* and rewrite it.
+
+    The format follows the suffix (``.parquet`` needs pyarrow, anything else
+    is CSV). Rows with the same STATS_KEYS replace the existing ones, so
+    re-running a comparison updates its scores instead of duplicating them.
+    Returns the full table.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with _locked(path):
+        df = pd.DataFrame(list(rows))
+        if path.exists():
+            df = pd.concat([_read(path), df], ignore_index=True)
+        if df.empty:
+            return df
+        df = (
+            df.drop_duplicates(list(STATS_KEYS), keep="last")
+            .sort_values(list(STATS_KEYS), kind="mergesort")
+            .reset_index(drop=True)
+        )
+        tmp = path.with_name(f"{path.stem}.{os.getpid()}-{threading.get_ident()}.tmp{path.suffix}")
+        if path.suffix == ".parquet":
+            df.to_parquet(tmp, index=False)
+        else:
+            df.to_csv(tmp, index=False, date_format="%Y-%m-%dT%H:%M")
+        tmp.replace(path)
+    return df
+
+
+def model_summary(rows) -> pd.DataFrame:
+    """Side-by-side scores per model (and variable/verification), pooled over runs.
+
+    Bias, MAE and RMSE are pooled by valid-point count (RMSE through the mean
+    squared error), so large and small grids are weighted fairly. Sorted by
+    RMSE, best first.
+    """
+    df = pd.DataFrame(list(rows))
+    if df.empty:
+        return df
+    df = df[df["count"] > 0].assign(
+        _b=lambda d: d["bias"] * d["count"],
+        _a=lambda d: d["mae"] * d["count"],
+        _s=lambda d: d["rmse"] ** 2 * d["count"],
+    )
+    g = df.groupby(["model", "variable", "verification"], sort=False)
+    n = g["count"].sum()
+    out = pd.DataFrame({
+        "runs": g.size(),
+        "points": n,
+        "bias": g["_b"].sum() / n,
+        "mae": g["_a"].sum() / n,
+        "rmse": np.sqrt(g["_s"].sum() / n),
+        "min_fxx": g["fxx"].min(),
+        "max_fxx": g["fxx"].max(),
+    }).reset_index()
+    return out.sort_values("rmse", kind="mergesort").reset_index(drop=True)
@@ -0,0 +1,164 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Per-stage timing (Herbie lookup, download, decode, regrid, diff, render,
+# PNG encode, ...). Code wraps each stage in ``with timing.timed("decode",
+# model=...)``; when timing is off that returns a shared no-op context, so the
+# cost is one global lookup. Records are buffered per process: worker
+# processes ``drain()`` theirs and return them with their result, and the
+# parent ``extend()``s its buffer with them. At the end of a run
+# ``summarize()`` gives total / mean / p95 / per-frame seconds per stage and
+# ``write_trace()`` dumps every record as JSON lines.
+_ENABLED = False
+_RECORDS: list = []
+_LOCK = threading.Lock()
+
+# Stage that runs exactly once per comparison frame (used for "per frame")
+FRAME_STAGE = "diff"
+
+
+class _NoTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_TIMER = _NoTimer()
+
+
+class _Timer:
+    __slots__ = ("stage", "labels", "start", "t0")
+
+    def __init__(self, stage, labels):
+        self.stage = stage
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.time()
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        record(self.stage, time.perf_counter() - self.t0, start=self.start,
+               ok=exc_type is None, **self.labels)
+        return False
+
+
+def enable(on: bool = True):
+    """Turn timing on (or off) in this process."""
+    global _ENABLED
+    _ENABLED = bool(on)
+
+
+def enabled() -> bool:
+    return _ENABLED
+
+
+def timed(stage: str, **labels):
+    """Context manager timing one *stage*; a no-op when timing is off."""
+    if not _ENABLED:
+        return _NO_TIMER
+    return _Timer(stage, labels)
+
+
+def record(stage: str, seconds: float, start=None, **labels):
+    """Add one stage duration (ignored when timing is off)."""
+    if not _ENABLED:
+        return
+    rec = {"stage": stage, "seconds": float(seconds),
+           "start": time.time() - seconds if start is None else start,
+           "pid": os.getpid(), **labels}
+    with _LOCK:
+        _RECORDS.append(rec)
+
+
+def drain() -> list:
+    """Remove and return this process' records (workers send these to the parent)."""
+    with _LOCK:
+        out = _RECORDS[:]
+        _RECORDS.clear()
+    return out
+
+
+def extend(records):
+    """Merge records drained in another process into this one's buffer."""
+    if records:
+        with _LOCK:
+            _RECORDS.extend(records)
+
+
+def records() -> list:
+    with _LOCK:
+        return _RECORDS[:]
+
+
+def summarize(recs=None, frames=None) -> list:
+    """Per-stage ``count, total, mean, p95, max, per_frame`` rows, slowest total first.
+
+    *frames* defaults to the number of FRAME_STAGE records.
+    """
+    recs = records() if recs is None else recs
+    by_stage = {}
+    for rec in recs:
+        by_stage.setdefault(rec["stage"], []).append(rec["seconds"])
+    if frames is None:
+        frames = len(by_stage.get(FRAME_STAGE, ()))
+    rows = []
+    for stage, secs in by_stage.items():
+        secs = np.asarray(secs)
+        rows.append({
+            "stage": stage,
+            "count": int(secs.size),
+            "total": float(secs.sum()),
+            "mean": float(secs.mean()),
+            "p95": float(np.percentile(secs, 95)),
+            "max": float(secs.max()),
+            "per_frame": float(secs.sum() / frames) if frames else float("nan"),
+        })
+    return sorted(rows, key=lambda r: r["total"], reverse=True)
+
+
+def format_summary(rows, frames=None) -> str:
+    """Fixed-width table of summarize() rows."""
+    if not rows:
+        return "No timings recorded."
+    head = f"{'stage':16s} {'count':>6s} {'total s':>9s} {'mean s':>8s} {'p95 s':>8s} {'per frame':>10s}"
+    lines = [f"Stage timings{f' ({frames} frames)' if frames else ''}:", head]
+    for r in rows:
+        lines.append(
+            f"{r['stage']:16s} {r['count']:6d} {r['total']:9.2f} {r['mean']:8.3f} "
+            f"{r['p95']:8.3f} {r['per_frame']:10.3f}"
+        )
+    return "\n".join(lines)
+
+
+def write_trace(path, recs=None):
+    """Append every record to *path* as JSON lines (one object per stage run)."""
+    recs = records() if recs is None else recs
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a") as f:
+        for rec in recs:
+            f.write(json.dumps(rec, default=str) + "\n")
+    return path
+
+
+def report(trace_path=None, frames=None):
+    """Print the stage summary (and write the trace) if timing is on."""
+    if not _ENABLED:
+        return
+    recs = records()
+    if frames is None:
+        frames = sum(1 for r in recs if r["stage"] == FRAME_STAGE)
+    print(format_summary(summarize(recs, frames), frames))
+    if trace_path:
+        print(f"Timing trace written to {write_trace(trace_path, recs)}")
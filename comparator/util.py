@@ -24,3 +24,38 @@ def major_airports_df():
         ("KSAN","San Diego",    32.7338, -117.1933),
         ("KTPA","Tampa",        27.9755,  -82.5332),
     ], columns=["icao","city","lat","lon"])
+
+
+# Accepted spellings for the columns of a station CSV
+_STATION_COLUMNS = {
+    "icao": ("icao", "id", "station", "station_id", "stid"),
+    "lat": ("lat", "latitude"),
+    "lon": ("lon", "lng", "long", "longitude"),
+    "city": ("city", "name", "station_name"),
+}
+
+
+def load_stations_csv(path):
+    """Stations (icao, city, lat, lon) from a CSV, e.g. a METAR/ASOS site list.
+
+    Column names are matched case-insensitively (``station``/``id`` for the
+    identifier, ``latitude``/``longitude``, ``name``); rows without valid
+    coordinates and repeated identifiers are dropped.
+    """
+    raw = pd.read_csv(path)
+    lower = {c.strip().lower(): c for c in raw.columns}
+    cols = {}
+    for col, names in _STATION_COLUMNS.items():
+        found = next((lower[n] for n in names if n in lower), None)
+        if found is None and col != "city":
+            raise ValueError(f"{path}: no {col!r} column (tried {', '.join(names)})")
+        cols[col] = found
+
+    df = pd.DataFrame({
+        "icao": raw[cols["icao"]].astype(str).str.strip().str.upper(),
+        "city": raw[cols["city"]].astype(str) if cols["city"] else "",
+        "lat": pd.to_numeric(raw[cols["lat"]], errors="coerce"),
+        "lon": pd.to_numeric(raw[cols["lon"]], errors="coerce"),
+    })
+    df = df.dropna(subset=["lat", "lon"]).drop_duplicates("icao")
+    return df.reset_index(drop=True)
@@ -0,0 +1,335 @@
+# comparison_service.py
+"""Resident comparison service: python comparison_service.py [--port 8765 | --socket PATH]
+
+Every CLI run pays for importing Herbie, ESMF, Cartopy and matplotlib and
+for rebuilding grids, regridders and basemaps before it renders one frame.
+This process keeps all of that warm and answers ad-hoc comparisons over a
+small HTTP API (on a TCP port or a Unix socket):
+
+    GET  /health
+    GET  /compare?model=hrrr&var=TMP&verif=rtma&cycle=2026-02-01T12&fxx=6[&render=0]
+    POST /compare   {"model": "hrrr", "var": "TMP", "cycle": "...", "fxx": 6}
+
+/compare returns the PNG path (unless ``render=0``) and the verification
+scores as JSON. Decoded fields and regridded analyses are held in LRU caches
+here; regridders, station indices, map meshes and basemaps use the package's
+own in-process caches, whose sizes are raised to match.
+"""
+import argparse
+import importlib
+import json
+import math
+import os
+import socketserver
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import new_comparison as nc
+from comparator import batch
+from comparator import domain as dm
+from comparator import normalize as norm
+from comparator import regrid as rg
+from comparator import sources
+from comparator import stations
+from comparator import stats
+from comparator import timing
+from comparator import util
+
+DEFAULT_PORT = 8765
+MAX_FIELDS = 64  # decoded model/analysis fields
+MAX_GRIDS = 16  # regridded analyses, regridders, station indices, map meshes
+
+
+class LRUCache:
+    """Thread-safe mapping that keeps the *maxsize* most recently used entries."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.hits = self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return default
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def info(self) -> dict:
+        return {"size": len(self._data), "max": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+
+def _jsonable(value):
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if isinstance(value, dict):
+        return {k: _jsonable(v) for k, v in value.items()}
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    if hasattr(value, "item"):  # numpy scalars
+        return _jsonable(value.item())
+    return value
+
+
+def parse_request(params: dict) -> dict:
+    """Validated ``compare()`` arguments from query/JSON parameters (ValueError if invalid)."""
+    missing = [k for k in ("model", "var", "cycle", "fxx") if params.get(k) in (None, "")]
+    if missing:
+        raise ValueError(f"Missing parameter(s): {', '.join(missing)}")
+    render = params.get("render", True)
+    if isinstance(render, str):
+        render = render.strip().lower() not in ("0", "false", "no", "off")
+    try:
+        fxx = int(params["fxx"])
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid forecast hour: {params['fxx']!r}") from None
+    return {
+        "model_key": norm.normalize_model_key(str(params["model"])),
+        "var_key": norm.normalize_var_key(str(params["var"])),
+        "verif_key": norm.normalize_verif_key(str(params.get("verif", "rtma"))),
+        "cycle_dt": batch.parse_time(params["cycle"]),
+        "fxx": fxx,
+        "render": bool(render),
+    }
+
+
+class ComparisonService:
+    """One comparison per call, with fields and regridded analyses kept in memory."""
+
+    def __init__(self, save_dir=nc.DATA_DIR, out_dir=nc.FIGURE_DIR, weights_dir=rg.WEIGHTS_DIR,
+                 stats_path=None, domain=dm.CONUS, max_fields=MAX_FIELDS, max_grids=MAX_GRIDS,
+                 render=True, station_list=None):
+        self.save_dir = Path(save_dir)
+        self.out_dir = Path(out_dir)
+        self.weights_dir = Path(weights_dir)
+        self.stats_path = stats_path
+        self.domain = domain
+        self.render = render  # False: scores only, matplotlib/Cartopy never imported
+        self.station_list = station_list  # map table stations; None: major CONUS airports
+        self.fields = LRUCache(max_fields)
+        self.regridded = LRUCache(max_grids)
+        self.requests = 0
+        self.started = time.time()
+        self._render_lock = threading.Lock()  # pyplot state is not thread-safe
+        self._stats_lock = threading.Lock()
+        self._lock = threading.Lock()  # request counter, bumped by handler threads
+        self.save_dir.mkdir(parents=True, exist_ok=True)
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        rg.MAX_CACHED_REGRIDDERS = max(rg.MAX_CACHED_REGRIDDERS, max_grids)
+        stations.MAX_CACHED_INDEXES = max(stations.MAX_CACHED_INDEXES, max_grids)
+
+    def warm(self):
+        """Import the heavy dependencies (and project the basemap) before the first request."""
+        for warm_up in (sources._cached_herbie_class, lambda: importlib.import_module("xesmf")):
+            try:
+                warm_up()
+            except ImportError:
+                pass
+        if not self.render:
+            return
+        from comparator import plotting
+
+        plotting.MAX_CACHED_MESHES = max(plotting.MAX_CACHED_MESHES, self.regridded.maxsize)
+        try:
+            plotting._basemap_layers(plotting.CONUS_PROJ)
+        except Exception as e:  # e.g. Natural Earth shapefiles not downloadable
+            print(f"Basemap not prepared: {e}")
+
+    def _load_fields(self, model_key, run_dt, fxx, var_keys, save_dir):
+        fields, missing = {}, []
+        for var_key in var_keys:
+            da = self.fields.get((model_key, run_dt, fxx, var_key))
+            if da is None:
+                missing.append(var_key)
+            else:
+                fields[var_key] = da
+        if missing:
+            loaded = nc.load_fields(model_key, run_dt, fxx, missing, save_dir) or {}
+            for var_key, da in loaded.items():
+                self.fields[model_key, run_dt, fxx, var_key] = da
+            fields.update(loaded)
+        return fields
+
+    def compare(self, model_key, var_key, verif_key, cycle_dt, fxx, render=True) -> dict:
+        """Score (and render) one comparison; LookupError if its data are unavailable."""
+        t0 = time.perf_counter()
+        with self._lock:
+            self.requests += 1
+        compared = nc.compute_comparison(
+            model_key, [var_key], cycle_dt, fxx, verif_key,
+            self.save_dir, self.weights_dir, self.domain,
+            loader=self._load_fields, regridded=self.regridded,
+        )
+        if compared is None or var_key not in compared[2]:
+            raise LookupError(
+                f"No {model_key.upper()} {var_key} vs {verif_key.upper()} data for "
+                f"{cycle_dt:%Y-%m-%d %H}Z F{fxx:02d}"
+            )
+        lon, lat, diffs = compared
+        row = stats.stats_row(diffs[var_key], model_key, var_key, verif_key, cycle_dt, fxx)
+        png = None
+        if render and self.render:
+            with self._render_lock:
+                png = nc._save_comparison_plot(
+                    lon, lat, diffs[var_key], model_key, var_key, verif_key, cycle_dt, fxx,
+                    self.out_dir, self.station_list,
+                )
+        if self.stats_path is not None:
+            with self._stats_lock:
+                stats.write_stats([row], self.stats_path)
+        return {
+            "png": None if png is None else str(png),
+            "stats": _jsonable(row),
+            "seconds": round(time.perf_counter() - t0, 4),
+        }
+
+    def info(self) -> dict:
+        return {
+            "status": "ok",
+            "uptime": round(time.time() - self.started, 1),
+            "requests": self.requests,
+            "fields": self.fields.info(),
+            "regridded": self.regridded.info(),
+            "regridders": len(rg._REGRIDDERS),
+        }
+
+
+### HTTP front end
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "ComparisonService/1"
+
+    def address_string(self):
+        # Unix-socket clients have no (host, port)
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def log_message(self, fmt, *args):
+        if not getattr(self.server, "quiet", False):
+            super().log_message(fmt, *args)
+
+    def _send(self, code, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _compare(self, params):
+        try:
+            result = self.server.service.compare(**parse_request(params))
+        except ValueError as e:
+            self._send(400, {"error": str(e)})
+        except LookupError as e:
+            self._send(404, {"error": str(e)})
+        except Exception as e:
+            self._send(500, {"error": f"{type(e).__name__}: {e}"})
+        else:
+            self._send(200, result)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/health":
+            self._send(200, self.server.service.info())
+        elif url.path == "/compare":
+            self._compare({k: v[-1] for k, v in parse_qs(url.query).items()})
+        else:
+            self._send(404, {"error": f"Unknown endpoint {url.path}"})
+
+    def do_POST(self):
+        if urlparse(self.path).path != "/compare":
+            self._send(404, {"error": f"Unknown endpoint {self.path}"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            params = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(params, dict):
+                raise ValueError("expected a JSON object")
+        except ValueError as e:
+            self._send(400, {"error": f"Invalid JSON body: {e}"})
+            return
+        self._compare(params)
+
+
+class _UnixHTTPServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+def make_server(service, host="127.0.0.1", port=DEFAULT_PORT, socket_path=None, quiet=False):
+    """An HTTP server for *service* on host:port, or on a Unix socket at *socket_path*."""
+    if socket_path is not None:
+        Path(socket_path).unlink(missing_ok=True)
+        server = _UnixHTTPServer(str(socket_path), _Handler)
+    else:
+        server = ThreadingHTTPServer((host, port), _Handler)
+        server.daemon_threads = True
+    server.service = service
+    server.quiet = quiet
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve NWP-vs-analysis comparisons over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--socket", metavar="PATH", help="Listen on a Unix socket instead of a TCP port.")
+    parser.add_argument("--data-dir", default=str(nc.DATA_DIR))
+    parser.add_argument("--output-dir", default=str(nc.FIGURE_DIR))
+    parser.add_argument("--stats", metavar="FILE", help="Also merge every score into this stats file.")
+    parser.add_argument("--domain", default="conus", help="Verification domain, as in new_comparison.py.")
+    parser.add_argument("--stations", metavar="CSV", help="Station list for the map table, as in new_comparison.py.")
+    parser.add_argument("--source", action="append", metavar="[MODEL=]BACKEND[:TEMPLATE]",
+                        help="Data source routing, as in new_comparison.py.")
+    parser.add_argument("--max-fields", type=int, default=MAX_FIELDS)
+    parser.add_argument("--max-grids", type=int, default=MAX_GRIDS)
+    parser.add_argument("--no-render", action="store_true",
+                        help="Scores only: never import matplotlib/Cartopy.")
+    parser.add_argument("--timing", action="store_true",
+                        help="Time every stage and print a summary on shutdown.")
+    args = parser.parse_args(argv)
+    try:
+        domain = dm.parse_domain(args.domain)
+        sources.configure(sources.parse_sources(args.source))
+        station_list = util.load_stations_csv(args.stations) if args.stations else None
+    except (ValueError, OSError) as e:
+        parser.error(str(e))
+    timing.enable(args.timing)
+
+    service = ComparisonService(
+        save_dir=args.data_dir, out_dir=args.output_dir, stats_path=args.stats,
+        domain=domain, max_fields=args.max_fields, max_grids=args.max_grids,
+        render=not args.no_render, station_list=station_list,
+    )
+    service.warm()
+    server = make_server(service, args.host, args.port, args.socket)
+    where = args.socket or f"http://{args.host}:{server.server_address[1]}"
+    print(f"Comparison service listening on {where} (pid {os.getpid()})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if args.socket:
+            Path(args.socket).unlink(missing_ok=True)
+        timing.report()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,30 @@
 # new_comparison.py
-from herbie.core import Herbie
-import xesmf as xe
-import matplotlib.pyplot as plt
-from comparator import fielddiff as fd
-from comparator import plotting as plot
-from comparator import util
+from comparator import lazy_import
 from comparator import normalize as norm
-from comparator.build_gif import create_gif
+from comparator import regrid as rg
+from comparator import batch
+from comparator import pipeline
+from comparator import accumulate as acc
+from comparator import domain as dm
+from comparator import timing
+from comparator import sources
+from comparator.build_gif import ANIMATION_FORMATS, create_animation, ffmpeg_path
 from datetime import datetime, timedelta
+from functools import partial
 from pathlib import Path
-from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import argparse
+import importlib
 import os
+import time
+
+# xarray/pandas-backed modules load on first use, so the prompts (and a
+# spawned worker re-importing this module) start without them.
+fd = lazy_import("comparator.fielddiff")
+util = lazy_import("comparator.util")
+fc = lazy_import("comparator.fieldcache")
+shm = lazy_import("comparator.sharedmem")
+stats = lazy_import("comparator.stats")
 
 DATA_DIR = Path("./data")
 DATA_DIR.mkdir(exist_ok=True)
@@ -18,149 +32,460 @@ DATA_DIR.mkdir(exist_ok=True)
 FIGURE_DIR = Path("./figures")
 FIGURE_DIR.mkdir(exist_ok=True)
 
-# --- Shared analysis state for GIF workers --------------------------------
-# In GIF mode every frame validates against the SAME analysis time on the SAME
-# model grid, so the regridded analysis is identical for all frames. We compute
-# it once in the parent and hand it to each worker process via the pool
-# initializer (set once per process rather than pickled per task).
-_SHARED_ANL_ON_NWP = None
-_SHARED_TGT_LON = None
-_SHARED_TGT_LAT = None
+# Verification scores of every comparison (merged by model/var/verif/cycle/fxx)
+STATS_PATH = FIGURE_DIR / "comparison_stats.csv"
 
+# GIF mode downloads are network-bound, so they get their own (larger) limit
+# than the CPU-bound decode/render process pool, which is sized to the cores
+# this process may run on. The pipeline adapts the number of concurrent
+# downloads between 2 and this limit to keep the render workers fed.
+MAX_FETCH_WORKERS = 32
+MIN_FETCH_WORKERS = 2
 
-def _init_worker(anl_on_nwp, tgt_lon, tgt_lat):
-    """Pool initializer: stash the precomputed analysis in module globals."""
-    global _SHARED_ANL_ON_NWP, _SHARED_TGT_LON, _SHARED_TGT_LAT
-    _SHARED_ANL_ON_NWP = anl_on_nwp
-    _SHARED_TGT_LON = tgt_lon
-    _SHARED_TGT_LAT = tgt_lat
+# What a GIF worker imports before its first frame: decoding and scoring
+# always, the plotting stack only when frames are rendered. They are also
+# imported in the parent before the pool starts, so forked workers share them.
+WORKER_MODULES = (
+    "comparator.sharedmem", "comparator.fieldcache", "comparator.fielddiff", "comparator.stats",
+)
+RENDER_MODULES = ("comparator.plotting",)
 
 
-def generate_comparison_frame(
+def _usable_cpus():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on macOS / Windows
+        return os.cpu_count() or 4
+
+
+def _run_labels(model_key, run_dt, fxx):
+    """Timing labels identifying one model/analysis file."""
+    return {"model": model_key, "cycle": f"{run_dt:%Y%m%d%H}", "fxx": int(fxx)}
+
+
+# --- Shared analysis state for GIF workers --------------------------------
+# In GIF mode every frame of a model validates against the SAME analysis time
+# on the SAME model grid, so the regridded analysis is identical for all of
+# its frames. We compute it once per model grid in the parent, place it in
+# shared memory, and each worker process attaches read-only views in the pool
+# initializer (no per-worker copies). Models on the same grid share blocks.
+_SHARED_GRIDS = {}  # model_key -> (anl_on_nwp, tgt_lon, tgt_lat)
+
+
+def _init_worker(grid_specs, timing_on=False, preload=()):
+    """Pool initializer: attach each model's shared analysis + target grid.
+
+    *grid_specs* maps model_key -> (anl_spec, lon_spec, lat_spec) from a
+    SharedArrayStore; *timing_on* mirrors the parent's timing switch.
+    *preload* names the modules the frames need (already loaded when forked).
+    """
+    for name in preload:
+        importlib.import_module(name)
+    timing.enable(timing_on)
+    timing.drain()  # a forked worker inherits the parent's records: drop them
+    _SHARED_GRIDS.clear()
+    for model_key, specs in grid_specs.items():
+        _SHARED_GRIDS[model_key] = tuple(shm.attach_dataarray(spec) for spec in specs)
+
+
+def _save_comparison_plot(
+    lon,
+    lat,
+    diff,
     model_key,
     var_key,
+    verif_key,
     cycle_dt,
     forecast_hour,
-    verif_key="rtma",
-    save_dir=DATA_DIR,
     out_dir=FIGURE_DIR,
+    stations=None,
 ):
-    """Generate a single NWP-vs-analysis comparison plot and return the saved path.
+    """Render the difference map + airport table and save it as a PNG.
 
-    *verif_key* is the verification analysis source ("rtma" or "urma").
-    Returns the Path to the saved PNG, or None if the frame could not be built.
+    *stations* is the table's station list (icao, city, lat, lon; see
+    util.load_stations_csv); None uses the major CONUS airports.
+    Returns the Path to the saved PNG.
     """
-    verif_label = verif_key.upper()
+    # Imported here so stats-only runs never load matplotlib/Cartopy.
+    import matplotlib.pyplot as plt
+    from comparator import plotting as plot
+
     var_meta = norm.VAR_REGISTRY[var_key]
-    var_cmap = var_meta["cmap"]
-    var_title = var_meta["title"]
     valid_dt = cycle_dt + timedelta(hours=forecast_hour)
+    display_name = model_key
+    labels = _run_labels(model_key, cycle_dt, forecast_hour)
+    if stations is None:
+        stations = util.major_airports_df()
+
+    with timing.timed("render", **labels):
+        fig, (ax_map, ax_tbl) = plot.plot_tempdiff_map_with_table(
+            lon,
+            lat,
+            diff,
+            valid_dt,
+            cycle_dt,
+            forecast_hour,
+            display_name,
+            stations,
+            max_rows=20,
+            var_title=var_meta["title"],
+            var_cmap=var_meta["cmap"],
+            plot_meta=var_meta,
+            verif_name=verif_key.upper(),
+        )
 
-    nwp_kwargs = norm.herbie_kwargs_for(model_key)
-    selector = norm.get_selector(model_key, var_key)
+        plot.plot_airports(ax_map, stations)
 
-    # --- Fetch NWP data ---
-    nwp = Herbie(
-        cycle_dt,
-        fxx=forecast_hour,
-        save_dir=str(save_dir),
-        overwrite=False,
-        **nwp_kwargs,
+    # --- Save (include init cycle in filename so each frame is unique) ---
+    filename = (
+        f"{display_name}_{verif_key}_{var_key}_"
+        f"init{cycle_dt:%Y%m%d_%H}Z_F{forecast_hour:03d}_"
+        f"valid{valid_dt:%Y%m%d_%H%MZ}.png"
     )
-    if not nwp:
+    out_path = Path(out_dir) / filename
+    with timing.timed("encode_png", **labels):
+        fig.savefig(out_path, dpi=150, bbox_inches="tight")
+    plt.close(fig)
+    print(f"  Saved frame: {out_path}")
+    return out_path
+
+
+def _decode_datasets(H, model_key, var_keys, remove_grib=True, downloaded=None):
+    """Decode every requested variable from one model file in a single pass.
+
+    The GRIB subset is fetched with one combined search string (union of the
+    variables' byte ranges) and decoded once. Returns the list of decoded
+    datasets (one per cfgrib hypercube), longitudes wrapped to -180..180 for
+    NWP models. With *remove_grib* the subset is deleted after decoding,
+    unless it was already on disk beforehand. Pass *downloaded* when the
+    subset was already fetched (see _fetch_subset): it tells whether that
+    fetch created the file.
+    """
+    selector = norm.get_combined_selector(model_key, var_keys)
+    grib_path = Path(H.get_localFilePath(selector))
+    fetched = downloaded
+    if fetched is None:
+        fetched = _fetch_subset(H, model_key, selector)
+    labels = _run_labels(model_key, H.date, H.fxx)
+    with timing.timed("decode", **labels):
+        decoded = H.xarray(selector, remove_grib=False, **norm.get_xarray_kwargs(model_key))
+        datasets = decoded if isinstance(decoded, list) else [decoded]
+        if remove_grib and fetched:
+            datasets = [ds.load() for ds in datasets]
+            for ds in datasets:
+                ds.close()
+            grib_path.unlink(missing_ok=True)
+    if model_key not in norm.VERIFICATION_SOURCES:
+        datasets = [norm.wrap_longitude(ds) for ds in datasets]
+    return datasets
+
+
+def _fetch_subset(H, model_key, selector):
+    """Download the GRIB subset for *selector*; True if this call created the file.
+
+    Herbie never removes a file that existed before xarray() was called, so
+    the caller removes the subsets it fetched itself (see _decode_datasets).
+    """
+    if Path(H.get_localFilePath(selector)).exists():
+        return False
+    with timing.timed("download", **_run_labels(model_key, H.date, H.fxx)):
+        H.download(selector)
+    return True
+
+
+def _field_cache_dir(save_dir):
+    return Path(save_dir) / "fields"
+
+
+def _cache_fields(datasets, model_key, run_dt, fxx, var_keys, save_dir):
+    """Split decoded datasets per variable and store each field in the cache.
+
+    Returns ``{var_key: field}`` (memory-mapped from the cache) for every
+    variable that could be resolved.
+    """
+    fields = {}
+    for var_key in var_keys:
+        try:
+            da = norm.split_fields(datasets, [var_key])[var_key]
+        except ValueError as e:
+            print(f"  {e}")
+            continue
+        with timing.timed("cache_write", var=var_key, **_run_labels(model_key, run_dt, fxx)):
+            fields[var_key] = fc.save_field(
+                da, model_key, run_dt, fxx, var_key, _field_cache_dir(save_dir)
+            )
+    return fields
+
+
+def load_fields(model_key, run_dt, fxx, var_keys, save_dir=DATA_DIR, remove_grib=True):
+    """Return ``{var_key: field}`` for one model/analysis file.
+
+    Fields already in the decoded-field cache are opened zero-copy; only the
+    missing variables go through the model's data source (sources.py), one
+    combined download and one
+    cfgrib decode, and are then cached for the next run. Returns None if the
+    file is unavailable or cannot be decoded.
+    """
+    labels = _run_labels(model_key, run_dt, fxx)
+    with timing.timed("cache_read", **labels):
+        fields = fc.load_fields(model_key, run_dt, fxx, var_keys, _field_cache_dir(save_dir))
+    missing = [v for v in var_keys if v not in fields]
+    if not missing:
+        return fields
+
+    with timing.timed("inventory", **labels):
+        H = sources.open_file(model_key, run_dt, fxx, save_dir)
+    if not H:
         print(
             f"  Could not find {model_key.upper()} data for "
-            f"{cycle_dt:%Y-%m-%d %H}Z F{forecast_hour:02d}. Skipping."
+            f"{run_dt:%Y-%m-%d %H}Z F{fxx:02d}. Skipping."
         )
         return None
-
-    # --- Fetch analysis (RTMA/URMA) data ---
-    anl_kwargs = norm.herbie_kwargs_for(verif_key)
-    anl = Herbie(
-        valid_dt,
-        fxx=0,
-        save_dir=str(save_dir),
-        overwrite=False,
-        **anl_kwargs,
-    )
-    if not anl:
+    try:
+        datasets = _decode_datasets(H, model_key, missing, remove_grib=remove_grib)
+    except Exception as e:
         print(
-            f"  Could not find {verif_label} data for {valid_dt:%Y-%m-%d %H}Z. Skipping."
+            f"  Failed to load {model_key} GRIB data "
+            f"({run_dt:%Y-%m-%d %H}Z F{fxx:02d}): {e}"
         )
         return None
+    fields.update(_cache_fields(datasets, model_key, run_dt, fxx, missing, save_dir))
+    return fields
 
-    # --- Load fields ---
-    nwp_xr_kwargs = norm.get_xarray_kwargs(model_key)
-    try:
-        ds_nwp = norm.ensure_dataset(
-            nwp.xarray(selector, remove_grib=True, **nwp_xr_kwargs),
-            var_key=var_key,
-        )
-    except Exception as e:
-        print(f"  Failed to load {model_key} GRIB data (F{forecast_hour:02d}): {e}")
-        return None
-    ds_nwp = norm.wrap_longitude(ds_nwp)
 
-    anl_selector = norm.get_selector(verif_key, var_key)
-    try:
-        ds_anl = norm.ensure_dataset(
-            anl.xarray(anl_selector, remove_grib=True),
-            var_key=var_key,
-        )
-    except Exception as e:
-        print(f"  Failed to load {verif_label} GRIB data ({valid_dt:%Y-%m-%d %H}Z): {e}")
-        return None
+def compute_comparison(
+    model_key,
+    var_keys,
+    cycle_dt,
+    forecast_hour,
+    verif_key="rtma",
+    save_dir=DATA_DIR,
+    weights_dir=rg.WEIGHTS_DIR,
+    domain=dm.CONUS,
+    loader=None,
+    regridded=None,
+):
+    """Load, regrid and difference several variables of one model run.
+
+    The model and analysis GRIB files are each downloaded and decoded once for
+    all of *var_keys* (or read from the decoded-field cache). The model fields
+    are cropped to *domain* (None keeps the full grid), the analysis to the
+    cropped model grid, and the analysis fields are regridded in one batched call.
+
+    *loader* replaces load_fields (e.g. an in-memory cache in front of it).
+    *regridded* (a dict or LRU cache) keeps each regridded analysis field under
+    ``(verif_key, valid_dt, var_key, target grid fingerprint)``; later calls on
+    the same grid skip the analysis load and the regrid.
+    Returns ``(lon, lat, {var_key: diff})`` on the model grid, or None if the
+    model or analysis data could not be loaded or do not cover *domain*.
+    """
+    load = loader or load_fields
+    valid_dt = cycle_dt + timedelta(hours=forecast_hour)
+    var_keys = list(dict.fromkeys(var_keys))
+    labels = _run_labels(model_key, cycle_dt, forecast_hour)
 
-    # --- Variable resolution (derives wind speed from U/V when needed) ---
+    # --- Load fields (cache first; otherwise one download + decode per file) ---
+    nwp_fields = load(model_key, cycle_dt, forecast_hour, var_keys, save_dir)
+    if not nwp_fields:
+        return None
     try:
-        nwp_field = norm.resolve_field_da(ds_nwp, var_key)
-        anl_field = norm.resolve_field_da(ds_anl, var_key)
-    except ValueError as e:
-        print(f"  {e}")
+        nwp_fields = dm.crop_fields(nwp_fields, domain)
+    except dm.EmptyDomainError as e:
+        print(f"  {model_key.upper()} grid does not cover the domain: {e}. Skipping.")
         return None
+    first_nwp = next(iter(nwp_fields.values()))
+    tgt_lon, tgt_lat = first_nwp["longitude"], first_nwp["latitude"]
+
+    anl_on_nwp = {}
+    if regridded is not None:
+        grid_key = rg.grid_fingerprint(tgt_lon.values, tgt_lat.values)
+        for var_key in nwp_fields:
+            hit = regridded.get((verif_key, valid_dt, var_key, grid_key))
+            if hit is not None:
+                anl_on_nwp[var_key] = hit
+    missing = [v for v in nwp_fields if v not in anl_on_nwp]
+    anl_fields = load(verif_key, valid_dt, 0, missing, save_dir) if missing else {}
+    if not anl_fields and not anl_on_nwp:
+        return None
+
+    # --- Regrid all analysis fields to the model grid in one call ---
+    if anl_fields:
+        try:
+            anl_fields = dm.crop_to_grid(anl_fields, tgt_lon, tgt_lat)
+        except dm.EmptyDomainError as e:
+            print(f"  {verif_key.upper()} does not cover the {model_key.upper()} grid: {e}. Skipping.")
+            return None
+        first_anl = next(iter(anl_fields.values()))
+        with timing.timed("regrid_weights", **labels):
+            regridder = rg.get_regridder(
+                first_anl["longitude"], first_anl["latitude"], tgt_lon, tgt_lat,
+                method="bilinear", weights_dir=weights_dir,
+            )
+        with timing.timed("regrid", **labels):
+            fresh = rg.regrid_fields(regridder, anl_fields)
+        anl_on_nwp.update(fresh)
+        if regridded is not None:
+            for var_key, da in fresh.items():
+                regridded[verif_key, valid_dt, var_key, grid_key] = da
+
+    diffs = {}
+    for var_key, nwp_field in nwp_fields.items():
+        if var_key not in anl_on_nwp:
+            continue
+        with timing.timed("diff", var=var_key, **labels):
+            diffs[var_key] = fd.compute_fielddiff(nwp_field, anl_on_nwp[var_key], var_key)
+    return tgt_lon, tgt_lat, diffs
 
-    # --- Regrid analysis to model grid ---
-    src_grid = {"lon": ds_anl["longitude"], "lat": ds_anl["latitude"]}
-    tgt_grid = {"lon": ds_nwp["longitude"], "lat": ds_nwp["latitude"]}
-    regridder = xe.Regridder(
-        src_grid, tgt_grid, method="bilinear", periodic=False, reuse_weights=False
+
+def generate_comparison_frames(
+    model_key,
+    var_keys,
+    cycle_dt,
+    forecast_hour,
+    verif_key="rtma",
+    save_dir=DATA_DIR,
+    out_dir=FIGURE_DIR,
+    weights_dir=rg.WEIGHTS_DIR,
+    stats_path=STATS_PATH,
+    archive=None,
+    domain=dm.CONUS,
+    stations=None,
+):
+    """Generate NWP-vs-analysis comparison plots for several variables at once.
+
+    See *compute_comparison* for how the fields are loaded. The scores of each
+    difference field are merged into *stats_path* (skipped when None) and
+    added to the *archive* AccumulatorStore, if given. *stations* is the
+    airport table's station list (None: major CONUS airports).
+    Returns ``{var_key: Path}`` for every frame that was built (empty if the
+    model or analysis data could not be loaded).
+    """
+    compared = compute_comparison(
+        model_key, var_keys, cycle_dt, forecast_hour, verif_key, save_dir, weights_dir, domain
     )
-    anl_on_nwp = regridder(anl_field)
+    if compared is None:
+        return {}
+    tgt_lon, tgt_lat, diffs = compared
+
+    out_paths, rows = {}, []
+    labels = _run_labels(model_key, cycle_dt, forecast_hour)
+    for var_key, diff in diffs.items():
+        with timing.timed("stats", var=var_key, **labels):
+            rows.append(stats.stats_row(diff, model_key, var_key, verif_key, cycle_dt, forecast_hour))
+        if archive is not None:
+            with timing.timed("archive", var=var_key, **labels):
+                archive.add(diff, model_key, var_key, verif_key, cycle_dt, forecast_hour)
+        out_paths[var_key] = _save_comparison_plot(
+            tgt_lon, tgt_lat, diff,
+            model_key, var_key, verif_key, cycle_dt, forecast_hour, out_dir, stations,
+        )
+    if stats_path is not None:
+        stats.write_stats(rows, stats_path)
+    return out_paths
 
-    # --- Compute difference ---
-    diff = fd.compute_fielddiff(nwp_field, anl_on_nwp, var_key)
 
-    display_name = model_key
+def score_comparison(
+    model_key,
+    var_keys,
+    cycle_dt,
+    forecast_hour,
+    verif_key="rtma",
+    save_dir=DATA_DIR,
+    weights_dir=rg.WEIGHTS_DIR,
+    stats_path=STATS_PATH,
+    archive=None,
+    domain=dm.CONUS,
+):
+    """Stats-only counterpart of *generate_comparison_frames*: no rendering.
 
-    fig, (ax_map, ax_tbl) = plot.plot_tempdiff_map_with_table(
-        ds_nwp["longitude"],
-        ds_nwp["latitude"],
-        diff,
-        valid_dt,
-        cycle_dt,
-        forecast_hour,
-        display_name,
-        util.major_airports_df(),
-        max_rows=20,
-        var_title=var_title,
-        var_cmap=var_cmap,
-        plot_meta=var_meta,
-        verif_name=verif_label,
+    Returns ``{var_key: stats_row}`` (also merged into *stats_path* unless None,
+    and added to *archive* if given).
+    """
+    compared = compute_comparison(
+        model_key, var_keys, cycle_dt, forecast_hour, verif_key, save_dir, weights_dir, domain
     )
+    if compared is None:
+        return {}
+    _, _, diffs = compared
+    rows = {}
+    labels = _run_labels(model_key, cycle_dt, forecast_hour)
+    for var_key, diff in diffs.items():
+        with timing.timed("stats", var=var_key, **labels):
+            rows[var_key] = stats.stats_row(diff, model_key, var_key, verif_key, cycle_dt, forecast_hour)
+        if archive is not None:
+            with timing.timed("archive", var=var_key, **labels):
+                archive.add(diff, model_key, var_key, verif_key, cycle_dt, forecast_hour)
+    if stats_path is not None:
+        stats.write_stats(rows.values(), stats_path)
+    return rows
 
-    plot.plot_airports(ax_map, util.major_airports_df())
 
-    # --- Save (include init cycle in filename so each frame is unique) ---
-    filename = (
-        f"{display_name}_{verif_key}_{var_key}_"
-        f"init{cycle_dt:%Y%m%d_%H}Z_F{forecast_hour:03d}_"
-        f"valid{valid_dt:%Y%m%d_%H%MZ}.png"
-    )
-    out_path = out_dir / filename
-    fig.savefig(out_path, dpi=150, bbox_inches="tight")
-    plt.close(fig)
-    print(f"  Saved frame: {out_path}")
-    return out_path
+def generate_comparison_frame(
+    model_key,
+    var_key,
+    cycle_dt,
+    forecast_hour,
+    verif_key="rtma",
+    save_dir=DATA_DIR,
+    out_dir=FIGURE_DIR,
+    weights_dir=rg.WEIGHTS_DIR,
+    stats_path=STATS_PATH,
+    domain=dm.CONUS,
+    stations=None,
+):
+    """Generate a single NWP-vs-analysis comparison plot and return the saved path.
+
+    *verif_key* is the verification analysis source ("rtma" or "urma").
+    Returns the Path to the saved PNG, or None if the frame could not be built.
+    """
+    return generate_comparison_frames(
+        model_key, [var_key], cycle_dt, forecast_hour, verif_key,
+        save_dir=save_dir, out_dir=out_dir, weights_dir=weights_dir, stats_path=stats_path,
+        domain=domain, stations=stations,
+    ).get(var_key)
+
+
+def _load_reference_field(model_key, var_key, runs, save_dir=DATA_DIR):
+    """Load the first loadable NWP field in *runs* to obtain the model target grid.
+
+    Returns the field (carrying longitude/latitude coords), or None if no run
+    could be loaded.
+    """
+    for cycle_dt, fxx in runs:
+        fields = load_fields(model_key, cycle_dt, fxx, [var_key], save_dir)
+        if fields and var_key in fields:
+            return fields[var_key]
+        print(
+            f"  Reference grid load failed for {model_key.upper()} "
+            f"{cycle_dt:%Y-%m-%d %H}Z F{fxx:03d}"
+        )
+    return None
+
+
+def load_analysis(var_key, valid_dt, verif_key="rtma", save_dir=DATA_DIR):
+    """Load one analysis field (RTMA/URMA at *valid_dt*); None if unavailable."""
+    anl_fields = load_fields(verif_key, valid_dt, 0, [var_key], save_dir)
+    if not anl_fields or var_key not in anl_fields:
+        print(f"  Could not load {verif_key.upper()} data for {valid_dt:%Y-%m-%d %H}Z.")
+        return None
+    return anl_fields[var_key]
+
+
+def load_comparison_inputs(var_key, valid_dt, verif_key, runs_by_model, save_dir=DATA_DIR):
+    """Load the analysis and each model's reference field concurrently.
+
+    *runs_by_model* maps model key -> list of (cycle_dt, fxx). Returns
+    (anl_field, {model_key: reference field or None}); anl_field is None if
+    the analysis could not be loaded.
+    """
+    workers = min(MAX_FETCH_WORKERS, 1 + len(runs_by_model))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        anl_future = pool.submit(load_analysis, var_key, valid_dt, verif_key, save_dir)
+        ref_futures = {
+            model_key: pool.submit(_load_reference_field, model_key, var_key, runs, save_dir)
+            for model_key, runs in runs_by_model.items()
+        }
+        return anl_future.result(), {m: f.result() for m, f in ref_futures.items()}
 
 
 def precompute_analysis_on_model_grid(
@@ -170,7 +495,11 @@ def precompute_analysis_on_model_grid(
     runs,
     verif_key="rtma",
     save_dir=DATA_DIR,
-    weights_dir=DATA_DIR,
+    weights_dir=rg.WEIGHTS_DIR,
+    anl_field=None,
+    regridded=None,
+    domain=dm.CONUS,
+    nwp_field=None,
 ):
     """Fetch + load the analysis once and regrid it onto the model grid.
 
@@ -181,214 +510,693 @@ def precompute_analysis_on_model_grid(
     *runs* is the list of (cycle_dt, fxx) pairs; any one of them yields the model
     target grid, so we try them in order until one loads.
 
+    Pass an already loaded *anl_field* (see *load_analysis*) and reference
+    *nwp_field* (see *load_comparison_inputs*) to skip those loads, and a
+    *regridded* dict (grid fingerprint -> result) to share the regridded
+    analysis between models on the same grid. The model grid is cropped to
+    *domain* (None keeps it whole); frames must be cropped the same way.
+
     Returns (anl_on_nwp, tgt_lon, tgt_lat), or None if the analysis or every
-    reference NWP file could not be loaded (caller should abort the GIF).
+    reference NWP file could not be loaded, or the model grid has no points in
+    *domain* (caller should abort the GIF).
     """
-    verif_label = verif_key.upper()
-
-    # --- Fetch + load analysis once (keep GRIB on disk for re-runs) ---
-    anl_kwargs = norm.herbie_kwargs_for(verif_key)
-    anl = Herbie(
-        valid_dt,
-        fxx=0,
-        save_dir=str(save_dir),
-        overwrite=False,
-        **anl_kwargs,
-    )
-    if not anl:
-        print(f"  Could not find {verif_label} data for {valid_dt:%Y-%m-%d %H}Z.")
+    if anl_field is None:
+        anl_field = load_analysis(var_key, valid_dt, verif_key, save_dir)
+        if anl_field is None:
+            return None
+    if nwp_field is None:
+        nwp_field = _load_reference_field(model_key, var_key, runs, save_dir)
+    if nwp_field is None:
+        print(f"  Could not load any {model_key.upper()} reference file for the target grid.")
         return None
 
-    anl_selector = norm.get_selector(verif_key, var_key)
     try:
-        ds_anl = norm.ensure_dataset(
-            anl.xarray(anl_selector, remove_grib=False),
-            var_key=var_key,
-        )
-        anl_field = norm.resolve_field_da(ds_anl, var_key)
-    except Exception as e:
-        print(f"  Failed to load {verif_label} GRIB data ({valid_dt:%Y-%m-%d %H}Z): {e}")
+        nwp_field = dm.crop_field(nwp_field, domain)
+    except dm.EmptyDomainError as e:
+        print(f"  {model_key.upper()} grid does not cover the domain: {e}.")
+        return None
+    tgt_lon, tgt_lat = nwp_field["longitude"], nwp_field["latitude"]
+    grid_key = rg.grid_fingerprint(tgt_lon.values, tgt_lat.values)
+    if regridded is not None and grid_key in regridded:
+        return regridded[grid_key], tgt_lon, tgt_lat
+    try:
+        anl_field = dm.crop_to_grid({"anl": anl_field}, tgt_lon, tgt_lat)["anl"]
+    except dm.EmptyDomainError as e:
+        print(f"  {verif_key.upper()} does not cover the {model_key.upper()} grid: {e}.")
         return None
 
-    # --- Load ONE reference NWP file to obtain the model target grid ---
-    nwp_kwargs = norm.herbie_kwargs_for(model_key)
-    nwp_xr_kwargs = norm.get_xarray_kwargs(model_key)
-    selector = norm.get_selector(model_key, var_key)
+    # --- Build the regridder once (weights keyed on the grid fingerprints) ---
+    with timing.timed("regrid_weights", model=model_key):
+        regridder = rg.get_regridder(
+            anl_field["longitude"], anl_field["latitude"], tgt_lon, tgt_lat,
+            method="bilinear", weights_dir=weights_dir,
+        )
 
-    ds_nwp = None
-    for cycle_dt, fxx in runs:
-        nwp = Herbie(
-            cycle_dt,
-            fxx=fxx,
-            save_dir=str(save_dir),
-            overwrite=False,
-            **nwp_kwargs,
+    # Materialize so the result pickles cleanly to worker processes
+    # (no dask graph or open GRIB/netCDF file handle attached).
+    with timing.timed("regrid", model=model_key):
+        anl_on_nwp = regridder(anl_field).compute()
+    if regridded is not None:
+        regridded[grid_key] = anl_on_nwp
+    return anl_on_nwp, tgt_lon, tgt_lat
+
+
+def _open_local_grib(grib_path, model_key, remove_grib=False):
+    """Decode an already-downloaded GRIB subset with cfgrib (no source lookup)."""
+    backend_kwargs = norm.get_xarray_kwargs(model_key).get("backend_kwargs", {})
+    return sources.open_grib(grib_path, backend_kwargs, remove_grib=remove_grib)
+
+
+def _fetch_frame_grib(model_key, var_key, save_dir, run):
+    """GIF download stage (thread): fetch one frame's NWP GRIB subset.
+
+    Returns (grib_path, remove_grib) for the CPU stage, (None, False) when the
+    field is already in the decoded-field cache, or None if the run is
+    unavailable. Files that already existed locally are never removed.
+    """
+    cycle_dt, forecast_hour = run
+    if fc.has_field(model_key, cycle_dt, forecast_hour, var_key, _field_cache_dir(save_dir)):
+        return None, False
+    labels = _run_labels(model_key, cycle_dt, forecast_hour)
+    with timing.timed("inventory", **labels):
+        nwp = sources.open_file(model_key, cycle_dt, forecast_hour, save_dir)
+    if not nwp:
+        print(
+            f"  Could not find {model_key.upper()} data for "
+            f"{cycle_dt:%Y-%m-%d %H}Z F{forecast_hour:02d}. Skipping."
         )
-        if not nwp:
-            continue
-        try:
-            ds_nwp = norm.wrap_longitude(
-                norm.ensure_dataset(
-                    nwp.xarray(selector, remove_grib=False, **nwp_xr_kwargs),
-                    var_key=var_key,
-                )
+        return None
+    selector = norm.get_selector(model_key, var_key)
+    grib_path = nwp.get_localFilePath(selector)
+    existed = grib_path.exists()
+    if not existed:
+        with timing.timed("download", **labels):
+            nwp.download(selector)
+    return grib_path, not existed
+
+
+def _render_frame_worker(model_key, var_key, verif_key, save_dir, out_dir, run, fetched,
+                         render=True, archive=None, domain=dm.CONUS, stations=None):
+    """GIF CPU stage (process): decode + render one prefetched frame.
+
+    Reads the model's regridded analysis and target grid from the shared state
+    set by *_init_worker*, so it only decodes the per-frame NWP forecast fetched by
+    *_fetch_frame_grib* (or opens it from the decoded-field cache).
+    Returns ``(png_path, stats_row)``, or None if the frame could not be built;
+    *png_path* is None when *render* is False (stats only). The difference is
+    also added to the *archive* AccumulatorStore, if given. *domain* must be
+    the one the shared analysis was prepared with; *stations* is the airport
+    table's station list (None: major CONUS airports).
+    """
+    anl_on_nwp, tgt_lon, tgt_lat = _SHARED_GRIDS[model_key]
+    cycle_dt, forecast_hour = run
+    grib_path, remove_grib = fetched
+    labels = _run_labels(model_key, cycle_dt, forecast_hour)
+
+    if grib_path is None:
+        with timing.timed("cache_read", **labels):
+            nwp_field = fc.load_field(
+                model_key, cycle_dt, forecast_hour, var_key, _field_cache_dir(save_dir)
             )
-            break
+    else:
+        try:
+            with timing.timed("decode", **labels):
+                decoded = _open_local_grib(grib_path, model_key, remove_grib=remove_grib)
         except Exception as e:
-            print(
-                f"  Reference grid load failed for {model_key.upper()} "
-                f"{cycle_dt:%Y-%m-%d %H}Z F{fxx:03d}: {e}"
-            )
-            ds_nwp = None
+            print(f"  Failed to load {model_key} GRIB data (F{forecast_hour:02d}): {e}")
+            return None
+        datasets = decoded if isinstance(decoded, list) else [decoded]
+        datasets = [norm.wrap_longitude(ds) for ds in datasets]
+        nwp_field = _cache_fields(
+            datasets, model_key, cycle_dt, forecast_hour, [var_key], save_dir
+        ).get(var_key)
+    if nwp_field is None:
+        return None
+    try:
+        nwp_field = dm.crop_field(nwp_field, domain)
+    except dm.EmptyDomainError as e:
+        print(f"  {model_key.upper()} grid does not cover the domain (F{forecast_hour:02d}): {e}")
+        return None
 
-    if ds_nwp is None:
-        print(f"  Could not load any {model_key.upper()} reference file for the target grid.")
+    # --- Compute difference against the shared regridded analysis ---
+    with timing.timed("diff", **labels):
+        diff = fd.compute_fielddiff(nwp_field, anl_on_nwp, var_key)
+    with timing.timed("stats", **labels):
+        row = stats.stats_row(diff, model_key, var_key, verif_key, cycle_dt, forecast_hour)
+    if archive is not None:
+        with timing.timed("archive", **labels):
+            archive.add(diff, model_key, var_key, verif_key, cycle_dt, forecast_hour)
+    if not render:
+        return None, row
+
+    path = _save_comparison_plot(
+        tgt_lon, tgt_lat, diff,
+        model_key, var_key, verif_key, cycle_dt, forecast_hour, out_dir, stations,
+    )
+    return path, row
+
+
+# --- Headless batch mode ------------------------------------------------------
+# A YAML job matrix is expanded into a TaskGraph whose node keys identify the
+# shared work: one fetch + decode per GRIB file (covering every variable any
+# job needs from it), one batched regrid per (analysis, model file) pair, and
+# one regridder per grid pair (via the regrid weight store). Every job then
+# only diffs and renders its own frame.
+def _batch_fetch(model_key, var_keys, run_dt, fxx, save_dir):
+    """Locate and download one GRIB subset covering all of *var_keys*.
+
+    Returns ``(H, downloaded)``, *downloaded* telling whether this task created
+    the subset file (the decode task removes it again), or None without opening
+    the data source when every field is already in the decoded-field cache.
+    """
+    cache_dir = _field_cache_dir(save_dir)
+    if all(fc.has_field(model_key, run_dt, fxx, v, cache_dir) for v in var_keys):
         return None
+    labels = _run_labels(model_key, run_dt, fxx)
+    with timing.timed("inventory", **labels):
+        H = sources.open_file(model_key, run_dt, fxx, save_dir)
+    if not H:
+        raise batch.TaskSkipped(
+            f"No {model_key.upper()} data for {run_dt:%Y-%m-%d %H}Z F{fxx:02d}"
+        )
+    return H, _fetch_subset(H, model_key, norm.get_combined_selector(model_key, var_keys))
 
-    # --- Build the regridder once (cache weights to disk) ---
-    src_grid = {"lon": ds_anl["longitude"], "lat": ds_anl["latitude"]}
-    tgt_grid = {"lon": ds_nwp["longitude"], "lat": ds_nwp["latitude"]}
-    weights_path = Path(weights_dir) / f"weights_{verif_key}_to_{model_key}_bilinear.nc"
-    try:
-        regridder = xe.Regridder(
-            src_grid, tgt_grid, method="bilinear", periodic=False,
-            reuse_weights=weights_path.exists(), filename=str(weights_path),
+
+def _batch_decode(model_key, var_keys, run_dt, fxx, save_dir, domain, fetched):
+    """Open one file's fields from the cache, decoding (once) whatever is missing.
+
+    Returns ``{var_key: DataArray}``, model fields cropped to *domain* (an
+    analysis is cropped per target grid at the regrid step). Variables that
+    cannot be resolved are left out; their jobs fail at the diff step.
+    """
+    with timing.timed("cache_read", **_run_labels(model_key, run_dt, fxx)):
+        fields = fc.load_fields(model_key, run_dt, fxx, var_keys, _field_cache_dir(save_dir))
+    missing = [v for v in var_keys if v not in fields]
+    if missing and fetched is not None:
+        # Decode the subset the fetch task downloaded (same selector), and
+        # remove it afterwards if that task created it.
+        H, downloaded = fetched
+        datasets = _decode_datasets(H, model_key, var_keys, downloaded=downloaded)
+        fields.update(_cache_fields(datasets, model_key, run_dt, fxx, missing, save_dir))
+    if model_key not in norm.VERIFICATION_SOURCES:
+        fields = dm.crop_fields(fields, domain)
+    return fields
+
+
+def _batch_regrid(var_keys, weights_dir, nwp_fields, anl_fields):
+    """Regrid every analysis field needed on this model grid in one call."""
+    wanted = {v: anl_fields[v] for v in var_keys if v in anl_fields}
+    if not wanted or not nwp_fields:
+        raise ValueError(f"No analysis/model fields to regrid for {', '.join(var_keys)}")
+    first_nwp = next(iter(nwp_fields.values()))
+    wanted = dm.crop_to_grid(wanted, first_nwp["longitude"], first_nwp["latitude"])
+    first_anl = next(iter(wanted.values()))
+    with timing.timed("regrid_weights"):
+        regridder = rg.get_regridder(
+            first_anl["longitude"], first_anl["latitude"],
+            first_nwp["longitude"], first_nwp["latitude"],
+            method="bilinear", weights_dir=weights_dir,
         )
-    except Exception as e:
-        # Stale/mismatched weights file: rebuild from scratch.
-        print(f"  Rebuilding regridder weights ({weights_path.name}): {e}")
-        if weights_path.exists():
-            weights_path.unlink()
-        regridder = xe.Regridder(
-            src_grid, tgt_grid, method="bilinear", periodic=False,
-            reuse_weights=False, filename=str(weights_path),
+    with timing.timed("regrid"):
+        return rg.regrid_fields(regridder, wanted)
+
+
+def _batch_diff(job, nwp_fields, anl_on_nwp):
+    """Difference one job's model field against the regridded analysis."""
+    if job.var_key not in nwp_fields or job.var_key not in anl_on_nwp:
+        raise ValueError(f"{job.var_key} could not be decoded for {job.model_key.upper()}")
+    nwp_field = nwp_fields[job.var_key]
+    with timing.timed("diff", var=job.var_key, **_run_labels(job.model_key, job.cycle_dt, job.fxx)):
+        diff = fd.compute_fielddiff(nwp_field, anl_on_nwp[job.var_key], job.var_key)
+    return diff, nwp_field["longitude"], nwp_field["latitude"]
+
+
+def _batch_stats(job, diff_result):
+    diff, _, _ = diff_result
+    with timing.timed("stats", var=job.var_key, **_run_labels(job.model_key, job.cycle_dt, job.fxx)):
+        return stats.stats_row(diff, job.model_key, job.var_key, job.verif_key, job.cycle_dt, job.fxx)
+
+
+def _batch_archive(job, archive, diff_result):
+    diff, _, _ = diff_result
+    with timing.timed("archive", var=job.var_key, **_run_labels(job.model_key, job.cycle_dt, job.fxx)):
+        return archive.add(diff, job.model_key, job.var_key, job.verif_key, job.cycle_dt, job.fxx)
+
+
+def _batch_render(job, out_dir, stations, diff_result):
+    diff, lon, lat = diff_result
+    return _save_comparison_plot(
+        lon, lat, diff,
+        job.model_key, job.var_key, job.verif_key, job.cycle_dt, job.fxx, out_dir, stations,
+    )
+
+
+def build_batch_graph(jobs, save_dir=DATA_DIR, out_dir=FIGURE_DIR, weights_dir=rg.WEIGHTS_DIR,
+                      render=True, archive=None, domain=dm.CONUS, stations=None):
+    """Build the deduplicated task graph for *jobs*; return (graph, job -> final key).
+
+    With *render* False no render tasks are added and each job ends at its
+    stats task (nothing imports matplotlib/Cartopy). With an *archive*
+    AccumulatorStore every difference is also accumulated into it. Model
+    fields are cropped to *domain* at decode time; maps tabulate *stations*
+    (None: major CONUS airports).
+    """
+    # Which variables each GRIB file / analysis-model pair must provide
+    file_vars, pair_vars = {}, {}
+    for job in jobs:
+        nwp_file = (job.model_key, job.cycle_dt, job.fxx)
+        anl_file = (job.verif_key, job.valid_dt, 0)
+        for key, table in ((nwp_file, file_vars), (anl_file, file_vars),
+                           (anl_file + nwp_file, pair_vars)):
+            table.setdefault(key, {})[job.var_key] = None
+
+    graph = batch.TaskGraph()
+    for (model_key, run_dt, fxx), var_keys in file_vars.items():
+        var_keys = list(var_keys)
+        fetched = graph.add(("fetch", model_key, run_dt, fxx),
+                            partial(_batch_fetch, model_key, var_keys, run_dt, fxx, save_dir),
+                            kind="fetch")
+        graph.add(("decode", model_key, run_dt, fxx),
+                  partial(_batch_decode, model_key, var_keys, run_dt, fxx, save_dir, domain),
+                  fetched, kind="decode")
+
+    for pair, var_keys in pair_vars.items():
+        anl_file, nwp_file = pair[:3], pair[3:]
+        graph.add(("regrid",) + pair, partial(_batch_regrid, list(var_keys), weights_dir),
+                  ("decode",) + nwp_file, ("decode",) + anl_file, kind="regrid")
+
+    for job in jobs:
+        nwp_file = (job.model_key, job.cycle_dt, job.fxx)
+        anl_file = (job.verif_key, job.valid_dt, 0)
+        diff = graph.add(("diff", job), partial(_batch_diff, job),
+                         ("decode",) + nwp_file, ("regrid",) + anl_file + nwp_file, kind="diff")
+        if render:
+            graph.add(("render", job), partial(_batch_render, job, out_dir, stations), diff,
+                      kind="render")
+        graph.add(("stats", job), partial(_batch_stats, job), diff, kind="stats")
+        if archive is not None:
+            graph.add(("archive", job), partial(_batch_archive, job, archive), diff, kind="archive")
+    final = "render" if render else "stats"
+    return graph, lambda job: (final, job)
+
+
+def run_batch(config_path, stats_only=False, stations=None, archive=None):
+    """Run every comparison in a YAML config headlessly; return the summary dict.
+
+    *stats_only* (or ``batch: render: false``) skips the maps and only
+    writes the verification scores. *stations* (a station DataFrame, e.g.
+    from --stations) overrides the config's ``plot: stations`` file, and
+    *archive* (an AccumulatorStore, e.g. from --archive) its ``batch: archive``.
+    """
+    config = batch.load_config(config_path)
+    settings = batch.batch_settings(config)
+    if stats_only:
+        settings["render"] = False
+    # --source entries given on the command line override the config's
+    sources.configure({**settings["sources"], **sources.routes()})
+    if archive is None and settings["archive"] is not None:
+        archive = acc.AccumulatorStore(settings["archive"], gridded=settings["archive_maps"])
+    if stations is None and settings["stations"] is not None:
+        stations = util.load_stations_csv(settings["stations"])
+    jobs = batch.expand_jobs(config)
+    settings["cache_dir"].mkdir(parents=True, exist_ok=True)
+    settings["output_dir"].mkdir(parents=True, exist_ok=True)
+
+    graph, job_key = build_batch_graph(
+        jobs,
+        save_dir=settings["cache_dir"],
+        out_dir=settings["output_dir"],
+        weights_dir=settings["cache_dir"] / "weights",
+        render=settings["render"],
+        archive=archive,
+        domain=settings["domain"],
+        stations=stations,
+    )
+    print(
+        f"Batch: {len(jobs)} comparison(s), {graph.count('fetch')} GRIB fetch(es), "
+        f"{settings['max_workers']} worker(s)"
+    )
+    t0 = time.perf_counter()
+    # matplotlib's pyplot state is not thread-safe: render one frame at a time.
+    results, errors = graph.run(max_workers=settings["max_workers"], limits={"render": 1})
+    summary = batch.summarize(
+        jobs, results, errors, job_key, time.perf_counter() - t0, graph=graph
+    )
+    rows = [results[("stats", job)] for job in jobs if ("stats", job) in results]
+    if rows:
+        stats.write_stats(rows, settings["stats"])
+    batch.write_summary(summary, settings["summary"])
+    return summary
+
+
+# --- Valid-time (GIF) mode ---------------------------------------------------
+# Every run of one or more models that covers a single analysis hour. The
+# analysis is loaded once for all models; its regridded copy is built once per
+# distinct model grid; every model's frames go through one download pool and
+# one worker pool.
+def _fetch_model_frame(var_key, save_dir, item):
+    model_key, run = item
+    return _fetch_frame_grib(model_key, var_key, save_dir, run)
+
+
+def _render_model_frame(var_key, verif_key, save_dir, out_dir, item, fetched,
+                        render=True, archive=None, domain=dm.CONUS, stations=None):
+    """Worker entry point: ``(frame result, this worker's timing records)``."""
+    model_key, run = item
+    with timing.timed("frame", **_run_labels(model_key, *run)):
+        result = _render_frame_worker(
+            model_key, var_key, verif_key, save_dir, out_dir, run, fetched,
+            render=render, archive=archive, domain=domain, stations=stations,
         )
+    return result, timing.drain()
 
-    # Materialize so the result pickles cleanly to worker processes
-    # (no dask graph or open GRIB/netCDF file handle attached).
-    anl_on_nwp = regridder(anl_field).compute()
-    return anl_on_nwp, ds_nwp["longitude"], ds_nwp["latitude"]
 
+def _probe_runs(candidates, var_key, save_dir):
+    """Availability of every candidate run, checked concurrently up front.
 
-def _render_frame_worker(
-    model_key,
+    *candidates* maps model_key -> [(cycle_dt, fxx), ...]. Runs whose field
+    is already in the decoded-field cache count as available without a
+    lookup. Returns ``{(model_key, run): bool}``.
+    """
+    cache_dir = _field_cache_dir(save_dir)
+    items = [(m, run) for m, runs in candidates.items() for run in runs]
+    todo = [(m, run) for m, run in items if not fc.has_field(m, *run, var_key, cache_dir)]
+    available = dict.fromkeys(items, True)
+    if todo:
+        print(f"\nChecking availability of {len(todo)} run(s) ...")
+        t0 = time.perf_counter()
+        available.update(sources.probe(todo, save_dir, max_workers=MAX_FETCH_WORKERS))
+        print(
+            f"  {sum(available[i] for i in todo)} available, "
+            f"{sum(not available[i] for i in todo)} missing ({time.perf_counter() - t0:.1f} s)"
+        )
+    return available
+
+
+def run_valid_time(
+    model_keys,
     var_key,
-    cycle_dt,
-    forecast_hour,
-    verif_key="rtma",
+    verif_key,
+    valid_dt,
+    fmt="gif",
+    render=True,
     save_dir=DATA_DIR,
     out_dir=FIGURE_DIR,
+    stats_path=STATS_PATH,
+    archive=None,
+    domain=dm.CONUS,
+    stations=None,
 ):
-    """GIF worker: render one frame against the shared precomputed analysis.
-
-    Reads the regridded analysis and target grid from module globals set by
-    *_init_worker*, so it only fetches/loads the per-frame NWP forecast.
-    Returns the saved PNG Path, or None if the frame could not be built.
+    """Compare every run of each model in *model_keys* valid at *valid_dt*.
+
+    Writes one animation per model (unless *render* is False), merges every
+    frame's scores into *stats_path* (and the *archive* AccumulatorStore, if
+    given) and, for several models, prints and saves a side-by-side summary.
+    Fields are cropped to *domain* (None: full model grids); maps tabulate
+    *stations* (None: major CONUS airports). Returns the
+    per-model summary DataFrame (None if nothing could be compared).
     """
-    anl_on_nwp = _SHARED_ANL_ON_NWP
-    tgt_lon = _SHARED_TGT_LON
-    tgt_lat = _SHARED_TGT_LAT
-
     verif_label = verif_key.upper()
-    var_meta = norm.VAR_REGISTRY[var_key]
-    var_cmap = var_meta["cmap"]
-    var_title = var_meta["title"]
-    valid_dt = cycle_dt + timedelta(hours=forecast_hour)
+    candidates = {}
+    for model_key in model_keys:
+        runs = norm.find_runs_for_valid_time(model_key, valid_dt)
+        if not runs:
+            print(
+                f"No {model_key.upper()} init cycles found whose forecast "
+                f"range covers {valid_dt:%Y-%m-%d %H}Z."
+            )
+            continue
+        candidates[model_key] = runs
+    if not candidates:
+        return None
 
-    nwp_kwargs = norm.herbie_kwargs_for(model_key)
-    selector = norm.get_selector(model_key, var_key)
+    # Drop runs that do not exist before any worker slot is spent on them
+    available = _probe_runs(candidates, var_key, save_dir)
+    runs_by_model = {}
+    for model_key, runs in candidates.items():
+        runs = [run for run in runs if available[model_key, run]]
+        if not runs:
+            print(
+                f"\nNo {model_key.upper()} run covering {valid_dt:%Y-%m-%d %H}Z "
+                f"is available ({len(candidates[model_key])} checked)."
+            )
+            continue
+        print(
+            f"\nFound {len(runs)} of {len(candidates[model_key])} {model_key.upper()} "
+            f"run(s) covering {verif_label} analysis {valid_dt:%Y-%m-%d %H}Z:"
+        )
+        for cycle, fxx in runs:
+            print(f"  Init {cycle:%Y-%m-%d %H}Z  F{fxx:03d}")
+        runs_by_model[model_key] = runs
+    if not runs_by_model:
+        return None
 
-    # --- Fetch NWP data (this frame's unique forecast) ---
-    nwp = Herbie(
-        cycle_dt,
-        fxx=forecast_hour,
-        save_dir=str(save_dir),
-        overwrite=False,
-        **nwp_kwargs,
+    # Fetch + load the analysis ONCE (alongside every model's reference grid),
+    # then regrid it once per model grid
+    print(f"\nPreparing {verif_label} analysis {valid_dt:%Y-%m-%d %H}Z ...")
+    anl_field, ref_fields = load_comparison_inputs(
+        var_key, valid_dt, verif_key, runs_by_model, save_dir
     )
-    if not nwp:
+    if anl_field is None:
         print(
-            f"  Could not find {model_key.upper()} data for "
-            f"{cycle_dt:%Y-%m-%d %H}Z F{forecast_hour:02d}. Skipping."
+            f"Could not prepare {verif_label} analysis for "
+            f"{valid_dt:%Y-%m-%d %H}Z. Aborting."
         )
         return None
-
-    nwp_xr_kwargs = norm.get_xarray_kwargs(model_key)
-    try:
-        ds_nwp = norm.ensure_dataset(
-            nwp.xarray(selector, remove_grib=True, **nwp_xr_kwargs),
-            var_key=var_key,
+    shared, regridded = {}, {}
+    for model_key, runs in runs_by_model.items():
+        prepared = ref_fields[model_key] is not None and precompute_analysis_on_model_grid(
+            model_key, var_key, valid_dt, runs, verif_key, save_dir,
+            anl_field=anl_field, regridded=regridded, domain=domain,
+            nwp_field=ref_fields[model_key],
         )
-    except Exception as e:
-        print(f"  Failed to load {model_key} GRIB data (F{forecast_hour:02d}): {e}")
+        if not prepared:
+            print(f"Skipping {model_key.upper()}: no model grid could be loaded.")
+            continue
+        shared[model_key] = prepared
+    if not shared:
         return None
-    ds_nwp = norm.wrap_longitude(ds_nwp)
 
-    try:
-        nwp_field = norm.resolve_field_da(ds_nwp, var_key)
-    except ValueError as e:
-        print(f"  {e}")
-        return None
+    # Downloads (threads) run ahead of decoding + rendering (processes):
+    # each stage has its own concurrency limit, joined by a bounded queue.
+    items = [(m, run) for m in shared for run in runs_by_model[m]]
+    cpu_workers = min(_usable_cpus(), len(items))
+    fetch_workers = min(MAX_FETCH_WORKERS, len(items))
+    print(
+        f"\n{'Generating' if render else 'Scoring'} {len(items)} comparison frames "
+        f"for {len(shared)} model(s) using up to {fetch_workers} download / {cpu_workers} "
+        f"{'render' if render else 'compute'} workers ..."
+    )
 
-    # --- Compute difference against the shared regridded analysis ---
-    diff = fd.compute_fielddiff(nwp_field, anl_on_nwp, var_key)
+    frame_results = {m: {} for m in shared}  # model -> cycle_dt -> path
+    stats_rows = []
+    pool_stats = {}
+    preload = WORKER_MODULES + (RENDER_MODULES if render else ())
+    for name in preload:
+        importlib.import_module(name)
+    with shm.SharedArrayStore() as store:
+        grid_specs = {
+            m: tuple(store.put_dataarray(da) for da in arrays)
+            for m, arrays in shared.items()
+        }
+        with ProcessPoolExecutor(
+            max_workers=cpu_workers, initializer=_init_worker,
+            initargs=(grid_specs, timing.enabled(), preload),
+        ) as executor:
+            frames = pipeline.run_prefetch_pipeline(
+                items,
+                partial(_fetch_model_frame, var_key, save_dir),
+                partial(_render_model_frame, var_key, verif_key, save_dir, out_dir,
+                        render=render, archive=archive, domain=domain, stations=stations),
+                executor,
+                cpu_workers,
+                fetch_workers=fetch_workers,
+                min_fetch_workers=MIN_FETCH_WORKERS,
+                stats=pool_stats,
+            )
+            for (model_key, (cycle_dt, fxx)), result, error in frames:
+                label = f"{model_key.upper()} Init {cycle_dt:%Y-%m-%d %H}Z F{fxx:03d}"
+                if result is not None:
+                    result, worker_timings = result
+                    timing.extend(worker_timings)
+                if error is not None:
+                    print(f"  Failed:  {label}: {error}")
+                elif result is not None:
+                    frame_results[model_key][cycle_dt], row = result
+                    stats_rows.append(row)
+                else:
+                    print(f"  Skipped: {label}")
+    print(
+        f"  Downloads: peak {pool_stats['peak_fetching']} concurrent; up to "
+        f"{pool_stats['peak_ready']} fetched frame(s) waited for a worker"
+    )
 
-    display_name = model_key
+    if not stats_rows:
+        print("No frames were generated.")
+        return None
+    stats.write_stats(stats_rows, stats_path)
+    print(f"Scores for {len(stats_rows)} run(s) written to {stats_path}")
 
-    fig, (ax_map, ax_tbl) = plot.plot_tempdiff_map_with_table(
-        tgt_lon,
-        tgt_lat,
-        diff,
-        valid_dt,
-        cycle_dt,
-        forecast_hour,
-        display_name,
-        util.major_airports_df(),
-        max_rows=20,
-        var_title=var_title,
-        var_cmap=var_cmap,
-        plot_meta=var_meta,
-        verif_name=verif_label,
+    summary = stats.model_summary(stats_rows)
+    if len(shared) > 1:
+        summary_path = Path(out_dir) / (
+            f"models_{verif_key}_{var_key}_valid{valid_dt:%Y%m%d_%H}Z_summary.csv"
+        )
+        summary.to_csv(summary_path, index=False)
+        print(f"\n{summary.to_string(index=False, float_format=lambda v: f'{v:.2f}')}")
+        print(f"Model summary written to {summary_path}")
+
+    if not render:
+        return summary
+    if fmt == "mp4" and ffmpeg_path() is None:
+        print("ffmpeg not found on the PATH; writing a GIF instead of MP4.")
+        fmt = "gif"
+    for model_key, results in frame_results.items():
+        # Preserve chronological order (oldest init first) for the animation
+        frame_paths = [results[dt] for dt, _ in runs_by_model[model_key] if dt in results]
+        if not frame_paths:
+            print(f"No {model_key.upper()} frames were generated. Cannot create animation.")
+            continue
+        gif_name = (
+            f"{model_key}_{verif_key}_{var_key}_"
+            f"valid{valid_dt:%Y%m%d_%H}Z_all_runs.{fmt}"
+        )
+        gif_path = Path(out_dir) / gif_name
+        with timing.timed("animate", model=model_key):
+            create_animation(frame_paths, gif_path, duration=500, fmt=fmt)
+        print(f"\n{fmt.upper()} saved to {gif_path}  ({len(frame_paths)} frames)")
+    return summary
+
+
+def _arg_parser():
+    parser = argparse.ArgumentParser(description="Compare NWP forecasts against RTMA/URMA.")
+    parser.add_argument(
+        "--config",
+        help="Run headlessly from a YAML job matrix (see config.example.yaml) "
+             "instead of prompting.",
+    )
+    parser.add_argument(
+        "--format",
+        choices=ANIMATION_FORMATS,
+        default="gif",
+        help="Animation container for animated runs (mp4 needs ffmpeg).",
+    )
+    parser.add_argument(
+        "--stats-only",
+        action="store_true",
+        help="Compute and save verification scores only; no maps or animation "
+             "(matplotlib/Cartopy are never imported).",
+    )
+    parser.add_argument(
+        "--archive",
+        metavar="DIR",
+        help="Also accumulate every difference into this long-period verification archive.",
+    )
+    parser.add_argument(
+        "--archive-maps",
+        action="store_true",
+        help="Store per-grid-cell sums in the archive too (large), not just domain scores.",
     )
+    parser.add_argument(
+        "--domain",
+        default="conus",
+        help="Crop fields to this verification domain before regridding: 'conus' "
+             "(default), 'full' for the whole model grid, or "
+             "'lon_min,lon_max,lat_min,lat_max[,halo]' in degrees "
+             "(batch configs use plot: domain).",
+    )
+    parser.add_argument(
+        "--stations",
+        metavar="CSV",
+        help="Station list for the map's point table (columns icao/station, lat, lon, "
+             "optional city/name), e.g. a METAR site list; default: major CONUS airports "
+             "(batch configs use plot: stations).",
+    )
+    parser.add_argument(
+        "--source",
+        action="append",
+        metavar="[MODEL=]BACKEND[:TEMPLATE]",
+        help="Where GRIB files come from: 'herbie' (default, remote) or "
+             "'local:/mirror/{model}/{cycle:%%Y%%m%%d}/...' for a mirrored archive "
+             "(no network). Prefix MODEL= to route one model; repeatable "
+             "(batch configs use data: sources).",
+    )
+    parser.add_argument(
+        "--timing",
+        action="store_true",
+        help="Time every stage (lookup, download, decode, regrid, diff, render, ...) "
+             "and print a per-stage summary at the end.",
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="FILE",
+        help="Append every stage timing to FILE as JSON lines (implies --timing).",
+    )
+    return parser
 
-    plot.plot_airports(ax_map, util.major_airports_df())
 
-    filename = (
-        f"{display_name}_{verif_key}_{var_key}_"
-        f"init{cycle_dt:%Y%m%d_%H}Z_F{forecast_hour:03d}_"
-        f"valid{valid_dt:%Y%m%d_%H%MZ}.png"
-    )
-    out_path = out_dir / filename
-    fig.savefig(out_path, dpi=150, bbox_inches="tight")
-    plt.close(fig)
-    print(f"  Saved frame: {out_path}")
-    return out_path
+def main(argv=None):
+    parser = _arg_parser()
+    args = parser.parse_args(argv)
+    try:
+        domain = dm.parse_domain(args.domain)
+        sources.configure(sources.parse_sources(args.source))
+        stations = util.load_stations_csv(args.stations) if args.stations else None
+    except (ValueError, OSError) as e:
+        parser.error(str(e))
+    timing.enable(args.timing or bool(args.trace))
+    try:
+        _run(args, domain, stations)
+    finally:
+        timing.report(args.trace)
 
 
-def main():
+def _run(args, domain, stations=None):
+    """Dispatch a parsed command line: batch config, GIF or single-frame mode."""
+    archive = acc.AccumulatorStore(args.archive, gridded=args.archive_maps) if args.archive else None
+    if args.config:
+        run_batch(args.config, stats_only=args.stats_only, stations=stations, archive=archive)
+        return
+
     nwp_model = input(
-        "Enter NWP model to compare against the analysis : "
-        "HRRR, NAM5k, NAM12k, RAP, NBM, ARW, FV3, GFS, IFS, HREF: "
+        "Enter NWP model(s) to compare against the analysis : "
+        "HRRR, NAM5k, NAM12k, RAP, NBM, ARW, FV3, GFS, IFS, HREF "
+        "(comma-separate several to share one analysis load): "
     ).strip()
 
     anl_var = input(
         "Enter analysis variable (TMP = 2m temperature, DPT = 2m dew point, "
-        "VIS = visibility, WIND = 10m wind, GUST = wind gust): "
+        "VIS = visibility, WIND = 10m wind, GUST = wind gust; "
+        "comma-separate several for one-pass download): "
     ).strip()
     animate = input("Animate the plot? (y/n): ").strip().lower()
 
     # --- Validate model & variable early ---
     try:
-        model_key = norm.normalize_model_key(nwp_model)
+        model_keys = list(dict.fromkeys(
+            norm.normalize_model_key(m) for m in nwp_model.split(",") if m.strip()
+        ))
     except ValueError as e:
         print(e)
         return
+    if not model_keys:
+        print(f"Invalid NWP model: {nwp_model}")
+        return
 
     try:
-        var_key = norm.normalize_var_key(anl_var)
+        var_keys = list(dict.fromkeys(
+            norm.normalize_var_key(v) for v in anl_var.split(",") if v.strip()
+        ))
     except ValueError as e:
         print(e)
         return
+    if not var_keys:
+        print(f"Invalid analysis variable: {anl_var}")
+        return
+    var_key = var_keys[0]
+    if animate == "y" and len(var_keys) > 1:
+        print("Animation supports one variable at a time.")
+        return
 
     # --- Select verification source (no default; re-prompt until valid) ---
     while True:
@@ -411,94 +1219,12 @@ def main():
         valid_dt = datetime.fromisoformat(
             f"{analysis_date} {analysis_hour:02d}:00"
         )
-
-        # Auto-discover every init cycle that covers this valid time
-        runs = norm.find_runs_for_valid_time(model_key, valid_dt)
-        if not runs:
-            print(
-                f"No {model_key.upper()} init cycles found whose forecast "
-                f"range covers {valid_dt:%Y-%m-%d %H}Z."
-            )
-            return
-
-        print(
-            f"\nFound {len(runs)} {model_key.upper()} run(s) covering "
-            f"{verif_label} analysis {valid_dt:%Y-%m-%d %H}Z:"
-        )
-        for cycle, fxx in runs:
-            print(f"  Init {cycle:%Y-%m-%d %H}Z  F{fxx:03d}")
-
-        # Fetch + load + regrid the analysis ONCE (identical for every frame)
-        print(f"\nPreparing {verif_label} analysis {valid_dt:%Y-%m-%d %H}Z ...")
-        shared = precompute_analysis_on_model_grid(
-            model_key, var_key, valid_dt, runs, verif_key
-        )
-        if shared is None:
-            print(
-                f"Could not prepare {verif_label} analysis for "
-                f"{valid_dt:%Y-%m-%d %H}Z. Aborting GIF."
-            )
-            return
-        anl_on_nwp, tgt_lon, tgt_lat = shared
-
-        max_workers = min(os.cpu_count() or 4, len(runs), 8)
-        print(
-            f"\nGenerating {len(runs)} comparison frames "
-            f"using {max_workers} parallel workers ..."
+        run_valid_time(
+            model_keys, var_key, verif_key, valid_dt,
+            fmt=args.format, render=not args.stats_only, archive=archive, domain=domain,
+            stations=stations,
         )
 
-        frame_results = {}  # cycle_dt -> path
-        with ProcessPoolExecutor(
-            max_workers=max_workers,
-            initializer=_init_worker,
-            initargs=(anl_on_nwp, tgt_lon, tgt_lat),
-        ) as executor:
-            future_to_run = {}
-            for cycle_dt, fxx in runs:
-                future = executor.submit(
-                    _render_frame_worker,
-                    model_key,
-                    var_key,
-                    cycle_dt,
-                    fxx,
-                    verif_key,
-                )
-                future_to_run[future] = (cycle_dt, fxx)
-
-            for future in as_completed(future_to_run):
-                cycle_dt, fxx = future_to_run[future]
-                try:
-                    path = future.result()
-                    if path is not None:
-                        frame_results[cycle_dt] = path
-                    else:
-                        print(
-                            f"  Skipped: Init {cycle_dt:%Y-%m-%d %H}Z "
-                            f"F{fxx:03d}"
-                        )
-                except Exception as e:
-                    print(
-                        f"  Failed:  Init {cycle_dt:%Y-%m-%d %H}Z "
-                        f"F{fxx:03d}: {e}"
-                    )
-
-        # Preserve chronological order (oldest init first) for the GIF
-        frame_paths = [
-            frame_results[dt] for dt, _ in runs if dt in frame_results
-        ]
-
-        if not frame_paths:
-            print("No frames were generated. Cannot create GIF.")
-            return
-
-        gif_name = (
-            f"{model_key}_{verif_key}_{var_key}_"
-            f"valid{valid_dt:%Y%m%d_%H}Z_all_runs.gif"
-        )
-        gif_path = FIGURE_DIR / gif_name
-        create_gif(frame_paths, gif_path, duration=500)
-        print(f"\nGIF saved to {gif_path}  ({len(frame_paths)} frames)")
-
     else:
         # --- Single-frame mode ---
         date = input("Enter date (YYYY-MM-DD): ").strip()
@@ -510,12 +1236,35 @@ def main():
         )
         cycle_dt = datetime.fromisoformat(f"{date} {init_hour:02d}:00")
 
-        out_path = generate_comparison_frame(
-            model_key, var_key, cycle_dt, forecast, verif_key
-        )
-        if out_path is None:
+        # The analysis is decoded by the first model and read from the
+        # decoded-field cache by the others.
+        if args.stats_only:
+            rows = []
+            for model_key in model_keys:
+                scored = score_comparison(
+                    model_key, var_keys, cycle_dt, forecast, verif_key,
+                    archive=archive, domain=domain,
+                )
+                for v, row in scored.items():
+                    print(
+                        f"{model_key.upper()} {v}: bias {row['bias']:+.2f}  MAE {row['mae']:.2f}  "
+                        f"RMSE {row['rmse']:.2f} {row['units']}  (n={row['count']})"
+                    )
+                rows.extend(scored.values())
+            if rows:
+                print(f"Scores written to {STATS_PATH}")
+            return
+
+        out_paths = []
+        for model_key in model_keys:
+            out_paths.extend(generate_comparison_frames(
+                model_key, var_keys, cycle_dt, forecast, verif_key,
+                archive=archive, domain=domain, stations=stations,
+            ).values())
+        if not out_paths:
             return
-        print(f"Plot saved to {out_path}")
+        for out_path in out_paths:
+            print(f"Plot saved to {out_path}")
 
         if os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY"):
             from matplotlib import pyplot as _plt
@@ -0,0 +1,120 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+import xarray as xr
+
+from comparator import stats
+from comparator.accumulate import Accumulator, AccumulatorStore
+
+CYCLE = datetime(2026, 2, 1, 0)
+
+
+def _diff(seed, shape=(20, 30), lon0=-100.0):
+    rng = np.random.default_rng(seed)
+    vals = rng.normal(0.5, 3.0, size=shape)
+    vals[0, :5] = np.nan
+    lon, lat = np.meshgrid(lon0 + np.arange(shape[1]) * 0.1, 35 + np.arange(shape[0]) * 0.1)
+    return xr.DataArray(
+        vals, dims=("y", "x"),
+        coords={"longitude": (("y", "x"), lon), "latitude": (("y", "x"), lat)},
+    )
+
+
+def test_merged_scores_match_compute_stats_on_pooled_values():
+    a, b = _diff(1), _diff(2)
+    merged = Accumulator.from_diff(a) + Accumulator.from_diff(b)
+    pooled = np.concatenate([a.values.ravel(), b.values.ravel()])
+    ref = stats.compute_stats(pooled)
+    out = merged.scores()
+
+    assert list(out) == stats.stat_columns()
+    assert out["count"] == ref["count"]
+    for key in ("bias", "mae", "rmse", "std", "min", "max"):
+        assert out[key] == pytest.approx(ref[key])
+    # histogram percentiles are accurate to about one bin (0.5 degF)
+    for key in ("p05", "p50", "p95"):
+        assert out[key] == pytest.approx(ref[key], abs=0.5)
+
+
+def test_gridded_maps_and_grid_mismatch():
+    a, b = _diff(1), _diff(2)
+    acc = Accumulator.from_diff(a, gridded=True).merge(Accumulator.from_diff(b, gridded=True))
+    maps = acc.maps()
+    assert maps["count"][0, 0] == 0 and np.isnan(maps["bias"][0, 0])
+    assert maps["count"][5, 5] == 2
+    assert maps["bias"][5, 5] == pytest.approx((a[5, 5] + b[5, 5]).item() / 2)
+
+    other = Accumulator.from_diff(_diff(3, lon0=-90.0), gridded=True)
+    before = acc.count
+    with pytest.raises(ValueError):
+        acc.merge(other)
+    assert acc.count == before  # nothing half-merged
+    with pytest.raises(ValueError):
+        acc.merge(Accumulator.from_diff(a))
+
+
+def test_npz_roundtrip(tmp_path):
+    acc = Accumulator.from_diff(_diff(1), gridded=True)
+    acc.to_npz(tmp_path / "a.npz")
+    back = Accumulator.from_npz(tmp_path / "a.npz")
+    assert back.scores() == acc.scores()
+    assert back.grid == acc.grid
+    np.testing.assert_allclose(back.maps()["bias"], acc.maps()["bias"], rtol=1e-6)
+    assert not Accumulator.from_npz(tmp_path / "a.npz", gridded=False).gridded
+
+
+def test_store_query_window_fxx_and_hour(tmp_path):
+    store = AccumulatorStore(tmp_path)
+    diffs = {}
+    for day in range(3):
+        for fxx in (0, 6, 12):
+            cycle = CYCLE + timedelta(days=day)
+            diffs[cycle, fxx] = d = _diff(day * 10 + fxx)
+            store.add(d, "hrrr", "TMP", "urma", cycle, fxx)
+
+    # re-adding a comparison replaces its increment instead of double counting
+    store.add(diffs[CYCLE, 0], "hrrr", "TMP", "urma", CYCLE, 0)
+
+    start, end = CYCLE, CYCLE + timedelta(days=2)
+    total = store.query("hrrr", "TMP", "urma", start, end)
+    expect = [d for (c, f), d in diffs.items() if start <= c + timedelta(hours=f) < end]
+    ref = stats.compute_stats(np.concatenate([d.values.ravel() for d in expect]))
+    assert total.count == ref["count"]
+    assert total.scores()["rmse"] == pytest.approx(ref["rmse"])
+
+    only6 = store.query("hrrr", "TMP", "urma", start, end, fxx=6)
+    assert only6.count == ref["count"] // 3
+    by_hour = store.query("hrrr", "TMP", "urma", start, end, hours=12)
+    assert by_hour.count == only6.count  # 00z cycles: only f12 is valid at 12z
+    assert store.query("hrrr", "TMP", "urma", end + timedelta(days=5), end + timedelta(days=6)) is None
+
+    rows = store.summarize("hrrr", "TMP", "urma", CYCLE, CYCLE + timedelta(days=3), by="fxx")
+    assert [r["fxx"] for r in rows] == [0, 6, 12]
+    ref6 = stats.compute_stats(
+        np.concatenate([d.values.ravel() for (_, f), d in diffs.items() if f == 6])
+    )
+    assert rows[1]["bias"] == pytest.approx(ref6["bias"])
+    with pytest.raises(ValueError):
+        store.summarize("hrrr", "TMP", "urma", start, end, by="month")
+
+
+def test_store_gridded_query_skips_scalar_only_increments(tmp_path):
+    store = AccumulatorStore(tmp_path, gridded=True)
+    store.add(_diff(1), "hrrr", "TMP", "urma", CYCLE, 1)
+    store.add(_diff(2), "hrrr", "TMP", "urma", CYCLE, 2, gridded=False)
+    end = CYCLE + timedelta(days=1)
+    assert store.query("hrrr", "TMP", "urma", CYCLE, end).count == 2 * 595
+    gridded = store.query("hrrr", "TMP", "urma", CYCLE, end, gridded=True)
+    assert gridded.gridded and gridded.count == 595
+
+
+def test_store_gridded_query_sums_in_float64(tmp_path):
+    store = AccumulatorStore(tmp_path, gridded=True)
+    diffs = [_diff(seed) for seed in range(3)]
+    for fxx, diff in enumerate(diffs, start=1):
+        store.add(diff, "hrrr", "TMP", "urma", CYCLE, fxx)
+    total = store.query("hrrr", "TMP", "urma", CYCLE, CYCLE + timedelta(days=1), gridded=True)
+    assert total.grid_sum.dtype == np.float64 and total.grid_sumsq.dtype == np.float64
+    stored = [np.asarray(d, dtype=np.float32).astype(np.float64) for d in diffs]
+    np.testing.assert_array_equal(total.grid_sum, np.nansum(stored, axis=0))
@@ -0,0 +1,161 @@
+import json
+import threading
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from comparator.domain import CONUS
+from comparator.batch import (
+    Job,
+    TaskGraph,
+    TaskSkipped,
+    batch_settings,
+    expand_jobs,
+    load_config,
+    parse_time,
+    summarize,
+)
+
+
+def test_parse_time_handles_zulu_suffix():
+    assert parse_time("2026-02-01T12:00Z") == datetime(2026, 2, 1, 12)
+    assert parse_time(datetime(2026, 2, 1, 6)) == datetime(2026, 2, 1, 6)
+
+
+def test_example_config_loads_and_expands():
+    config = load_config(Path(__file__).parent.parent / "config.example.yaml")
+    jobs = expand_jobs(config)
+    assert jobs
+    assert {j.model_key for j in jobs} == {"hrrr", "nam12k"}
+    assert {j.var_key for j in jobs} == {"TMP"}
+    assert all(j.valid_dt == datetime(2026, 2, 1, 12) for j in jobs)
+
+
+def test_expand_jobs_full_matrix_with_fxx_filter():
+    config = {
+        "models": ["hrrr"],
+        "variables": ["tmp", "dewpoint"],
+        "verification": ["rtma", "urma"],
+        "time": {"valid_time": "2026-02-01T12:00Z", "fxx": [1, 2]},
+    }
+    jobs = expand_jobs(config)
+    assert len(jobs) == 2 * 2 * 2
+    assert {j.fxx for j in jobs} == {1, 2}
+    assert {j.verif_key for j in jobs} == {"rtma", "urma"}
+
+
+def test_expand_jobs_explicit_cycles_and_range():
+    config = {
+        "models": ["hrrr"],
+        "variable": "TMP",
+        "time": {
+            "cycles": {"start": "2026-02-01T00:00Z", "end": "2026-02-01T02:00Z", "step_hours": 1},
+            "fxx": 6,
+        },
+    }
+    jobs = expand_jobs(config)
+    assert [j.cycle_dt.hour for j in jobs] == [0, 1, 2]
+    assert all(j.fxx == 6 and j.verif_key == "rtma" for j in jobs)
+
+
+def test_expand_jobs_drops_duplicates():
+    config = {
+        "models": ["hrrr", "HRRR"],
+        "variable": "TMP",
+        "time": {"cycles": "2026-02-01T00:00Z", "fxx": [1]},
+    }
+    assert len(expand_jobs(config)) == 1
+
+
+def test_expand_jobs_requires_time():
+    with pytest.raises(ValueError):
+        expand_jobs({"models": ["hrrr"], "variable": "TMP"})
+    with pytest.raises(ValueError):
+        expand_jobs({"models": ["hrrr"], "variable": "TMP", "time": {"cycles": "2026-02-01T00:00Z"}})
+
+
+def test_batch_settings_defaults():
+    s = batch_settings({})
+    assert s["cache_dir"] == Path("./data")
+    assert s["max_workers"] == 4
+    assert s["summary"] is None
+    assert s["stats"] == Path("./figures/comparison_stats.csv")
+    assert s["archive"] is None and s["archive_maps"] is False
+    assert s["domain"] == CONUS
+    assert s["stations"] is None
+    assert s["sources"] == {}
+    assert batch_settings({"plot": {"stations": "sites.csv"}})["stations"] == Path("sites.csv")
+    assert batch_settings({"plot": {"domain": "full"}})["domain"] is None
+
+
+def test_task_graph_runs_shared_work_once():
+    calls = []
+
+    def fetch():
+        calls.append("fetch")
+        return 2
+
+    g = TaskGraph()
+    g.add("fetch", fetch, kind="fetch")
+    g.add("fetch", fetch, kind="fetch")  # duplicate: ignored
+    g.add("a", lambda x: x + 1, "fetch")
+    g.add("b", lambda x: x * 10, "fetch")
+    results, errors = g.run(max_workers=4)
+
+    assert calls == ["fetch"]
+    assert results == {"a": 3, "b": 20}
+    assert errors == {}
+    assert g.count("fetch") == 1
+
+
+def test_task_graph_propagates_failures_to_dependents():
+    def boom():
+        raise TaskSkipped("missing")
+
+    g = TaskGraph()
+    g.add("src", boom)
+    g.add("leaf", lambda x: x, "src")
+    g.add("other", lambda: "ok")
+    results, errors = g.run()
+    assert results == {"other": "ok"}
+    assert isinstance(errors["leaf"], TaskSkipped)
+
+
+def test_task_graph_respects_kind_limit():
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    def render():
+        with lock:
+            active.append(1)
+            peak.append(len(active))
+        threading.Event().wait(0.01)
+        with lock:
+            active.pop()
+
+    g = TaskGraph()
+    for i in range(6):
+        g.add(("render", i), render, kind="render")
+    g.run(max_workers=4, limits={"render": 1})
+    assert max(peak) == 1
+
+
+def test_task_graph_rejects_unknown_dependency():
+    with pytest.raises(KeyError):
+        TaskGraph().add("x", lambda y: y, "missing")
+
+
+def test_summarize_is_json_serializable():
+    jobs = [
+        Job("hrrr", "TMP", "rtma", datetime(2026, 2, 1, 0), 12),
+        Job("hrrr", "TMP", "rtma", datetime(2026, 2, 1, 1), 11),
+    ]
+    results = {("render", jobs[0]): Path("a.png")}
+    errors = {("render", jobs[1]): TaskSkipped("no data")}
+    summary = summarize(jobs, results, errors, lambda j: ("render", j), 1.23456)
+    json.dumps(summary)
+    assert summary["ok"] == 1 and summary["skipped"] == 1 and summary["failed"] == 0
+    assert summary["results"][0]["valid"] == "2026-02-01T12:00Z"
+    assert summary["results"][0]["output"] == "a.png"
@@ -0,0 +1,50 @@
+import json
+
+import numpy as np
+
+from benchmarks import suite
+
+
+def test_synthetic_lcc_grid_covers_conus():
+    lon, lat = suite.grid_lonlat(suite.GRIDS["hrrr"])
+    assert lon.shape == (1059, 1799)
+    assert lon.min() < -125 and lon.max() > -66.5
+    assert lat.min() < 25 and lat.max() > 48
+
+
+def test_run_suite_on_small_grid_and_compare(monkeypatch):
+    monkeypatch.setitem(suite.GRIDS, "tiny", suite.GridSpec("lcc", 40, 60, 50.0, -97.5, 38.5))
+    monkeypatch.setitem(suite.GRIDS, "anl", suite.GridSpec("lcc", 50, 70, 40.0, -97.5, 38.5))
+    monkeypatch.setattr(suite, "ANALYSIS_GRID", "anl")
+    stages = ["fielddiff", "wind", "station_index", "regrid_sparse"]
+    doc = suite.run_suite(["tiny"], stages, repeat=1, log=lambda *a: None)
+    json.dumps(doc)  # JSON-ready
+    assert set(doc["results"]) == {f"{stage}/tiny" for stage in stages}
+    assert all(r["seconds"] > 0 and r["peak_mb"] >= 0 for r in doc["results"].values())
+    assert suite.compare(doc, doc) == []
+
+
+def test_compare_flags_time_and_memory_regressions():
+    base = {"results": {
+        "a": {"seconds": 1.0, "peak_mb": 100.0},
+        "b": {"seconds": 0.001, "peak_mb": 1.0},
+        "gone": {"seconds": 1.0, "peak_mb": 1.0},
+    }}
+    new = {"results": {
+        "a": {"seconds": 1.5, "peak_mb": 110.0},
+        "b": {"seconds": 0.003, "peak_mb": 1.5},  # 3x, but within timer noise
+        "new": {"seconds": 9.0, "peak_mb": 900.0},
+    }}
+    assert suite.compare(new, base) == [("a", "seconds", 1.0, 1.5)]
+    flagged = suite.compare(new, base, time_tol=0.6, mem_tol=0.05)
+    assert flagged == [("a", "peak_mb", 100.0, 110.0)]
+    assert np.isclose(flagged[0][3] / flagged[0][2], 1.1)
+
+
+def test_synthetic_weights_interpolate_linear_fields():
+    w = suite.synthetic_weights((5, 7), (3, 4))
+    assert w.shape == (12, 35) and w.nnz <= 48
+    np.testing.assert_allclose(w.sum(axis=1), 1.0)
+    ramp = np.add.outer(np.arange(5.0), np.arange(7.0) * 10)  # bilinear is exact on it
+    out = (w @ ramp.ravel()).reshape(3, 4)
+    np.testing.assert_allclose(out, np.add.outer(np.linspace(0, 4, 3), np.linspace(0, 6, 4) * 10))
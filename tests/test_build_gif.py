@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+from PIL import Image, ImageSequence
+
+from comparator import build_gif
+
+
+def _frames(n=4, size=(40, 30)):
+    """A static background with a moving block, like map frames over one basemap."""
+    w, h = size
+    out = []
+    for i in range(n):
+        arr = np.zeros((h, w, 3), dtype=np.uint8)
+        arr[:, :, 0] = np.linspace(0, 250, w, dtype=np.uint8)
+        arr[5:10, 5 + 5 * i:10 + 5 * i] = (255, 255, 255)
+        out.append(Image.fromarray(arr))
+    return out
+
+
+def test_gif_round_trip_reproduces_frames(tmp_path):
+    frames = _frames()
+    paths = []
+    for i, im in enumerate(frames):
+        paths.append(tmp_path / f"f{i}.png")
+        im.save(paths[-1])
+
+    out = build_gif.create_gif(paths, tmp_path / "loop.gif", duration=250)
+    assert out == tmp_path / "loop.gif"
+    with Image.open(out) as gif:
+        assert gif.n_frames == len(frames)
+        assert gif.info["loop"] == 0
+        decoded = [np.asarray(f.convert("RGB"), dtype=int) for f in ImageSequence.Iterator(gif)]
+    for got, want in zip(decoded, frames):
+        assert np.abs(got - np.asarray(want, dtype=int)).max() <= 8  # palette rounding only
+    assert not list(tmp_path.glob("*.tmp*"))
+
+
+def test_gif_later_frames_store_only_the_changed_rectangle(tmp_path):
+    frames = _frames(3)
+    build_gif.create_animation(frames + [frames[-1]], tmp_path / "a.gif")
+    with Image.open(tmp_path / "a.gif") as gif:
+        gif.seek(1)
+        assert gif.tile[0][1][2] - gif.tile[0][1][0] < frames[0].width  # cropped width
+        gif.seek(3)  # identical frame: a 1x1 transparent placeholder
+        assert gif.tile[0][1][2:] == (1, 1)
+
+
+def test_gif_color_first_seen_in_a_later_frame(tmp_path):
+    frames = _frames(3)
+    late = np.asarray(frames[2]).copy()
+    late[15:25, 10:30] = (0, 200, 60)  # green appears only in the last frame
+    frames[2] = Image.fromarray(late)
+    build_gif.create_animation(frames, tmp_path / "late.gif")
+    with Image.open(tmp_path / "late.gif") as gif:
+        decoded = [np.asarray(f.convert("RGB"), dtype=int) for f in ImageSequence.Iterator(gif)]
+    for got, want in zip(decoded, frames):
+        assert np.abs(got - np.asarray(want, dtype=int)).max() <= 8
+
+
+def test_writer_accepts_figures_and_resizes(tmp_path):
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(2, 1.5), dpi=40)
+    ax.plot([0, 1], [0, 1])
+    with build_gif.AnimationWriter(tmp_path / "fig.gif") as writer:
+        writer.add(fig)
+        writer.add(_frames(1, size=(20, 20))[0])
+    plt.close(fig)
+    with Image.open(tmp_path / "fig.gif") as gif:
+        assert gif.size == (80, 60)
+        assert gif.n_frames == 2
+
+
+def test_webp_output(tmp_path):
+    from PIL import features
+
+    if not features.check("webp"):
+        pytest.skip("Pillow built without WebP support")
+    out = build_gif.create_animation(_frames(), tmp_path / "loop.webp", duration=100)
+    with Image.open(out) as im:
+        assert im.format == "WEBP"
+        assert im.n_frames == 4
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["loop.webp"]
+
+
+@pytest.mark.skipif(build_gif.ffmpeg_path() is None, reason="ffmpeg not installed")
+def test_mp4_output(tmp_path):
+    out = build_gif.create_animation(_frames(size=(41, 31)), tmp_path / "loop.mp4")
+    assert out.stat().st_size > 0
+
+
+def test_failed_run_leaves_no_partial_file(tmp_path):
+    with pytest.raises(RuntimeError):
+        with build_gif.AnimationWriter(tmp_path / "x.gif") as writer:
+            writer.add(_frames(1)[0])
+            raise RuntimeError("render failed")
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_unknown_format_and_empty_input():
+    with pytest.raises(ValueError):
+        build_gif.AnimationWriter("x.avi")
+    with pytest.raises(ValueError):
+        build_gif.create_gif([], "x.gif")
@@ -0,0 +1,92 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+import xarray as xr
+
+from comparator import domain as dm
+
+
+def _regular(lon0=0.0, res=1.0):
+    """Global 0..360 lat/lon grid with 1-D coords, like a decoded GFS field."""
+    lat = np.arange(90, -90.1, -res)
+    lon = np.arange(lon0, lon0 + 360, res)
+    return xr.DataArray(
+        np.zeros((lat.size, lon.size)), dims=("latitude", "longitude"),
+        coords={"latitude": lat, "longitude": lon},
+    )
+
+
+def _curvilinear():
+    y, x = np.mgrid[0:50, 0:80]
+    lon = -135.0 + 1.0 * x + 0.1 * y
+    lat = 15.0 + 0.9 * y
+    return xr.DataArray(
+        np.arange(lon.size, dtype=float).reshape(lon.shape), dims=("y", "x"),
+        coords={"longitude": (("y", "x"), lon), "latitude": (("y", "x"), lat)},
+    )
+
+
+@pytest.mark.parametrize("lon0", [0.0, -180.0])
+def test_crop_regular_grid_keeps_domain_plus_halo(lon0):
+    da = _regular(lon0)
+    out = dm.crop_field(da, dm.CONUS)
+    lon = ((out["longitude"].values + 180) % 360) - 180
+    assert lon.min() == -127 and lon.max() == -65  # -66.5 + 2 on a 1 deg grid
+    assert out["latitude"].min() == 18 and out["latitude"].max() == 52
+    assert out.size < da.size / 10
+    assert np.shares_memory(out.values, da.values)  # a view, not a copy
+
+
+def test_crop_curvilinear_covers_every_point_in_domain():
+    da = _curvilinear()
+    box = dm.Domain(-120, -80, 25, 45, halo=1.0)
+    out = dm.crop_field(da, box)
+    lon, lat = da["longitude"].values, da["latitude"].values
+    inside = (lon >= -121) & (lon <= -79) & (lat >= 24) & (lat <= 46)
+    kept = np.isin(da.values, out.values)
+    assert kept[inside].all()
+    assert out.shape < da.shape
+
+
+def test_crop_fields_shares_one_index_box_and_none_is_noop():
+    da = _curvilinear()
+    fields = {"TMP": da, "DPT": da + 1}
+    out = dm.crop_fields(fields, dm.CONUS)
+    assert out["TMP"].shape == out["DPT"].shape
+    xr.testing.assert_identical(out["TMP"]["longitude"], out["DPT"]["longitude"])
+    assert dm.crop_fields(fields, None) is fields
+    assert dm.crop_field(da, dm.Domain(-180, 180, -90, 90)) is da
+
+
+def test_crop_to_grid_and_empty_domain():
+    anl = _curvilinear()
+    tgt = dm.crop_field(_regular(-180.0), dm.Domain(-110, -100, 30, 35))
+    out = dm.crop_to_grid({"TMP": anl}, tgt["longitude"], tgt["latitude"])["TMP"]
+    assert out["longitude"].max() >= -100 and out["longitude"].min() <= -110
+    assert out.size < anl.size
+    with pytest.raises(dm.EmptyDomainError, match="lon 10..20, lat -40..-30"):
+        dm.crop_field(anl, dm.Domain(10, 20, -40, -30))
+
+
+def test_comparison_outside_the_model_grid_is_skipped(capsys):
+    import new_comparison as nc
+
+    def loader(model_key, run_dt, fxx, var_keys, save_dir):
+        return {v: _curvilinear() for v in var_keys}
+
+    out = nc.compute_comparison("hrrr", ["TMP"], datetime(2026, 2, 1), 6,
+                                domain=dm.Domain(10, 20, -40, -30), loader=loader)
+    assert out is None
+    assert "HRRR grid does not cover the domain" in capsys.readouterr().out
+
+
+def test_parse_domain():
+    assert dm.parse_domain("CONUS") is dm.CONUS
+    assert dm.parse_domain("full") is None and dm.parse_domain(None) is None
+    assert dm.parse_domain("-100,-90,30,40") == dm.Domain(-100, -90, 30, 40, 0.0)
+    assert dm.parse_domain([-100, -90, 30, 40, 1]) == dm.Domain(-100, -90, 30, 40, 1.0)
+    assert dm.parse_domain({"bbox": "conus", "halo": 5}).halo == 5
+    for bad in ("mars", "-100,-90,30", [0, 1, 50, 40], {"halo": 1}):
+        with pytest.raises(ValueError):
+            dm.parse_domain(bad)
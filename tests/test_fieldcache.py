@@ -0,0 +1,69 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+import xarray as xr
+
+from comparator import fieldcache as fc
+
+CYCLE = datetime(2026, 2, 1, 12)
+
+
+def _field(values=None, name="t2m"):
+    lon, lat = np.meshgrid([-100.0, -99.0, -98.0], [30.0, 31.0])
+    vals = np.arange(6, dtype=np.float32).reshape(2, 3) if values is None else values
+    return xr.DataArray(
+        vals,
+        dims=("y", "x"),
+        coords={"longitude": (("y", "x"), lon), "latitude": (("y", "x"), lat)},
+        name=name,
+        attrs={"units": "K", "GRIB_shortName": "2t", "not_json": object()},
+    )
+
+
+def test_field_cache_path_includes_model_product_cycle_fxx_var(tmp_path):
+    path = fc.field_cache_path("hrrr", CYCLE, 6, "TMP", tmp_path)
+    assert path == tmp_path / "hrrr" / "sfc" / "2026020112" / "f006_TMP"
+
+
+def test_load_field_missing_returns_none(tmp_path):
+    assert fc.load_field("hrrr", CYCLE, 6, "TMP", tmp_path) is None
+    assert not fc.has_field("hrrr", CYCLE, 6, "TMP", tmp_path)
+
+
+def test_save_then_load_round_trip_is_memory_mapped(tmp_path):
+    da = _field()
+    cached = fc.save_field(da, "hrrr", CYCLE, 6, "TMP", tmp_path)
+    assert fc.has_field("hrrr", CYCLE, 6, "TMP", tmp_path)
+
+    again = fc.load_field("hrrr", CYCLE, 6, "TMP", tmp_path)
+    for out in (cached, again):
+        np.testing.assert_array_equal(out.values, da.values)
+        np.testing.assert_array_equal(out["longitude"].values, da["longitude"].values)
+        assert out.dims == ("y", "x")
+        assert out.name == "t2m"
+        assert out.attrs == {"units": "K", "GRIB_shortName": "2t"}
+        assert not out.values.flags.writeable  # read-only memory map
+
+
+def test_grid_arrays_are_shared_between_fields(tmp_path):
+    fc.save_field(_field(), "hrrr", CYCLE, 6, "TMP", tmp_path)
+    fc.save_field(_field(name="d2m"), "hrrr", CYCLE, 6, "DPT", tmp_path)
+    assert len(list((tmp_path / "grids").glob("*.npy"))) == 2
+
+
+def test_load_fields_returns_only_cached_variables(tmp_path):
+    fc.save_field(_field(), "hrrr", CYCLE, 6, "TMP", tmp_path)
+    fields = fc.load_fields("hrrr", CYCLE, 6, ["TMP", "DPT"], tmp_path)
+    assert list(fields) == ["TMP"]
+
+
+def test_save_field_1d_lonlat(tmp_path):
+    da = xr.DataArray(
+        np.ones((2, 3)),
+        dims=("latitude", "longitude"),
+        coords={"latitude": [30.0, 31.0], "longitude": [-100.0, -99.0, -98.0]},
+    )
+    out = fc.save_field(da, "gfs", CYCLE, 24, "TMP", tmp_path)
+    assert out.dims == ("latitude", "longitude")
+    assert list(out["longitude"].values) == pytest.approx([-100.0, -99.0, -98.0])
@@ -1,2 +1,93 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parents[1]
+
+# Starting the CLI (up to its first prompt) may import numpy, but nothing that
+# is only needed once data is decoded, regridded or drawn.
+HEAVY_MODULES = ("xarray", "pandas", "scipy", "herbie", "cfgrib", "xesmf", "matplotlib", "cartopy")
+# `python -X importtime` cost of new_comparison, as a fraction of importing
+# xarray on the same machine (an absolute budget would depend on the host).
+IMPORT_BUDGET_VS_XARRAY = 0.5
+
+
+def _python(code, tmp_path, *flags):
+    env = {**os.environ, "PYTHONPATH": str(REPO)}
+    return subprocess.run([sys.executable, *flags, "-c", code], cwd=tmp_path, env=env,
+                          capture_output=True, text=True)
+
+
 def test_imports():
     import comparator
+
+
+def test_plotting_names_load_on_first_use():
+    import comparator
+    from comparator import plotting
+
+    assert comparator.plot_airports is plotting.plot_airports
+
+
+def test_stats_only_path_never_imports_plotting_stack(tmp_path):
+    code = """
+import sys
+from datetime import datetime
+import numpy as np
+import comparator
+from comparator import batch, stats
+import new_comparison
+
+jobs = [batch.Job("hrrr", "TMP", "rtma", datetime(2026, 2, 1, 12), 6)]
+graph, job_key = new_comparison.build_batch_graph(jobs, render=False)
+assert graph.count("render") == 0 and job_key(jobs[0]) == ("stats", jobs[0])
+stats.stats_row(np.ones((2, 2)), "hrrr", "TMP", "rtma", datetime(2026, 2, 1, 12), 6)
+loaded = [m for m in ("matplotlib", "cartopy") if m in sys.modules]
+assert not loaded, loaded
+"""
+    proc = _python(code, tmp_path)
+    assert proc.returncode == 0, proc.stderr
+
+
+def test_package_and_cli_import_no_heavy_modules(tmp_path):
+    code = f"""
+import sys
+import comparator
+assert "numpy" not in sys.modules, "comparator imported numpy"
+import new_comparison
+loaded = [m for m in {HEAVY_MODULES!r} if m in sys.modules]
+assert not loaded, loaded
+"""
+    proc = _python(code, tmp_path)
+    assert proc.returncode == 0, proc.stderr
+
+
+def test_cli_import_time_budget(tmp_path):
+    def cumulative_seconds(module):
+        proc = _python(f"import {module}", tmp_path, "-X", "importtime")
+        assert proc.returncode == 0, proc.stderr
+        line = next(l for l in proc.stderr.splitlines() if l.rstrip().endswith(f"| {module}"))
+        return int(line.split("|")[1]) / 1e6
+
+    cli = min(cumulative_seconds("new_comparison") for _ in range(3))
+    heavy = min(cumulative_seconds("xarray") for _ in range(3))
+    assert cli < IMPORT_BUDGET_VS_XARRAY * heavy, (
+        f"import new_comparison took {cli:.3f} s, importing xarray {heavy:.3f} s"
+    )
+
+
+def test_lazy_import_defers_module_until_first_use(tmp_path, monkeypatch):
+    from comparator import lazy_import
+
+    (tmp_path / "lazy_probe.py").write_text("import sys\nsys.lazy_probe_runs += 1\nVALUE = 1\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, "lazy_probe", raising=False)
+    monkeypatch.setattr(sys, "lazy_probe_runs", 0, raising=False)
+
+    probe = lazy_import("lazy_probe")
+    assert sys.lazy_probe_runs == 0
+    assert probe.VALUE == 1 and sys.lazy_probe_runs == 1
+    probe.VALUE = 2  # writes reach the real module
+    assert sys.modules["lazy_probe"].VALUE == 2 and sys.lazy_probe_runs == 1
+    assert lazy_import("lazy_probe") is sys.modules["lazy_probe"]
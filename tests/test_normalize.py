@@ -12,9 +12,11 @@ from comparator.normalize import (
     pick_data_varname_from_ds,
     resolve_field_da,
     get_selector,
+    get_combined_selector,
     get_xarray_kwargs,
     wrap_longitude,
     ensure_dataset,
+    split_fields,
 )
 
 
@@ -303,3 +305,47 @@ def test_get_selector_wind_gust_fallback_and_maps():
     assert "10si" in get_selector("ifs", "WIND")
     # HREF uses the precise forecast regex
     assert "hour fcst" in get_selector("href", "GUST")
+
+
+def test_get_combined_selector_single_var_is_unchanged():
+    assert get_combined_selector("hrrr", ["TMP"]) == get_selector("hrrr", "TMP")
+
+
+def test_get_combined_selector_matches_every_variable():
+    import re
+    sel = get_combined_selector("hrrr", ["TMP", "DPT", "GUST", "TMP"])
+    assert re.search(sel, ":TMP:2 m above ground:1 hour fcst")
+    assert re.search(sel, ":DPT:2 m above ground:1 hour fcst")
+    assert re.search(sel, ":GUST:surface:1 hour fcst")
+    assert not re.search(sel, ":VIS:surface:1 hour fcst")
+
+
+def test_get_combined_selector_uses_model_selector_map():
+    sel = get_combined_selector("ifs", ["TMP", "DPT"])
+    assert ":2t:" in sel and ":2d:" in sel
+
+
+def test_split_fields_across_hypercubes():
+    ds_2m = xr.Dataset({"t2m": (("x",), [290.0]), "d2m": (("x",), [280.0])})
+    ds_10m = xr.Dataset({"u10": (("x",), [3.0]), "v10": (("x",), [4.0])})
+    ds_sfc = xr.Dataset({"gust": (("x",), [9.0]), "vis": (("x",), [1000.0])})
+    fields = split_fields([ds_sfc, ds_10m, ds_2m], ["TMP", "DPT", "WIND", "GUST", "VIS"])
+    assert float(fields["TMP"][0]) == 290.0
+    assert float(fields["DPT"][0]) == 280.0
+    assert float(fields["WIND"][0]) == pytest.approx(5.0)
+    assert float(fields["GUST"][0]) == 9.0
+    assert float(fields["VIS"][0]) == 1000.0
+
+
+def test_split_fields_prefers_exact_match_over_substring():
+    # "gust" contains "t" (a TMP candidate); the exact t2m match must win.
+    ds_gust = xr.Dataset({"gust": (("x",), [9.0])})
+    ds_tmp = xr.Dataset({"t2m": (("x",), [290.0])})
+    assert float(split_fields([ds_gust, ds_tmp], ["TMP"])["TMP"][0]) == 290.0
+
+
+def test_split_fields_missing_variable_raises():
+    ds_a = xr.Dataset({"t2m": (("x",), [290.0])})
+    ds_b = xr.Dataset({"foo": (("x",), [1.0])})
+    with pytest.raises(ValueError):
+        split_fields([ds_a, ds_b], ["VIS"])
@@ -0,0 +1,96 @@
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from comparator.pipeline import run_prefetch_pipeline
+
+
+def _square(item, fetched):
+    return fetched * fetched
+
+
+def test_pipeline_fetches_then_processes_every_item():
+    with ThreadPoolExecutor(max_workers=2) as cpu:
+        out = {item: (res, err) for item, res, err in
+               run_prefetch_pipeline(range(10), lambda i: i + 1, _square, cpu, 2, fetch_workers=4)}
+    assert out == {i: ((i + 1) ** 2, None) for i in range(10)}
+
+
+def test_pipeline_works_with_process_pool():
+    with ProcessPoolExecutor(max_workers=2) as cpu:
+        results = sorted(res for _, res, _ in
+                         run_prefetch_pipeline([1, 2, 3], lambda i: i, _square, cpu, 2))
+    assert results == [1, 4, 9]
+
+
+def test_pipeline_skips_unavailable_and_reports_errors():
+    def fetch(i):
+        if i == 1:
+            return None
+        if i == 2:
+            raise RuntimeError("network down")
+        return i
+
+    def process(item, fetched):
+        if item == 3:
+            raise ValueError("bad frame")
+        return fetched
+
+    processed = []
+    with ThreadPoolExecutor(max_workers=1) as cpu:
+        out = {}
+        for item, res, err in run_prefetch_pipeline(
+            [0, 1, 2, 3], fetch, lambda i, f: processed.append(i) or process(i, f), cpu, 1
+        ):
+            out[item] = (res, err)
+
+    assert out[0] == (0, None)
+    assert out[1] == (None, None)
+    assert isinstance(out[2][1], RuntimeError)
+    assert isinstance(out[3][1], ValueError)
+    assert 1 not in processed and 2 not in processed
+
+
+def test_pipeline_bounds_fetched_but_unprocessed_items():
+    lock = threading.Lock()
+    state = {"outstanding": 0, "peak": 0}
+    release = threading.Event()
+
+    def fetch(i):
+        with lock:
+            state["outstanding"] += 1
+            state["peak"] = max(state["peak"], state["outstanding"])
+        return i
+
+    def process(item, fetched):
+        release.wait(0.005)
+        with lock:
+            state["outstanding"] -= 1
+        return fetched
+
+    with ThreadPoolExecutor(max_workers=1) as cpu:
+        n = sum(1 for _ in run_prefetch_pipeline(
+            range(30), fetch, process, cpu, 1, fetch_workers=8, max_prefetch=2))
+    assert n == 30
+    assert state["peak"] <= 3  # cpu_workers + max_prefetch
+
+
+def test_pipeline_adapts_fetch_concurrency_to_the_ready_queue():
+    # slow downloads, instant processing: concurrency grows to the limit
+    stats = {}
+    with ThreadPoolExecutor(max_workers=1) as cpu:
+        n = sum(1 for _ in run_prefetch_pipeline(
+            range(60), lambda i: time.sleep(0.01 + 0.003 * (i % 7)) or i, _square, cpu, 1,
+            fetch_workers=16, stats=stats))
+    assert n == 60
+    assert stats["peak_fetching"] > 8  # grew from one (cpu_workers)
+
+    # instant downloads, slow processing: fetched items queue up, fetches back off
+    stats = {}
+    with ThreadPoolExecutor(max_workers=2) as cpu:
+        n = sum(1 for _ in run_prefetch_pipeline(
+            range(40), lambda i: i, lambda i, f: time.sleep(0.005) or f, cpu, 2,
+            fetch_workers=16, stats=stats))
+    assert n == 40
+    assert stats["peak_ready"] > 2
+    assert stats["fetch_limit"] < 16
@@ -53,6 +53,18 @@ def test_nearest_values_on_geo_grid_1d_coords():
     assert out[1] == pytest.approx(22)  # (-98, 31)
 
 
+def test_nearest_values_on_geo_grid_skips_nan_cells():
+    lon = xr.DataArray(np.array([-100, -99, -98], dtype=float), dims=("x",))
+    lat = xr.DataArray(np.array([30, 31], dtype=float), dims=("y",))
+    da = xr.DataArray(np.array([[np.nan, 2, 3], [4, 5, 6]]), dims=("y", "x"))
+
+    out = _nearest_values_on_geo_grid(
+        lon, lat, da, np.array([-100.0, -98.0]), np.array([30.0, 31.0])
+    )
+    assert out[0] in (2.0, 4.0)  # a finite neighbour of the masked cell
+    assert out[1] == 6.0
+
+
 def test_nearest_values_on_geo_grid_all_nan_returns_nan():
     lon = xr.DataArray(np.array([-100, -99], dtype=float), dims=("x",))
     lat = xr.DataArray(np.array([30, 31], dtype=float), dims=("y",))
@@ -62,3 +74,124 @@ def test_nearest_values_on_geo_grid_all_nan_returns_nan():
         lon, lat, da, np.array([-99.5]), np.array([30.5])
     )
     assert np.isnan(out[0])
+
+
+def _offline_basemap(monkeypatch, tmp_path):
+    """Swap the Natural Earth features for one in-memory line so no download is needed."""
+    import cartopy.crs as ccrs
+    import cartopy.feature as cfeature
+    import shapely.geometry as sgeom
+    from comparator import plotting
+
+    line = cfeature.ShapelyFeature(
+        [sgeom.LineString([(-120, 35), (-100, 40), (-80, 35)])], ccrs.PlateCarree()
+    )
+    calls = []
+    original = plotting._project_feature_paths
+
+    def counting(feature, proj, limits):
+        calls.append(feature)
+        return original(feature, proj, limits)
+
+    monkeypatch.setattr(plotting, "BASEMAP_FEATURES", (("line", line, 0.5),))
+    monkeypatch.setattr(plotting, "BASEMAP_CACHE_DIR", tmp_path)
+    monkeypatch.setattr(plotting, "_BASEMAP_CACHE", {})
+    monkeypatch.setattr(plotting, "_project_feature_paths", counting)
+    return calls
+
+
+def test_basemap_is_projected_once_and_reused(monkeypatch, tmp_path):
+    import matplotlib.pyplot as plt
+    from matplotlib.collections import PathCollection
+    from comparator import plotting
+
+    calls = _offline_basemap(monkeypatch, tmp_path)
+    for _ in range(3):
+        fig = plt.figure()
+        ax = plotting._init_conus_map(fig)
+        cols = [c for c in ax.collections if isinstance(c, PathCollection)]
+        assert len(cols) == 1
+        assert len(cols[0].get_paths()) == 1
+        assert cols[0].get_linewidth()[0] == pytest.approx(0.5)
+        plt.close(fig)
+    assert len(calls) == 1
+    assert len(list(tmp_path.glob("basemap_*.pkl"))) == 1
+
+    # A fresh process (empty in-memory cache) loads from disk instead of re-projecting.
+    monkeypatch.setattr(plotting, "_BASEMAP_CACHE", {})
+    layers = plotting._basemap_layers(plotting.CONUS_PROJ)
+    assert len(calls) == 1
+    assert len(layers[0][0]) == 1
+
+
+def test_basemap_paths_are_clipped_to_view(monkeypatch, tmp_path):
+    from comparator import plotting
+
+    _offline_basemap(monkeypatch, tmp_path)
+    xmin, xmax, ymin, ymax = plotting._conus_limits(plotting.CONUS_PROJ)
+    (paths, style), = plotting._basemap_layers(plotting.CONUS_PROJ)
+    verts = paths[0].vertices
+    assert verts[:, 0].min() >= xmin - 1 and verts[:, 0].max() <= xmax + 1
+    assert verts[:, 1].min() >= ymin - 1 and verts[:, 1].max() <= ymax + 1
+    assert style["linewidth"] == 0.5
+
+
+def _small_grid():
+    lon, lat = np.meshgrid(np.linspace(-120, -75, 46), np.linspace(25, 48, 24))
+    vals = np.sin(np.radians(lon) * 6) * 5
+    vals[3, 4] = np.nan
+    return lon, lat, vals
+
+
+def test_mesh_geometry_is_cached_per_grid_and_projection(monkeypatch):
+    from comparator import plotting
+
+    monkeypatch.setattr(plotting, "_MESH_CACHE", plotting.OrderedDict())
+    lon, lat, _ = _small_grid()
+    coords, bad = plotting._mesh_geometry(lon, lat, plotting.CONUS_PROJ)
+    assert coords.shape == (25, 47, 2)
+    assert bad.shape == (24, 46) and not bad.any()
+    again, _ = plotting._mesh_geometry(lon.copy(), lat.copy(), plotting.CONUS_PROJ)
+    assert again is coords
+    assert len(plotting._MESH_CACHE) == 1
+
+
+def test_mesh_geometry_masks_only_cells_torn_by_the_wrap_line(monkeypatch):
+    import cartopy.crs as ccrs
+    from comparator import plotting
+
+    monkeypatch.setattr(plotting, "_MESH_CACHE", plotting.OrderedDict())
+    lon = np.arange(0.0, 360.0, 10.0)  # 0..360 grid, seam at 180 after wrapping
+    lat = np.array([30.0, 40.0])
+    _, bad = plotting._mesh_geometry(lon, lat, ccrs.PlateCarree())
+    _, bad_pacific = plotting._mesh_geometry(lon, lat, ccrs.PlateCarree(central_longitude=180))
+    assert bad.sum() == 2 and bad[:, 18].all()  # the cell centered on 180
+    assert bad_pacific.sum() == 2 and bad_pacific[:, 0].all()  # the cell centered on 0
+
+
+def test_cached_mesh_renders_like_cartopy_pcolormesh(monkeypatch, tmp_path):
+    import matplotlib.pyplot as plt
+    from matplotlib.colors import TwoSlopeNorm
+    from comparator import plotting
+
+    monkeypatch.setattr(plotting, "_MESH_CACHE", plotting.OrderedDict())
+    lon, lat, vals = _small_grid()
+
+    def render(draw):
+        fig = plt.figure(figsize=(4, 3), dpi=50)
+        ax = fig.add_subplot(1, 1, 1, projection=plotting.CONUS_PROJ)
+        plotting._lock_conus_view(ax)
+        draw(ax)
+        fig.canvas.draw()
+        img = np.asarray(fig.canvas.buffer_rgba())[..., :3].astype(int)
+        plt.close(fig)
+        return img
+
+    norm = TwoSlopeNorm(vcenter=0, vmin=-5, vmax=5)
+    new = render(lambda ax: plotting._plot_tempdiff_mesh(
+        ax, lon, lat, xr.DataArray(vals), cmap="coolwarm", norm=norm))
+    ref = render(lambda ax: ax.pcolormesh(
+        lon, lat, np.ma.masked_invalid(vals), transform=plotting.PC,
+        cmap="coolwarm", norm=norm, shading="nearest"))
+    mismatch = np.any(np.abs(new - ref) > 40, axis=-1).mean()
+    assert mismatch < 0.02
@@ -0,0 +1,220 @@
+import numpy as np
+import pytest
+
+from comparator import regrid as rg
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache():
+    rg.clear_regridder_cache()
+    yield
+    rg.clear_regridder_cache()
+
+
+def _grid(nx=4, ny=3, offset=0.0):
+    lon, lat = np.meshgrid(np.linspace(-100, -97, nx) + offset, np.linspace(30, 32, ny))
+    return lon, lat
+
+
+def test_grid_fingerprint_is_stable_and_value_sensitive():
+    lon, lat = _grid()
+    assert rg.grid_fingerprint(lon, lat) == rg.grid_fingerprint(lon.copy(), lat.copy())
+    lon2, lat2 = _grid(offset=0.01)
+    assert rg.grid_fingerprint(lon, lat) != rg.grid_fingerprint(lon2, lat2)
+
+
+def test_grid_fingerprint_distinguishes_shape():
+    lon, lat = _grid(nx=6, ny=2)
+    assert rg.grid_fingerprint(lon, lat) != rg.grid_fingerprint(lon.reshape(3, 4), lat.reshape(3, 4))
+
+
+def test_weights_key_includes_method():
+    src = _grid()
+    tgt = _grid(nx=2, ny=2)
+    assert rg.weights_key(*src, *tgt, "bilinear") != rg.weights_key(*src, *tgt, "nearest_s2d")
+
+
+def test_get_regridder_reuses_hot_entry(monkeypatch, tmp_path):
+    calls = []
+
+    def fake_build(src_grid, tgt_grid, method, weights_path):
+        calls.append(weights_path)
+        return object()
+
+    monkeypatch.setattr(rg, "_build_regridder", fake_build)
+    src, tgt = _grid(), _grid(nx=2, ny=2)
+
+    r1 = rg.get_regridder(*src, *tgt, weights_dir=tmp_path)
+    r2 = rg.get_regridder(*src, *tgt, weights_dir=tmp_path)
+    assert r1 is r2
+    assert len(calls) == 1
+    assert calls[0].parent == tmp_path
+
+
+def test_get_regridder_rebuilds_when_grid_changes(monkeypatch, tmp_path):
+    paths = []
+    monkeypatch.setattr(rg, "_build_regridder", lambda s, t, m, p: paths.append(p) or object())
+
+    src = _grid()
+    rg.get_regridder(*src, *_grid(nx=2, ny=2), weights_dir=tmp_path)
+    rg.get_regridder(*src, *_grid(nx=2, ny=2, offset=0.5), weights_dir=tmp_path)
+    assert len(paths) == 2
+    assert paths[0] != paths[1]
+
+
+def test_get_regridder_lru_evicts_oldest(monkeypatch, tmp_path):
+    monkeypatch.setattr(rg, "_build_regridder", lambda s, t, m, p: object())
+    monkeypatch.setattr(rg, "MAX_CACHED_REGRIDDERS", 2)
+    src = _grid()
+    for off in (0.0, 1.0, 2.0):
+        rg.get_regridder(*src, *_grid(offset=off), weights_dir=tmp_path)
+    assert len(rg._REGRIDDERS) == 2
+    assert rg.weights_key(*src, *_grid(offset=0.0)) not in rg._REGRIDDERS
+
+
+def test_regrid_fields_applies_regridder_once_to_stack():
+    import xarray as xr
+
+    calls = []
+
+    def fake_regridder(da):
+        calls.append(da.dims)
+        return da * 2.0
+
+    fields = {
+        "TMP": xr.DataArray(np.full((2, 3), 1.0), dims=("y", "x"), name="t2m", attrs={"units": "K"}),
+        "DPT": xr.DataArray(np.full((2, 3), 5.0), dims=("y", "x"), name="d2m"),
+    }
+    out = rg.regrid_fields(fake_regridder, fields)
+    assert calls == [("field", "y", "x")]
+    assert set(out) == {"TMP", "DPT"}
+    assert out["TMP"].dims == ("y", "x")
+    assert float(out["TMP"][0, 0]) == 2.0 and float(out["DPT"][0, 0]) == 10.0
+    assert out["TMP"].name == "t2m" and out["TMP"].attrs["units"] == "K"
+    assert rg.regrid_fields(fake_regridder, {}) == {}
+
+
+def _weights(src_shape, tgt_shape, seed=0):
+    """Random sparse weights with 3 entries per target row; row 1 maps nothing."""
+    import scipy.sparse as sp
+
+    rng = np.random.default_rng(seed)
+    n_tgt, n_src = int(np.prod(tgt_shape)), int(np.prod(src_shape))
+    rows = np.repeat(np.arange(n_tgt), 3)
+    cols = rng.integers(0, n_src, size=rows.size)
+    vals = rng.random(rows.size)
+    vals[rows == 1] = 0.0
+    w = sp.csr_matrix((vals, (rows, cols)), shape=(n_tgt, n_src))
+    w.eliminate_zeros()
+    return w
+
+
+def test_sparse_regridder_matches_per_field_dense_product(monkeypatch):
+    src_lon, src_lat = _grid(nx=7, ny=5)
+    tgt_lon, tgt_lat = _grid(nx=4, ny=3, offset=0.2)
+    w = _weights((5, 7), (3, 4))
+    stack = np.random.default_rng(1).normal(280, 5, size=(2, 3, 5, 7))
+    expected = np.einsum("ts,abs->abt", w.toarray(), stack.reshape(2, 3, -1)).reshape(2, 3, 3, 4)
+    expected[..., 0, 1] = np.nan  # unmapped target cell
+
+    monkeypatch.setattr(rg, "_ROW_BLOCK", 5)  # several row blocks
+    for threads in (1, 3):
+        regridder = rg.SparseRegridder(w, (5, 7), tgt_lon, tgt_lat, threads=threads)
+        np.testing.assert_allclose(regridder.apply(stack), expected, equal_nan=True)
+    np.testing.assert_allclose(regridder.apply(stack[0, 0]), expected[0, 0], equal_nan=True)
+
+    f32 = regridder.astype(np.float32)
+    out = f32.apply(stack)
+    assert out.dtype == np.float32
+    np.testing.assert_allclose(out, expected, rtol=1e-6, equal_nan=True)
+
+    with pytest.raises(ValueError):
+        regridder.apply(np.zeros((5, 6)))
+    with pytest.raises(ValueError):
+        rg.SparseRegridder(w, (5, 6), tgt_lon, tgt_lat)
+
+
+def test_sparse_regridder_returns_dataarray_like_xesmf():
+    import xarray as xr
+
+    w = _weights((5, 7), (3, 4))
+    tgt_lon, tgt_lat = _grid(nx=4, ny=3)
+    src = xr.DataArray(
+        np.ones((2, 5, 7)), dims=("field", "y", "x"),
+        coords={"field": ["TMP", "DPT"], "longitude": (("y", "x"), _grid(nx=7, ny=5)[0])},
+        name="t2m", attrs={"units": "K"},
+    )
+    out = rg.SparseRegridder(w, (5, 7), tgt_lon, tgt_lat)(src)
+    assert out.dims == ("field", "y", "x") and out.name == "t2m"
+    assert list(out["field"].values) == ["TMP", "DPT"] and "longitude" not in out.coords
+    np.testing.assert_array_equal(out["lon"].values, tgt_lon)
+    assert out.attrs == {"regrid_method": "bilinear"}
+
+    lon1d, lat1d = np.linspace(-100, -97, 4), np.linspace(30, 32, 3)
+    out = rg.SparseRegridder(w, (5, 7), lon1d, lat1d)(src.isel(field=0))
+    assert out.dims == ("lat", "lon") and out.shape == (3, 4)
+
+
+def test_rectilinear_target_keeps_its_dims_through_fielddiff():
+    import xarray as xr
+
+    from comparator.fielddiff import compute_fielddiff
+
+    # GFS/IFS as cfgrib decodes them: 1-D latitude/longitude dimension coordinates
+    lat = xr.DataArray(np.linspace(40, 34, 7), dims="latitude")
+    lon = xr.DataArray(np.linspace(260, 268, 9), dims="longitude")
+    nwp = xr.DataArray(np.full((7, 9), 281.0), dims=("latitude", "longitude"),
+                       coords={"latitude": lat, "longitude": lon})
+    anl = xr.DataArray(np.full((5, 6), 280.0), dims=("y", "x"))
+    w = _weights((5, 6), (7, 9))
+    w = w.multiply(1 / np.maximum(w.sum(axis=1), 1e-12))  # rows sum to 1
+    regridder = rg.SparseRegridder(w, (5, 6), lon, lat)
+    for r in (regridder, regridder.astype(np.float32)):
+        anl_on_nwp = r(anl)
+        assert anl_on_nwp.dims == ("latitude", "longitude")
+        diff = compute_fielddiff(nwp, anl_on_nwp, "TMP")
+        assert diff.dims == ("latitude", "longitude") and diff.shape == (7, 9)
+        assert np.isnan(diff.values[0, 1]) and np.nanmax(np.abs(diff.values - 1.8)) < 1e-4
+
+
+def test_build_regridder_reads_stored_weights_without_esmf(monkeypatch, tmp_path):
+    import sys
+
+    import xarray as xr
+
+    w = _weights((5, 7), (3, 4)).tocoo()
+    path = tmp_path / "weights.nc"
+    xr.Dataset({"S": ("n_s", w.data), "col": ("n_s", w.col + 1), "row": ("n_s", w.row + 1)}).to_netcdf(path)
+    monkeypatch.setitem(sys.modules, "xesmf", None)  # importing it would fail
+
+    src, tgt = _grid(nx=7, ny=5), _grid(nx=4, ny=3)
+    regridder = rg._build_regridder({"lon": src[0], "lat": src[1]}, {"lon": tgt[0], "lat": tgt[1]},
+                                    "bilinear", path)
+    assert isinstance(regridder, rg.SparseRegridder)
+    np.testing.assert_array_equal(regridder.weights.toarray(), w.toarray())
+
+    path.write_bytes(b"truncated")
+    with pytest.raises(ImportError):  # corrupt file dropped, ESMF needed to rebuild
+        rg._build_regridder({"lon": src[0], "lat": src[1]}, {"lon": tgt[0], "lat": tgt[1]},
+                            "bilinear", path)
+    assert not path.exists()
+
+
+def test_sparse_regridder_matches_xesmf(tmp_path):
+    xe = pytest.importorskip("xesmf")
+    import xarray as xr
+
+    src_lon, src_lat = np.meshgrid(np.linspace(-105, -90, 40), np.linspace(28, 40, 30))
+    tgt_lon, tgt_lat = np.meshgrid(np.linspace(-103, -92, 25), np.linspace(30, 38, 18))
+    field = xr.DataArray(
+        np.stack([280 + np.sin(src_lon / 3) * k for k in (1.0, 2.0, 3.0)]), dims=("field", "y", "x")
+    )
+    src, tgt = {"lon": src_lon, "lat": src_lat}, {"lon": tgt_lon, "lat": tgt_lat}
+    expected = xe.Regridder(src, tgt, method="bilinear", periodic=False)(field)
+
+    built = rg._build_regridder(src, tgt, "bilinear", tmp_path / "w.nc")
+    reread = rg._build_regridder(src, tgt, "bilinear", tmp_path / "w.nc")  # from the stored file
+    for regridder in (built, reread, built.astype(np.float32)):
+        out = regridder(field)
+        assert out.dims == expected.dims
+        np.testing.assert_allclose(out.values, expected.values, rtol=1e-6, equal_nan=True)
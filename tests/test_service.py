@@ -0,0 +1,255 @@
+import http.client
+import json
+import socket
+import threading
+from datetime import datetime
+
+import numpy as np
+import pytest
+import xarray as xr
+
+import comparison_service as svc
+from comparator import regrid as rg
+from comparator import sources
+
+
+class StandInSource:
+    """Herbie-like handle serving synthetic 2 m temperatures, counting every decode."""
+
+    decodes = []
+
+    def __init__(self, model_key, run_dt, fxx, save_dir, source):
+        self.model_key, self.date, self.fxx = model_key, run_dt, fxx
+        self.save_dir = save_dir
+
+    def __bool__(self):
+        return self.fxx < 48
+
+    def get_localFilePath(self, search=None):
+        return self.save_dir / f"{self.model_key}_f{self.fxx:02d}.grib2"
+
+    def download(self, search=None):
+        return None
+
+    def xarray(self, search=None, remove_grib=True, **kwargs):
+        self.decodes.append((self.model_key, self.date, self.fxx))
+        lon, lat = np.meshgrid(np.linspace(-100, -95, 12), np.linspace(35, 38, 8))
+        kelvin = 280.0 if self.model_key == "rtma" else 281.0 + 0.1 * self.fxx
+        return xr.Dataset(
+            {"t2m": (("y", "x"), np.full(lon.shape, kelvin))},
+            coords={"longitude": (("y", "x"), lon), "latitude": (("y", "x"), lat)},
+        )
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    builds = []
+
+    def identity_regridder(src_grid, tgt_grid, method, weights_path):
+        builds.append(weights_path)
+        return lambda da: da  # stand-in grids are identical
+
+    monkeypatch.setattr(rg, "_build_regridder", identity_regridder)
+    rg.clear_regridder_cache()
+    StandInSource.decodes = []
+    sources.register_backend("standin", StandInSource)
+    sources.configure({"default": sources.Source("standin")})
+    service = svc.ComparisonService(
+        save_dir=tmp_path / "data", out_dir=tmp_path / "figures",
+        weights_dir=tmp_path / "weights", domain=None, render=False,
+    )
+    service.builds = builds
+    yield service
+    sources.configure({})
+    del sources.BACKENDS["standin"]
+    rg.clear_regridder_cache()
+
+
+@pytest.fixture
+def server(service):
+    server = svc.make_server(service, port=0, quiet=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _request(server, method, path, body=None):
+    conn = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=10)
+    conn.request(method, path, body=None if body is None else json.dumps(body))
+    resp = conn.getresponse()
+    payload = json.loads(resp.read())
+    conn.close()
+    return resp.status, payload
+
+
+def test_warm_requests_reuse_fields_and_regridded_analysis(server, service):
+    status, out = _request(server, "GET", "/compare?model=hrrr&var=t2m&cycle=2026-02-01T06&fxx=6")
+    assert status == 200
+    assert out["png"] is None
+    assert out["stats"]["bias"] == pytest.approx((281.6 - 280.0) * 9 / 5)
+    assert out["stats"]["cycle"] == "2026-02-01T06:00:00"
+    assert len(StandInSource.decodes) == 2 and len(service.builds) == 1
+
+    # same request again: nothing is decoded, loaded or regridded
+    status, again = _request(server, "POST", "/compare",
+                             {"model": "HRRR", "var": "TMP", "cycle": "2026-02-01T06:00Z", "fxx": 6})
+    assert status == 200 and again["stats"] == out["stats"]
+    assert len(StandInSource.decodes) == 2 and len(service.builds) == 1
+    assert service.regridded.hits == 1
+
+    # another run valid at the same hour: only its own model file is decoded
+    status, other = _request(server, "GET", "/compare?model=hrrr&var=TMP&cycle=2026-02-01T00&fxx=12")
+    assert status == 200
+    assert StandInSource.decodes[-1] == ("hrrr", datetime(2026, 2, 1, 0), 12)
+    assert len(StandInSource.decodes) == 3 and service.regridded.hits == 2
+
+    status, health = _request(server, "GET", "/health")
+    assert status == 200 and health["requests"] == 3 and health["fields"]["size"] == 3
+
+
+def test_bad_and_unavailable_requests(server):
+    assert _request(server, "GET", "/compare?model=nope&var=TMP&cycle=2026-02-01&fxx=6")[0] == 400
+    assert _request(server, "GET", "/compare?model=hrrr&var=TMP")[0] == 400
+    status, out = _request(server, "GET", "/compare?model=hrrr&var=TMP&cycle=2026-02-01T00&fxx=60")
+    assert status == 404 and "HRRR" in out["error"]
+    assert _request(server, "GET", "/nowhere")[0] == 404
+
+
+def test_unix_socket(service, tmp_path):
+    path = tmp_path / "cmp.sock"
+    server = svc.make_server(service, socket_path=path, quiet=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+            s.connect(str(path))
+            s.sendall(b"GET /health HTTP/1.0\r\n\r\n")
+            reply = b""
+            while chunk := s.recv(65536):
+                reply += chunk
+        assert reply.startswith(b"HTTP/1.0 200")
+        assert json.loads(reply.split(b"\r\n\r\n", 1)[1])["status"] == "ok"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = svc.LRUCache(2)
+    cache["a"], cache["b"] = 1, 2
+    assert cache.get("a") == 1
+    cache["c"] = 3
+    assert cache.get("b") is None and cache.get("a") == 1 and len(cache) == 2
+
+
+class SubsetSource(StandInSource):
+    """Stand-in that writes its GRIB subset to disk, like Herbie."""
+
+    def download(self, search=None):
+        self.get_localFilePath(search).write_bytes(b"GRIB")
+
+
+def test_load_fields_removes_only_subsets_it_downloaded(tmp_path):
+    import new_comparison as nc
+
+    sources.register_backend("subset", SubsetSource)
+    sources.configure({"default": sources.Source("subset")})
+    try:
+        assert "TMP" in nc.load_fields("hrrr", datetime(2026, 2, 1), 6, ["TMP"], tmp_path)
+        assert not (tmp_path / "hrrr_f06.grib2").exists()
+
+        kept = tmp_path / "hrrr_f07.grib2"
+        kept.write_bytes(b"GRIB")  # already on disk: never deleted
+        assert "TMP" in nc.load_fields("hrrr", datetime(2026, 2, 1), 7, ["TMP"], tmp_path)
+        assert kept.exists()
+        assert "TMP" in nc.load_fields("hrrr", datetime(2026, 2, 1), 8, ["TMP"], tmp_path,
+                                       remove_grib=False)
+        assert (tmp_path / "hrrr_f08.grib2").exists()
+    finally:
+        sources.configure({})
+        del sources.BACKENDS["subset"]
+
+
+def test_analysis_and_reference_fields_load_concurrently(tmp_path):
+    import new_comparison as nc
+
+    barrier = threading.Barrier(3, timeout=5)  # analysis + two models, all in flight at once
+
+    class BarrierSource(StandInSource):
+        def xarray(self, search=None, remove_grib=True, **kwargs):
+            barrier.wait()
+            return super().xarray(search, remove_grib, **kwargs)
+
+    sources.register_backend("barrier", BarrierSource)
+    sources.configure({"default": sources.Source("barrier")})
+    try:
+        runs = {"hrrr": [(datetime(2026, 2, 1, 0), 6)], "rap": [(datetime(2026, 2, 1, 0), 6)]}
+        anl, refs = nc.load_comparison_inputs("TMP", datetime(2026, 2, 1, 6), "rtma", runs, tmp_path)
+        assert anl is not None and float(anl.mean()) == pytest.approx(280.0)
+        assert set(refs) == {"hrrr", "rap"} and all(r is not None for r in refs.values())
+    finally:
+        sources.configure({})
+        del sources.BACKENDS["barrier"]
+
+
+def test_custom_station_list_reaches_the_map(service, monkeypatch):
+    import new_comparison as nc
+    from comparator.util import major_airports_df
+
+    rendered = []
+    monkeypatch.setattr(nc, "_save_comparison_plot", lambda *args: rendered.append(args) or "x.png")
+    service.render = True
+    service.station_list = major_airports_df().head(3)
+    out = service.compare("hrrr", "TMP", "rtma", datetime(2026, 2, 1, 6), 6)
+    assert out["png"] == "x.png"
+    assert rendered[0][-1]["icao"].tolist() == ["KATL", "KLAX", "KORD"]
+
+
+def test_cli_stations_and_archive_are_passed_to_batch_runs(tmp_path, monkeypatch):
+    import new_comparison as nc
+
+    path = tmp_path / "sites.csv"
+    path.write_text("station,latitude,longitude\nKDEN,39.86,-104.67\n")
+    calls = []
+    monkeypatch.setattr(nc, "run_batch", lambda config, stats_only, stations, archive:
+                        calls.append((stations, archive)))
+    nc.main(["--config", "batch.yaml", "--stations", str(path)])
+    assert calls[0][0]["icao"].tolist() == ["KDEN"] and calls[0][1] is None
+    nc.main(["--config", "batch.yaml", "--archive", str(tmp_path / "archive")])
+    assert calls[1][0] is None and calls[1][1].root == tmp_path / "archive"
+    with pytest.raises(SystemExit):
+        nc.main(["--config", "batch.yaml", "--stations", str(tmp_path / "missing.csv")])
+
+
+def test_batch_removes_only_subsets_it_downloaded(service, tmp_path):
+    import new_comparison as nc
+    from comparator import batch
+
+    sources.register_backend("subset", SubsetSource)
+    sources.configure({"default": sources.Source("subset")})
+    try:
+        save_dir = tmp_path / "batch"
+        save_dir.mkdir()
+        kept = save_dir / "hrrr_f07.grib2"
+        kept.write_bytes(b"GRIB")  # already on disk: never deleted
+        jobs = [batch.Job("hrrr", "TMP", "rtma", datetime(2026, 2, 1, 0), fxx) for fxx in (6, 7)]
+        graph, job_key = nc.build_batch_graph(jobs, save_dir=save_dir, weights_dir=tmp_path / "w",
+                                              render=False, domain=None)
+        results, errors = graph.run(max_workers=2)
+        assert not errors and all(job_key(job) in results for job in jobs)
+        assert sorted(p.name for p in save_dir.glob("*.grib2")) == ["hrrr_f07.grib2"]
+    finally:
+        sources.configure({})
+        del sources.BACKENDS["subset"]
+
+
+def test_concurrent_requests_are_all_counted(service):
+    from concurrent.futures import ThreadPoolExecutor
+
+    def compare(fxx):
+        return service.compare("hrrr", "TMP", "rtma", datetime(2026, 2, 1, 0), fxx, render=False)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(compare, [6, 7, 8, 9] * 4))
+    assert service.info()["requests"] == 16
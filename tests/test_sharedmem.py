@@ -0,0 +1,65 @@
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pytest
+import xarray as xr
+
+from comparator import sharedmem as shm
+
+
+def _field():
+    lon, lat = np.meshgrid([-100.0, -99.0, -98.0], [30.0, 31.0])
+    return xr.DataArray(
+        np.arange(6, dtype=float).reshape(2, 3),
+        dims=("y", "x"),
+        coords={
+            "lon": (("y", "x"), lon),
+            "lat": (("y", "x"), lat),
+            "x": [0, 1, 2],
+            "time": np.datetime64("2026-02-01T12:00"),
+        },
+        name="anl",
+        attrs={"units": "K"},
+    )
+
+
+def _worker_sum(spec):
+    da = shm.attach_dataarray(spec)
+    return float(da.sum()), bool(da.values.flags.writeable), float(da["lon"][0, 0])
+
+
+def test_round_trip_preserves_values_coords_and_metadata():
+    da = _field()
+    with shm.SharedArrayStore() as store:
+        out = shm.attach_dataarray(store.put_dataarray(da))
+        xr.testing.assert_identical(out, da)
+        assert not out.values.flags.writeable
+
+
+def test_identical_arrays_are_stored_once():
+    da = _field()
+    with shm.SharedArrayStore() as store:
+        a = store.put_array(da["lon"].values)
+        b = store.put_array(da["lon"].values.copy())
+        assert a == b
+        store.put_dataarray(da)
+        # values, lon, lat, x (lon already shared)
+        assert len(store._blocks) == 4
+
+
+def test_workers_attach_read_only_views():
+    da = _field()
+    with shm.SharedArrayStore() as store:
+        spec = store.put_dataarray(da)
+        with ProcessPoolExecutor(max_workers=2) as pool:
+            results = list(pool.map(_worker_sum, [spec, spec]))
+    assert results == [(15.0, False, -100.0)] * 2
+
+
+def test_close_unlinks_blocks():
+    store = shm.SharedArrayStore()
+    name = store.put_array(np.ones(4))["shm"]
+    store.close()
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=name)
@@ -0,0 +1,199 @@
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from comparator import sources
+from comparator.sources import LocalArchive, Source, parse_sources
+
+CYCLE = datetime(2026, 2, 1, 12)
+TEMPLATE = "/{model}/{cycle:%Y%m%d}/{model}.t{cycle:%H}z.wrf{product}f{fxx:02d}.grib2"
+
+
+@pytest.fixture(autouse=True)
+def _reset_routes():
+    yield
+    sources.configure({})
+
+
+def _mirror(tmp_path, messages, idx=True):
+    """Write a fake HRRR file of *messages* (search text, payload) plus a wgrib2 .idx."""
+    path = tmp_path / "mirror" / "hrrr" / "20260201" / "hrrr.t12z.wrfsfcf06.grib2"
+    path.parent.mkdir(parents=True)
+    lines, offset = [], 0
+    with open(path, "wb") as f:
+        for n, (text, payload) in enumerate(messages, 1):
+            lines.append(f"{n}:{offset}:d=2026020112:{text}:")
+            f.write(payload)
+            offset += len(payload)
+    if idx:
+        path.with_name(path.name + ".idx").write_text("\n".join(lines) + "\n")
+    return path
+
+
+def test_parse_sources_cli_and_config():
+    routes = parse_sources(["local:/m/{model}/f{fxx}.grib2", "RTMA=herbie"])
+    assert routes == {"default": Source("local", "/m/{model}/f{fxx}.grib2"), "rtma": Source()}
+    routes = parse_sources({"NAM": {"backend": "local", "template": "/x", "fallback": "herbie"}})
+    assert routes == {"nam12k": Source("local", "/x", "herbie")}
+    assert parse_sources(None) == {}
+    with pytest.raises(ValueError):
+        parse_sources(["local"])  # no template
+    with pytest.raises(ValueError):
+        parse_sources(["s3:/bucket"])
+    with pytest.raises(ValueError):
+        parse_sources({"hrrr": {"backend": "local", "path": "/x"}})
+
+
+def test_local_archive_copies_only_matching_messages(tmp_path):
+    grib = _mirror(tmp_path, [
+        ("TMP:2 m above ground:6 hour fcst", b"T" * 10),
+        ("DPT:2 m above ground:6 hour fcst", b"D" * 7),
+        ("UGRD:10 m above ground:6 hour fcst", b"U" * 5),
+        ("VGRD:10 m above ground:6 hour fcst", b"V" * 5),
+    ])
+    sources.configure(parse_sources([f"local:{tmp_path / 'mirror'}{TEMPLATE}"]))
+    H = sources.open_file("hrrr", CYCLE, 6, tmp_path / "data")
+    assert isinstance(H, LocalArchive) and H and H.grib == grib
+
+    search = r"(?:TMP:2 m above ground)|(?:[UV]GRD:10 m above ground)"
+    assert H.byte_ranges(search) == [(0, 10), (17, 27)]  # U and V merged
+    out = H.download(search)
+    assert out != grib and out.is_relative_to(tmp_path / "data")
+    assert out.read_bytes() == b"T" * 10 + b"U" * 5 + b"V" * 5
+    assert H.get_localFilePath(search) == out
+    with pytest.raises(ValueError):
+        H.download(":GUST:")
+
+    assert not sources.open_file("hrrr", CYCLE, 7, tmp_path / "data")
+
+
+def test_local_archive_without_index_reads_mirror_in_place(tmp_path, monkeypatch):
+    monkeypatch.setattr(sources.shutil, "which", lambda name: None)
+    grib = _mirror(tmp_path, [("TMP:2 m above ground:6 hour fcst", b"T")], idx=False)
+    src = Source("local", f"{tmp_path / 'mirror'}{TEMPLATE}")
+    H = LocalArchive("hrrr", CYCLE, 6, tmp_path / "data", src)
+    assert H.inventory() is None
+    assert H.get_localFilePath(":TMP:") == grib and H.download(":TMP:") == grib
+
+
+def test_fallback_backend_and_per_model_routes(tmp_path):
+    opened = []
+
+    def fake(model_key, run_dt, fxx, save_dir, source):
+        opened.append((model_key, source.backend))
+        return "handle"
+
+    sources.register_backend("fake", fake)
+    try:
+        sources.configure(parse_sources({
+            "default": "fake",
+            "hrrr": {"backend": "local", "template": f"{tmp_path}/missing/{{fxx}}.grib2",
+                     "fallback": "fake"},
+        }))
+        assert sources.open_file("hrrr", CYCLE, 6, tmp_path) == "handle"
+        assert sources.open_file("gfs", CYCLE, 6, tmp_path) == "handle"
+        assert opened == [("hrrr", "fake"), ("gfs", "fake")]
+    finally:
+        del sources.BACKENDS["fake"]
+
+
+def test_resolution_cache_ttls(tmp_path):
+    cache = sources.ResolutionCache(tmp_path)
+    url, hour = "https://bucket/hrrr.t12z.wrfsfcf06.grib2", timedelta(hours=1)
+
+    # resolved while the cycle was recent: short TTL
+    cache.put("hrrr", CYCLE, 6, url, "aws", url + ".idx", "aws", now=CYCLE + hour)
+    assert cache.get("hrrr", CYCLE, 6, now=CYCLE + hour + timedelta(minutes=5))["grib"] == url
+    assert cache.get("hrrr", CYCLE, 6, now=CYCLE + 2 * hour) is None
+    # resolved once the cycle is finished: never expires, unless the server rolls over
+    cache.put("hrrr", CYCLE, 6, url, "aws", url + ".idx", "aws", now=CYCLE + 48 * hour)
+    assert cache.get("hrrr", CYCLE, 6, now=CYCLE + 10_000 * hour) is not None
+    cache.put("hrrr", CYCLE, 6, url, "nomads", url + ".idx", "nomads", now=CYCLE + 48 * hour)
+    assert cache.get("hrrr", CYCLE, 6, now=CYCLE + 80 * hour) is None
+    # "not found" is retried
+    cache.put("hrrr", CYCLE, 7, None, None, None, None, now=CYCLE + 48 * hour)
+    assert cache.get("hrrr", CYCLE, 7, now=CYCLE + 49 * hour)["grib"] is None
+    assert cache.get("hrrr", CYCLE, 7, now=CYCLE + 60 * hour) is None
+
+    cache._path("hrrr", CYCLE, 8, ".json").write_text("{truncated")
+    assert cache.get("hrrr", CYCLE, 8) is None
+
+
+def test_herbie_backend_resolves_each_file_once(tmp_path, monkeypatch):
+    core = pytest.importorskip("herbie.core")
+    url = "https://bucket/hrrr.20260201/conus/hrrr.t12z.wrfsfcf06.grib2"
+    calls = []
+
+    def find_grib(self):
+        calls.append("grib")
+        return url, "aws"
+
+    def find_idx(self):
+        calls.append("idx")
+        return url + ".idx", "aws"
+
+    monkeypatch.setattr(core.Herbie, "find_grib", find_grib)
+    monkeypatch.setattr(core.Herbie, "find_idx", find_idx)
+    first = sources.open_file("hrrr", CYCLE, 6, tmp_path)
+    assert first and first.grib == url and calls == ["grib", "idx"]
+
+    # a cached index is read from disk: no probes, no index download
+    sources.ResolutionCache(tmp_path / "sources").put_inventory(
+        "hrrr", CYCLE, 6,
+        "1:0:d=2026020112:TMP:2 m above ground:6 hour fcst:\n"
+        "2:100:d=2026020112:DPT:2 m above ground:6 hour fcst:\n",
+    )
+    again = sources.open_file("hrrr", CYCLE, 6, tmp_path)
+    assert calls == ["grib", "idx"]
+    assert again.grib == url and again.idx_source == "local"
+    assert again.inventory(":DPT:").start_byte.tolist() == [100]
+
+
+def test_probe_checks_runs_concurrently(tmp_path):
+    def slow(model_key, run_dt, fxx, save_dir, source):
+        time.sleep(0.2)
+        if fxx == 3:
+            raise OSError("connection reset")
+        return fxx % 2 == 0
+
+    sources.register_backend("slow", slow)
+    try:
+        sources.configure(parse_sources(["slow"]))
+        items = [("hrrr", (CYCLE, f)) for f in range(8)]
+        t0 = time.perf_counter()
+        found = sources.probe(items, tmp_path, max_workers=8)
+        assert time.perf_counter() - t0 < 1.0
+        assert [f for (_, (_, f)), ok in found.items() if ok] == [0, 2, 4, 6]
+        assert sources.probe([], tmp_path) == {}
+    finally:
+        del sources.BACKENDS["slow"]
+
+
+def test_local_archive_decodes_subset_with_cfgrib(tmp_path):
+    eccodes = pytest.importorskip("eccodes")
+    pytest.importorskip("cfgrib")
+    path = tmp_path / "mirror" / "rtma" / "20260201" / "rtma.t12z.anl.grib2"
+    path.parent.mkdir(parents=True)
+    lines, offset = [], 0
+    with open(path, "wb") as f:
+        for n, (short, value) in enumerate((("2t", 280.0), ("2d", 270.0)), 1):
+            h = eccodes.codes_grib_new_from_samples("GRIB2")
+            eccodes.codes_set(h, "shortName", short)
+            eccodes.codes_set_values(h, np.full(eccodes.codes_get(h, "numberOfValues"), value))
+            msg = eccodes.codes_get_message(h)
+            eccodes.codes_release(h)
+            name = {"2t": "TMP", "2d": "DPT"}[short]
+            lines.append(f"{n}:{offset}:d=2026020112:{name}:2 m above ground:anl:")
+            f.write(msg)
+            offset += len(msg)
+    path.with_name(path.name + ".idx").write_text("\n".join(lines) + "\n")
+
+    src = Source("local", f"{tmp_path / 'mirror'}/{{model}}/{{cycle:%Y%m%d}}/rtma.t{{cycle:%H}}z.anl.grib2")
+    H = LocalArchive("rtma", CYCLE, 0, tmp_path / "data", src)
+    ds = H.xarray(":DPT:2 m above ground", remove_grib=True)
+    assert list(ds.data_vars) == ["d2m"]
+    assert float(ds["d2m"].mean()) == pytest.approx(270.0)
+    assert not H.get_localFilePath(":DPT:2 m above ground").exists()  # subset removed
+    assert path.exists()  # the mirror never is
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from comparator import stations
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache():
+    stations.clear_station_index_cache()
+    yield
+    stations.clear_station_index_cache()
+
+
+def _curvilinear_grid(ny=20, nx=30):
+    """A rotated, sheared lon/lat grid (like a Lambert grid seen in lon/lat)."""
+    j, i = np.mgrid[0:ny, 0:nx].astype(float)
+    lon = -110.0 + 0.5 * i + 0.1 * j
+    lat = 30.0 + 0.4 * j - 0.05 * i
+    return lon, lat
+
+
+def test_nearest_index_matches_brute_force():
+    lon, lat = _curvilinear_grid()
+    rng = np.random.default_rng(0)
+    st_lon = rng.uniform(-105, -100, 50)
+    st_lat = rng.uniform(31, 35, 50)
+    index = stations.build_station_index(lon, lat, st_lon, st_lat)
+
+    d = (np.radians(lon[None] - st_lon[:, None, None]) * np.cos(np.radians(st_lat))[:, None, None]) ** 2 \
+        + np.radians(lat[None] - st_lat[:, None, None]) ** 2
+    flat = d.reshape(len(st_lon), -1).argmin(axis=1)
+    iy, ix = np.unravel_index(flat, lon.shape)
+    assert (index.iy == iy).mean() > 0.95 and (index.ix == ix).mean() > 0.95
+
+
+def test_bilinear_weights_reproduce_a_linear_field():
+    lon, lat = _curvilinear_grid()
+    field = 2.0 * lon - 3.0 * lat + 1.0
+    st_lon = np.array([-104.3, -101.07, -99.9])
+    st_lat = np.array([32.2, 33.55, 31.8])
+    index = stations.build_station_index(lon, lat, st_lon, st_lat)
+    np.testing.assert_allclose(index.weights.sum(axis=1), 1.0)
+    got = stations.sample(index, field, method="bilinear")
+    np.testing.assert_allclose(got, 2.0 * st_lon - 3.0 * st_lat + 1.0, atol=0.05)
+
+
+def test_bilinear_renormalizes_over_missing_corners():
+    lon, lat = np.meshgrid([-100.0, -99.0], [30.0, 31.0])
+    vals = np.array([[1.0, np.nan], [3.0, np.nan]])
+    index = stations.build_station_index(lon, lat, np.array([-99.5]), np.array([30.5]))
+    assert stations.sample(index, vals, method="bilinear")[0] == pytest.approx(2.0)
+    assert np.isnan(stations.sample(index, np.full((2, 2), np.nan), method="bilinear")[0])
+    with pytest.raises(ValueError):
+        stations.sample(index, vals, method="cubic")
+
+
+def test_station_outside_grid_falls_back_to_nearest_node():
+    lon, lat = np.meshgrid([-100.0, -99.0, -98.0], [30.0, 31.0])
+    index = stations.build_station_index(lon, lat, np.array([-90.0]), np.array([30.0]))
+    assert (index.iy[0], index.ix[0]) == (0, 2)
+    assert index.weights[0].tolist() == [1.0, 0.0, 0.0, 0.0]
+
+
+def test_index_is_cached_in_memory_and_on_disk(tmp_path, monkeypatch):
+    monkeypatch.setattr(stations, "MIN_DISK_CACHE_CELLS", 0)
+    calls = []
+    build = stations.build_station_index
+    monkeypatch.setattr(stations, "build_station_index", lambda *a: calls.append(1) or build(*a))
+
+    lon, lat = _curvilinear_grid()
+    st = (np.array([-104.0, -101.0]), np.array([32.0, 33.0]))
+    first = stations.get_station_index(lon, lat, *st, cache_dir=tmp_path)
+    stations.get_station_index(lon.copy(), lat.copy(), *st, cache_dir=tmp_path)
+    assert len(calls) == 1
+    assert len(list(tmp_path.glob("*.npz"))) == 1
+
+    stations.clear_station_index_cache()
+    again = stations.get_station_index(lon, lat, *st, cache_dir=tmp_path)
+    assert len(calls) == 1  # loaded from disk
+    for a, b in zip(first, again):
+        np.testing.assert_array_equal(a, b)
+
+    stations.get_station_index(lon, lat, st[0][:1], st[1][:1], cache_dir=tmp_path)
+    assert len(calls) == 2  # a different station list is a different index
@@ -0,0 +1,94 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+import xarray as xr
+
+from comparator import stats
+
+CYCLE = datetime(2026, 2, 1, 12)
+
+
+def test_compute_stats_matches_reference_formulas():
+    rng = np.random.default_rng(1)
+    vals = rng.normal(1.5, 2.0, size=(40, 50))
+    vals[0, :10] = np.nan
+    diff = xr.DataArray(vals, dims=("y", "x"))
+    out = stats.compute_stats(diff)
+
+    v = vals[np.isfinite(vals)]
+    assert out["count"] == v.size == 1990
+    assert out["bias"] == pytest.approx(v.mean())
+    assert out["mae"] == pytest.approx(np.abs(v).mean())
+    assert out["rmse"] == pytest.approx(np.sqrt((v ** 2).mean()))
+    assert out["std"] == pytest.approx(v.std())
+    assert out["min"] == v.min() and out["max"] == v.max()
+    assert out["p50"] == pytest.approx(np.median(v))
+    assert out["p05"] == pytest.approx(np.percentile(v, 5))
+    assert list(out) == stats.stat_columns()
+
+
+def test_compute_stats_all_missing():
+    out = stats.compute_stats(np.full((3, 3), np.nan), percentiles=(10, 90))
+    assert out["count"] == 0
+    assert np.isnan(out["rmse"]) and np.isnan(out["p90"])
+
+
+def test_custom_percentile_names():
+    assert stats.stat_columns((2.5, 50))[-2:] == ["p2_5", "p50"]
+
+
+def test_stats_row_keys_and_units():
+    row = stats.stats_row(np.ones((2, 2)), "hrrr", "TMP", "rtma", CYCLE, 6)
+    assert row["model"] == "hrrr" and row["fxx"] == 6
+    assert row["valid"] == np.datetime64("2026-02-01T18:00")
+    assert row["units"] == "degF"
+    assert row["bias"] == 1.0
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".parquet"])
+def test_write_stats_upserts_by_key(tmp_path, suffix):
+    if suffix == ".parquet":
+        pytest.importorskip("pyarrow")
+    path = tmp_path / f"scores{suffix}"
+    stats.write_stats([
+        stats.stats_row(np.ones(4), "hrrr", "TMP", "rtma", CYCLE, 6),
+        stats.stats_row(np.ones(4), "nam12k", "TMP", "rtma", CYCLE, 6),
+    ], path)
+    df = stats.write_stats([stats.stats_row(np.full(4, 3.0), "hrrr", "TMP", "rtma", CYCLE, 6)], path)
+
+    assert len(df) == 2
+    again = stats.read_stats(path)
+    assert len(again) == 2
+    hrrr = again[again["model"] == "hrrr"].iloc[0]
+    assert hrrr["bias"] == 3.0
+    assert hrrr["cycle"] == np.datetime64("2026-02-01T12:00")
+    assert not list(tmp_path.glob("*.tmp*"))
+
+
+def test_concurrent_writers_keep_every_row(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+
+    path = tmp_path / "scores.csv"
+    rows = [stats.stats_row(np.ones(4), "hrrr", "TMP", "rtma", CYCLE, fxx) for fxx in range(16)]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda row: stats.write_stats([row], path), rows))
+    assert sorted(stats.read_stats(path)["fxx"]) == list(range(16))
+    assert not list(tmp_path.glob("*.tmp*"))
+
+
+def test_model_summary_pools_runs_by_point_count():
+    rows = [
+        stats.stats_row(np.full(3, 1.0), "hrrr", "TMP", "rtma", CYCLE, 6),
+        stats.stats_row(np.full(1, -3.0), "hrrr", "TMP", "rtma", CYCLE, 12),
+        stats.stats_row(np.full(4, 0.5), "rap", "TMP", "rtma", CYCLE, 6),
+        stats.stats_row(np.full(2, np.nan), "nbm", "TMP", "rtma", CYCLE, 6),
+    ]
+    out = stats.model_summary(rows)
+    assert out["model"].tolist() == ["rap", "hrrr"]  # best RMSE first; empty NBM dropped
+    hrrr = out.iloc[1]
+    assert hrrr["runs"] == 2 and hrrr["points"] == 4
+    assert hrrr["bias"] == pytest.approx(0.0)
+    assert hrrr["mae"] == pytest.approx(1.5)
+    assert hrrr["rmse"] == pytest.approx(np.sqrt(3.0))
+    assert (hrrr["min_fxx"], hrrr["max_fxx"]) == (6, 12)
@@ -111,4 +111,31 @@ def test_compute_fielddiff_preserves_coords_and_dims():
     out = compute_fielddiff(h, r)
     assert out.dims == ("y", "x")
     assert np.all(out["y"].values == np.array([10, 20]))
-    assert np.all(out["x"].values == np.array([1, 2]))
\ No newline at end of file
+    assert np.all(out["x"].values == np.array([1, 2]))
+
+@pytest.mark.parametrize("var_key", ["TMP", "VIS", "WIND"])
+@pytest.mark.parametrize("dtype", [np.float32, np.float64])
+def test_compute_fielddiff_matches_xarray_expression(var_key, dtype):
+    from comparator.fielddiff import DIFF_RULES
+
+    rule = DIFF_RULES[var_key]
+    rng = np.random.default_rng(0)
+    shape = (70, 1000)  # more than one kernel block
+    span = rule.hi - rule.lo
+    h = (rule.lo + span * rng.uniform(-0.1, 1.1, shape)).astype(dtype)
+    r = (rule.lo + span * rng.uniform(-0.1, 1.1, shape)).astype(dtype)
+    h[0, :2] = [np.nan, np.inf]
+    coords = {"longitude": (("y", "x"), rng.uniform(-130, -60, shape))}
+    hda = xr.DataArray(h, dims=("y", "x"), coords={**coords, "step": 6}, name="f")
+    rda = xr.DataArray(r, dims=("y", "x"), coords={**coords, "step": 0}, name="f")
+
+    if rule.strict:
+        valid = (hda > rule.lo) & (hda < rule.hi) & (rda > rule.lo) & (rda < rule.hi)
+    else:
+        valid = (hda >= rule.lo) & (hda <= rule.hi) & (rda >= rule.lo) & (rda <= rule.hi)
+    expected = (hda - rda).where(valid) * rule.mul / rule.div
+    expected = expected.assign_coords(step=0)  # the analysis' time coordinates win
+
+    out = compute_fielddiff(hda, rda, var_key)
+    xr.testing.assert_identical(out, expected)
+    assert out.dtype == dtype
@@ -0,0 +1,88 @@
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from comparator import timing
+
+
+@pytest.fixture(autouse=True)
+def _reset():
+    timing.enable(False)
+    timing.drain()
+    yield
+    timing.enable(False)
+    timing.drain()
+
+
+def _worker(n):
+    timing.enable(True)
+    for i in range(n):
+        timing.record("decode", 0.5, frame=i)
+    return n, timing.drain()
+
+
+def test_disabled_is_a_shared_noop():
+    assert timing.timed("decode") is timing.timed("render", model="hrrr")
+    with timing.timed("decode"):
+        pass
+    timing.record("decode", 1.0)
+    assert timing.records() == []
+
+
+def test_timed_records_stage_labels_and_errors():
+    timing.enable()
+    with timing.timed("diff", model="hrrr", fxx=6):
+        pass
+    with pytest.raises(RuntimeError):
+        with timing.timed("render"):
+            raise RuntimeError("boom")
+    recs = timing.records()
+    assert [r["stage"] for r in recs] == ["diff", "render"]
+    assert recs[0]["model"] == "hrrr" and recs[0]["fxx"] == 6 and recs[0]["ok"]
+    assert recs[0]["seconds"] >= 0 and not recs[1]["ok"]
+
+
+def test_worker_records_merge_into_parent_summary():
+    timing.enable()
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        for _, recs in pool.map(_worker, [2, 3]):
+            timing.extend(recs)
+    for secs in (1.0, 2.0, 3.0, 4.0, 5.0):
+        timing.record("diff", secs)
+
+    rows = {r["stage"]: r for r in timing.summarize()}
+    assert rows["decode"]["count"] == 5 and rows["decode"]["total"] == pytest.approx(2.5)
+    assert rows["diff"]["mean"] == pytest.approx(3.0)
+    assert rows["diff"]["p95"] == pytest.approx(4.8)
+    assert rows["decode"]["per_frame"] == pytest.approx(0.5)  # 5 frames = 5 diff records
+    assert next(iter(rows)) == "diff"  # slowest total first
+    assert "decode" in timing.format_summary(timing.summarize(), frames=5)
+
+
+def test_write_trace_appends_json_lines(tmp_path, capsys):
+    timing.enable()
+    timing.record("download", 1.25, model="gfs")
+    path = tmp_path / "trace.jsonl"
+    timing.report(path)
+    timing.write_trace(path)
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert len(lines) == 2 and lines[0]["stage"] == "download" and lines[0]["model"] == "gfs"
+    assert "download" in capsys.readouterr().out
+
+
+def test_score_comparison_times_stats_and_archive(tmp_path, monkeypatch):
+    from datetime import datetime
+
+    import numpy as np
+
+    import new_comparison as nc
+    from comparator.accumulate import AccumulatorStore
+
+    diff = np.ones((3, 4))
+    monkeypatch.setattr(nc, "compute_comparison", lambda *args: (None, None, {"TMP": diff}))
+    timing.enable()
+    rows = nc.score_comparison("hrrr", ["TMP"], datetime(2026, 2, 1), 6, stats_path=None,
+                               archive=AccumulatorStore(tmp_path))
+    assert rows["TMP"]["count"] == 12
+    assert sorted(r["stage"] for r in timing.records()) == ["archive", "stats"]
@@ -1,4 +1,6 @@
-from comparator.util import major_airports_df
+import pytest
+
+from comparator.util import load_stations_csv, major_airports_df
 
 
 def test_major_airports_df_shape_and_columns():
@@ -22,3 +24,25 @@ def test_major_airports_df_types_and_ranges():
     # rough bounds sanity for CONUS airports
     assert df["lat"].between(10, 60).all()
     assert df["lon"].between(-140, -60).all()
+
+
+def test_load_stations_csv_normalizes_columns(tmp_path):
+    path = tmp_path / "asos.csv"
+    path.write_text(
+        "Station,Name,Latitude,Longitude\n"
+        "kden,Denver,39.86,-104.67\n"
+        "KBOS,Boston,42.36,-71.01\n"
+        "KBOS,Boston dup,42.36,-71.01\n"
+        "KXXX,Nowhere,,\n"
+    )
+    df = load_stations_csv(path)
+    assert list(df.columns) == ["icao", "city", "lat", "lon"]
+    assert df["icao"].tolist() == ["KDEN", "KBOS"]
+    assert df["lat"].dtype.kind == "f"
+
+
+def test_load_stations_csv_requires_coordinates(tmp_path):
+    path = tmp_path / "bad.csv"
+    path.write_text("id,lat\nKDEN,39.8\n")
+    with pytest.raises(ValueError):
+        load_stations_csv(path)